@@ -0,0 +1,213 @@
+"""
+Screening artifact blob store
+─────────────────────────────
+Binary artifacts (heatmap PNGs, evidence clips) live outside the database,
+content-addressed by SHA-256: a row holds only the 64-hex key, identical
+artifacts are stored once, and a key never changes meaning (so it doubles as
+the ETag).  GET /api/screening/{id}/artifacts/{key} streams them with Range
+support.
+
+The interface mirrors the S3 object calls (put_object / head_object /
+get_object with a byte range / delete_object), so an S3-backed store can
+replace LocalBlobStore without touching the callers.  Locally objects live in
+BLOB_STORE_DIR:
+
+    <root>/ab/abcdef…          object bytes
+    <root>/ab/abcdef….json     {"content_type", "size"}
+
+The screening worker stores each new screening's SVG chart here
+(heatmap_sha256).  Rows written before the store existed keep their heatmap
+in ScreeningLog.heatmap_base64; move them with
+
+    python blobs.py --migrate-heatmaps
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+from config import settings
+
+STREAM_CHUNK_BYTES = 256 * 1024
+
+_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobNotFound(KeyError):
+    """No object with that key."""
+
+
+@dataclass(frozen=True)
+class BlobInfo:
+    key:          str
+    size:         int
+    content_type: str
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+
+def is_key(value: str) -> bool:
+    return bool(_KEY.fullmatch(value or ""))
+
+
+class LocalBlobStore:
+    """Content-addressed objects on the local filesystem (safe across processes)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        if not is_key(key):
+            raise BlobNotFound(key)
+        return self.root / key[:2] / key
+
+    def put_object(self, body: Union[bytes, BinaryIO],
+                   content_type: str = "application/octet-stream") -> BlobInfo:
+        """Store `body` (bytes or a binary file); returns its info (key = SHA-256)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        h    = hashlib.sha256()
+        size = 0
+        # Written under a temp name and renamed, so readers never see a partial object
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".put-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                chunks = [body] if isinstance(body, bytes) else iter(
+                    lambda: body.read(STREAM_CHUNK_BYTES), b"")
+                for chunk in chunks:
+                    h.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            info = BlobInfo(h.hexdigest(), size, content_type)
+            path = self._path(info.key)
+            path.parent.mkdir(exist_ok=True)
+            if path.exists():
+                os.unlink(tmp)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        meta = path.with_suffix(".json")
+        if not meta.exists():
+            meta_tmp = f"{tmp}.json"
+            Path(meta_tmp).write_text(json.dumps({"content_type": content_type, "size": size}))
+            os.replace(meta_tmp, meta)
+        return info
+
+    def head_object(self, key: str) -> BlobInfo:
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            raise BlobNotFound(key) from None
+        try:
+            content_type = json.loads(path.with_suffix(".json").read_text())["content_type"]
+        except (OSError, ValueError, KeyError):
+            content_type = "application/octet-stream"
+        return BlobInfo(key, size, content_type)
+
+    def get_object(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Bytes start..end (inclusive, like an HTTP Range) of `key`, in chunks."""
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key) from None
+        return _read_range(f, start, end)
+
+    def delete_object(self, key: str) -> None:
+        path = self._path(key)
+        for p in (path, path.with_suffix(".json")):
+            if p.exists():
+                os.unlink(p)
+
+
+def _read_range(f: BinaryIO, start: int, end: Optional[int]) -> Iterator[bytes]:
+    with f:
+        f.seek(start)
+        left = None if end is None else end - start + 1
+        while left is None or left > 0:
+            chunk = f.read(STREAM_CHUNK_BYTES if left is None else min(left, STREAM_CHUNK_BYTES))
+            if not chunk:
+                return
+            if left is not None:
+                left -= len(chunk)
+            yield chunk
+
+
+@lru_cache(maxsize=1)
+def blob_store() -> LocalBlobStore:
+    return LocalBlobStore(Path(settings.BLOB_STORE_DIR or Path(__file__).resolve().parent / ".blobs"))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) of a single-range `Range: bytes=…` header, None to send the
+    whole object.  Raises ValueError when the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or match.groups() == ("", ""):
+        return None          # multi-range / other units: ignored, as RFC 9110 allows
+    first, last = match.groups()
+    if first == "":           # suffix: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end   = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"bytes */{size}")
+    return start, end
+
+
+# ── Legacy rows ───────────────────────────────────────────────────────────────
+
+def migrate_heatmaps(db, batch: int = 200) -> int:
+    """Move ScreeningLog.heatmap_base64 PNGs into the store; returns rows moved."""
+    from models import ScreeningLog
+
+    store = blob_store()
+    moved = 0
+    while True:
+        logs = (
+            db.query(ScreeningLog)
+            .filter(ScreeningLog.heatmap_base64.isnot(None))
+            .limit(batch)
+            .all()
+        )
+        if not logs:
+            return moved
+        for log in logs:
+            info = store.put_object(base64.b64decode(log.heatmap_base64), "image/png")
+            log.heatmap_sha256 = info.key
+            log.heatmap_base64 = None
+        db.commit()
+        moved += len(logs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screening artifact blob store")
+    parser.add_argument("--migrate-heatmaps", action="store_true",
+                        help="move heatmap_base64 PNGs out of screening_logs")
+    args = parser.parse_args()
+    if args.migrate_heatmaps:
+        from database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            print(f"[blobs] moved {migrate_heatmaps(db)} heatmap(s) to {blob_store().root}")
+        finally:
+            db.close()
+    else:
+        parser.print_help()
@@ -0,0 +1,153 @@
+"""
+SHAP importance charts
+──────────────────────
+Horizontal bar chart of a screening's SHAP-style feature importances, served
+by GET /api/screening/{id}/heatmap.  The worker saves each screening's SVG
+(plain text, cheap) to the artifact blob store; other formats are rendered
+on first request and cached by content: the same importances always give
+the same bytes and ETag, whichever screening they belong to.
+
+SVG is assembled as text — no plotting library and no shared state, so it is
+safe from any thread.  PNG uses matplotlib's object-oriented Figure API (never
+pyplot, whose global figure registry is not thread-safe) when matplotlib is
+installed.
+"""
+
+import hashlib
+import io
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from xml.sax.saxutils import escape
+
+# Bump when the drawing changes, so cached charts and client ETags refresh
+CHART_VERSION = "1"
+
+MEDIA_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+POSITIVE = "#e74c3c"   # raises risk
+NEGATIVE = "#3498db"   # lowers it
+TITLE    = "Feature importance (SHAP)"
+X_LABEL  = "Contribution to risk"
+
+
+class ChartUnavailable(Exception):
+    """The requested format needs a library that is not installed."""
+
+
+@dataclass(frozen=True)
+class Chart:
+    body:       bytes
+    media_type: str
+    etag:       str
+
+
+def bars(importance: dict) -> tuple[tuple[str, float], ...]:
+    """(name, value) of the numeric entries, in order (notes etc. are skipped)."""
+    return tuple(
+        (str(k), float(v)) for k, v in importance.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    )
+
+
+def render(importance: dict, fmt: str = "svg") -> Optional[Chart]:
+    """The chart of `importance` in `fmt` ("svg" / "png"); None when nothing is numeric."""
+    items = bars(importance)
+    if not items:
+        return None
+    return _render(items, fmt)
+
+
+@lru_cache(maxsize=512)
+def _render(items: tuple[tuple[str, float], ...], fmt: str) -> Chart:
+    t0, c0 = time.perf_counter(), time.process_time()
+    body   = render_svg(items).encode() if fmt == "svg" else render_png(items)
+    _observe(time.perf_counter() - t0, time.process_time() - c0)
+    blob = json.dumps([CHART_VERSION, fmt, items])
+    return Chart(body, MEDIA_TYPES[fmt], f'"{hashlib.sha256(blob.encode()).hexdigest()[:32]}"')
+
+
+def _observe(wall_s: float, cpu_s: float) -> None:
+    # Cache misses only; GET /metrics shows them as stage "chart"
+    try:
+        from ml.metrics import metrics
+    except ImportError:
+        return
+    metrics.observe({"chart": {"wall_s": round(wall_s, 6), "cpu_s": round(cpu_s, 6),
+                               "frames": 0, "peak_rss_mb": None}})
+
+
+# ── SVG ───────────────────────────────────────────────────────────────────────
+
+_WIDTH   = 600
+_LABEL_W = 190      # name column
+_BAR_H   = 22
+_GAP     = 8
+_TOP     = 40       # title
+_BOTTOM  = 50       # axis ticks + label
+_RIGHT   = 60       # room for the value next to a bar
+
+
+def render_svg(items: tuple[tuple[str, float], ...]) -> str:
+    values = [v for _, v in items]
+    lo, hi = min(0.0, *values), max(0.0, *values)
+    span   = (hi - lo) or 1.0
+    plot_w = _WIDTH - _LABEL_W - _RIGHT
+    height = _TOP + len(items) * (_BAR_H + _GAP) + _BOTTOM
+
+    def x(v: float) -> float:
+        return _LABEL_W + (v - lo) / span * plot_w
+
+    zero = x(0.0)
+    axis = _TOP + len(items) * (_BAR_H + _GAP)
+    out  = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" height="{height}" '
+        f'viewBox="0 0 {_WIDTH} {height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{_WIDTH}" height="{height}" fill="#fff"/>',
+        f'<text x="{_WIDTH / 2:.1f}" y="22" text-anchor="middle" font-size="14">{TITLE}</text>',
+    ]
+    for i, (name, value) in enumerate(items):
+        y     = _TOP + i * (_BAR_H + _GAP)
+        left  = min(zero, x(value))
+        width = abs(x(value) - zero)
+        out.append(f'<text x="{_LABEL_W - 8}" y="{y + _BAR_H * 0.7:.1f}" '
+                   f'text-anchor="end">{escape(name)}</text>')
+        out.append(f'<rect x="{left:.1f}" y="{y}" width="{width:.1f}" height="{_BAR_H}" '
+                   f'fill="{POSITIVE if value > 0 else NEGATIVE}"/>')
+        anchor = "start" if value >= 0 else "end"
+        offset = 4 if value >= 0 else -4
+        out.append(f'<text x="{x(value) + offset:.1f}" y="{y + _BAR_H * 0.7:.1f}" '
+                   f'text-anchor="{anchor}" fill="#333">{value:.4g}</text>')
+    out.append(f'<line x1="{zero:.1f}" y1="{_TOP - 4}" x2="{zero:.1f}" y2="{axis}" stroke="#333"/>')
+    out.append(f'<line x1="{_LABEL_W}" y1="{axis}" x2="{_LABEL_W + plot_w}" y2="{axis}" stroke="#333"/>')
+    for v in (lo, 0.0, hi) if lo < 0 < hi else (lo, hi):
+        out.append(f'<text x="{x(v):.1f}" y="{axis + 16}" text-anchor="middle">{v:.3g}</text>')
+    out.append(f'<text x="{_LABEL_W + plot_w / 2:.1f}" y="{height - 10}" '
+               f'text-anchor="middle">{X_LABEL}</text>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+# ── PNG ───────────────────────────────────────────────────────────────────────
+
+def render_png(items: tuple[tuple[str, float], ...]) -> bytes:
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:
+        raise ChartUnavailable("PNG charts need matplotlib — use format=svg") from None
+
+    names  = [n for n, _ in items]
+    values = [v for _, v in items]
+    fig = Figure(figsize=(6, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.barh(names, values, color=[POSITIVE if v > 0 else NEGATIVE for v in values])
+    ax.invert_yaxis()   # first entry on top, as in the SVG
+    ax.set_xlabel(X_LABEL)
+    ax.set_title(TITLE)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
@@ -11,6 +11,37 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24   # 24 h
 
+    # ── ML ────────────────────────────────────────────────────────────────────
+    # Load the screening models at startup instead of on the first request
+    ML_WARMUP_ON_STARTUP: bool = False
+    # Quality gate: reject uploads whose face ratio over a cheap frame sample is
+    # below this (0 disables).  Sparse sample across the file unless SECONDS > 0.
+    ML_QUALITY_GATE_MIN_FACE_RATIO: float = 0.10
+    ML_QUALITY_GATE_SAMPLES: int = 24
+    ML_QUALITY_GATE_SECONDS: float = 0.0
+
+    # ── Screening job queue (screening_jobs.py) ──────────────────────────────
+    # Worker processes started with the API (0 → run `python screening_jobs.py`)
+    ML_JOB_WORKERS: int = 2
+    ML_JOB_QUEUE_MAX: int = 100          # pending jobs before uploads get 429
+    ML_JOB_POLL_SECONDS: float = 1.0
+    ML_JOB_HEARTBEAT_SECONDS: float = 30.0   # running workers refresh heartbeat_at
+    ML_JOB_TIMEOUT_SECONDS: int = 300    # no heartbeat this long → worker presumed dead
+    ML_JOB_MAX_ATTEMPTS: int = 2
+    ML_JOB_UPLOAD_DIR: str = ""          # default: backend/.job_uploads
+    ML_UPLOAD_MAX_MB: float = 1024.0     # larger uploads get 413
+    # Chunked uploads: a short analysis pass per further STEP_MB received
+    # while later chunks arrive (fragmented MP4 / WebM)
+    ML_UPLOAD_STEP_MB: float = 4.0
+    ML_UPLOAD_IDLE_SECONDS: int = 30         # no chunk this long → analyse what arrived
+    ML_UPLOAD_EXPIRE_SECONDS: int = 86400    # unfinished uploads are then failed + deleted
+    # Per-worker stage-timing snapshots, merged by GET /metrics
+    ML_METRICS_DIR: str = ""             # default: backend/.metrics
+
+    # ── Artifact blob store (blobs.py) ────────────────────────────────────────
+    # Content-addressed heatmaps / evidence clips, referenced from rows by hash
+    BLOB_STORE_DIR: str = ""             # default: backend/.blobs
+
     # ── CORS ──────────────────────────────────────────────────────────────────
     FRONTEND_ORIGINS: list[str] = [
         "http://localhost:5173",   # Vite
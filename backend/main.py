@@ -6,12 +6,14 @@ Docs:   http://localhost:8000/docs
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from database import engine
 from models import Base
 from routers import auth, screening, monitoring, therapy, interventions, parent, proto
+from screening_jobs import WorkerPool, metrics_text
 
 # App 
 app = FastAPI(
@@ -40,6 +42,28 @@ app.include_router(interventions.router, prefix="/api/interventions", tags=["Int
 app.include_router(parent.router,        prefix="/api/parent",        tags=["Parent"])
 app.include_router(proto.router,         prefix="/api",               tags=["Proto"])
 
+# Optional: load screening models before the first request
+@app.on_event("startup")
+def warm_up_models():
+    if settings.ML_WARMUP_ON_STARTUP:
+        screening.warm_up_ml_models()
+
+
+# Screening job workers (ML analysis runs outside the request)
+job_workers = WorkerPool(settings.ML_JOB_WORKERS, settings.ML_JOB_POLL_SECONDS)
+
+
+@app.on_event("startup")
+def start_job_workers():
+    if settings.ML_JOB_WORKERS > 0:
+        job_workers.start()
+
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_workers.stop()
+
+
 #  Health 
 @app.get("/", tags=["Health"])
 def root():
@@ -49,3 +73,9 @@ def root():
 @app.get("/health", tags=["Health"])
 def health():
     return {"status": "healthy"}
+
+
+# Prometheus scrape target: per-stage screening timings of API + workers
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def metrics():
+    return metrics_text()
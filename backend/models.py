@@ -13,7 +13,8 @@ Table map (grouped by PRD module):
 
   CLINICAL (existing, extended)
   ├── patients               anonymised child record
-  └── screening_logs         ASD video screening results
+  ├── screening_logs         ASD video screening results
+  └── screening_jobs         queued / running video analyses (job queue)
 
   PREDICTIVE INTERVENTION ENGINE
   └── intervention_plans     AI-recommended therapy plan per patient
@@ -35,8 +36,8 @@ import hashlib
 from datetime import datetime
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, Enum as SAEnum,
-    Float, ForeignKey, Integer, SmallInteger, String, Text,
+    BigInteger, Boolean, Column, DateTime, Enum as SAEnum,
+    Float, ForeignKey, Index, Integer, SmallInteger, String, Text,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -92,6 +93,13 @@ class CrisisStatusEnum(str, enum.Enum):
     resolved  = "resolved"    # marked resolved by parent/clinician
 
 
+class JobStatusEnum(str, enum.Enum):
+    queued  = "queued"    # upload stored, waiting for a worker
+    running = "running"   # claimed by a worker
+    done    = "done"      # result (and ScreeningLog row) written
+    failed  = "failed"    # analysis raised / retries exhausted
+
+
 class RiskLevelEnum(str, enum.Enum):
     low      = "low"       # 0-30 %
     medium   = "medium"    # 31-60 %
@@ -236,7 +244,8 @@ class Patient(Base):
 class ScreeningLog(Base):
     """
     One row per ASD video screening run.
-    Stores raw scores, SHAP importances, and the annotated heatmap PNG.
+    Stores raw scores and SHAP importances (charted in charts.py);
+    binary artifacts are referenced by blob-store key (blobs.py).
     """
     __tablename__ = "screening_logs"
 
@@ -257,10 +266,12 @@ class ScreeningLog(Base):
     indicators_json   = Column(Text, nullable=True)   # behavioral_markers dict
     gaze_metrics_json = Column(Text, nullable=True)   # eye-tracking metrics
     shap_json         = Column(Text, nullable=True)   # SHAP feature importances
-    evidence_clips_json = Column(Text, nullable=True) # timestamped evidence clips
+    evidence_clips_json = Column(Text, nullable=True) # [{start_s, end_s, blob}] — clip bytes in the blob store
+    features_json     = Column(Text, nullable=True)   # score features, for re-scoring
 
     # Visualisation
-    heatmap_base64    = Column(Text, nullable=True)   # PNG as base64
+    heatmap_base64    = Column(Text, nullable=True)   # PNG as base64 (legacy rows only)
+    heatmap_sha256    = Column(String(64), nullable=True)   # chart in the blob store (SVG; migrated rows: PNG)
 
     # Clinician review
     clinician_notes   = Column(Text,    nullable=True)
@@ -274,6 +285,61 @@ class ScreeningLog(Base):
     clinician = relationship("User",    back_populates="screening_logs",
                              foreign_keys=[clinician_user_id])
 
+    # Keyset pagination of GET /api/screening/history (newest first), overall
+    # and per clinician / patient
+    __table_args__ = (
+        Index("ix_screening_logs_created",           "created_at", "id"),
+        Index("ix_screening_logs_clinician_created", "clinician_user_id", "created_at", "id"),
+        Index("ix_screening_logs_patient_created",   "patient_id", "created_at", "id"),
+    )
+
+
+class ScreeningJob(Base):
+    """
+    One queued video analysis.  Workers claim rows with a compare-and-set
+    UPDATE (status queued → running), so no external broker is needed.
+    """
+    __tablename__ = "screening_jobs"
+
+    id                = Column(Integer, primary_key=True, autoincrement=True)
+    status            = Column(SAEnum(JobStatusEnum), nullable=False,
+                               default=JobStatusEnum.queued, index=True)
+    clinician_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Stored upload (deleted once the job finishes)
+    upload_path       = Column(String(512), nullable=False)
+    filename          = Column(String(255), nullable=True)
+    upload_sha256     = Column(String(64),  nullable=True)   # hashed while streaming in
+    # Features / model / gate that produced result_json (repeat uploads reuse it)
+    pipeline_version  = Column(String(128), nullable=True)
+
+    # Chunked uploads (POST /api/screening/uploads) are queued before the last
+    # chunk arrives; workers analyse the file in short passes as it grows
+    upload_complete   = Column(Boolean,    default=True, nullable=False)
+    upload_size       = Column(BigInteger, nullable=True)             # declared total
+    bytes_received    = Column(BigInteger, default=0, nullable=False)
+    analysed_upto     = Column(BigInteger, default=0, nullable=False) # received at the last pass
+    last_chunk_at     = Column(DateTime,   nullable=True)
+
+    # Worker bookkeeping
+    worker_id         = Column(String(64), nullable=True)
+    attempts          = Column(Integer,    default=0, nullable=False)
+    heartbeat_at      = Column(DateTime,   nullable=True)   # refreshed while running
+
+    # Outcome
+    screening_log_id  = Column(Integer, ForeignKey("screening_logs.id"), nullable=True)
+    result_json       = Column(Text, nullable=True)   # API response of the analysis
+    error             = Column(Text, nullable=True)
+
+    created_at        = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at        = Column(DateTime, nullable=True)
+    finished_at       = Column(DateTime, nullable=True)
+
+    # Repeat uploads: screening_jobs.find_duplicate()
+    __table_args__ = (
+        Index("ix_screening_jobs_sha256_version", "upload_sha256", "pipeline_version"),
+    )
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # MODULE 2 — PREDICTIVE INTERVENTION ENGINE
@@ -1,24 +1,46 @@
 """
 Screening router
-  POST /api/screening          — upload video → ML analysis → save result
-  GET  /api/screening/history  — recent screenings (clinicians/admins only)
+  POST /api/screening                — upload video → queue analysis job (202; repeats answered at once)
+  POST /api/screening/uploads        — start a resumable chunked upload (queued at once)
+  PUT  /api/screening/uploads/{id}   — append a chunk (Content-Range: bytes start-end/total)
+  GET  /api/screening/uploads/{id}   — bytes received so far (where to resume)
+  GET  /api/screening/jobs/{id}      — job status (queued/running/done/failed) + result
+  GET  /api/screening/history        — screenings, newest first (keyset pages; clinicians/admins only)
+  POST /api/screening/{id}/rescore   — re-score a stored screening with new parameters
+  POST /api/screening/rescore        — vectorised re-score of many screenings (calibration)
+  GET  /api/screening/{id}/heatmap   — SHAP importance chart (SVG from the blob store, PNG on demand)
+  GET  /api/screening/{id}/artifacts/{key} — stored artifact (blob store; ETag + Range)
+  GET  /api/screening/models/health  — warm-model registry state (admins only)
 """
 
 import base64
+import hashlib
 import json
 import os
+import re
 import sys
-import tempfile
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+import blobs
+import charts
+import screening_jobs
+import uploads
 from database import get_db
-from models import ScreeningLog, Patient, hash_child_id, User
+from models import ScreeningLog, ScreeningJob, JobStatusEnum, User
 from auth_utils import get_current_user, require_roles
-from schemas import ScreeningHistoryResponse, ScreeningHistoryItem
+from schemas import (
+    ScreeningHistoryResponse, ScreeningHistoryItem,
+    RescoreRequest, RescoreBatchRequest, RescoreBatchResponse, RescoreBatchItem,
+    UploadCreateRequest, UploadStatus,
+)
 
 router = APIRouter()
 
@@ -30,117 +52,508 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 
+def warm_up_ml_models() -> Optional[dict]:
+    """Load screening models into this process.  None when ML deps are absent."""
+    try:
+        from ml.screening import warm_up_models
+    except ImportError:
+        return None
+    health = warm_up_models()
+    print(f"[ml] warm-up: { {k: v['state'] for k, v in health.items()} }")
+    return health
+
+
+def _queue_full(e: screening_jobs.QueueFull) -> HTTPException:
+    """429: the worker pool is saturated; retry once a job slot should be free."""
+    return HTTPException(429, "Screening queue is full — try again later",
+                         headers={"Retry-After": str(e.retry_after)})
+
+
 # ── POST /api/screening ───────────────────────────────────────────────────────
-@router.post("")
+# The body is parsed by uploads.receive_video (streamed to disk, never buffered
+# whole); this schema only documents the multipart form
+_UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type":       "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required":   ["file"],
+        }}},
+    },
+}
+
+
+@router.post("", status_code=202, openapi_extra=_UPLOAD_FORM)
 async def run_screening(
-    file: UploadFile = File(...),
-    db:   Session    = Depends(get_db),
+    request: Request,
+    db:      Session = Depends(get_db),
     current_user: User = Depends(get_current_user),   # must be logged in
 ):
-    ext = (file.filename or "").rsplit(".", 1)[-1].lower()
+    """
+    Store the upload and queue it for analysis (202); poll the returned
+    status_url.  A video already screened by the current pipeline is answered
+    at once (200, status "done", with the result), even when the queue is full.
+    """
+    upload = await uploads.receive_video(request, screening_jobs.UPLOAD_DIR, ALLOWED_EXTS)
+
+    # Same bytes already screened by this pipeline version: answer from the stored result
+    source = await run_in_threadpool(screening_jobs.find_duplicate, db, upload.sha256)
+    if source is not None:
+        os.unlink(upload.path)
+        job = await run_in_threadpool(
+            screening_jobs.reuse_result, db, source, upload.filename, current_user.id,
+        )
+        return JSONResponse({
+            "job_id":     job.id,
+            "status":     job.status.value,
+            "status_url": f"/api/screening/jobs/{job.id}",
+            "result":     json.loads(job.result_json),
+        })
+
+    # Only a new job needs a queue slot: enqueue() refuses when none is free
+    try:
+        job = await run_in_threadpool(
+            screening_jobs.enqueue, db, upload.path, upload.filename, current_user.id,
+            upload_size=upload.size, sha256=upload.sha256,
+        )
+    except screening_jobs.QueueFull as e:
+        os.unlink(upload.path)
+        raise _queue_full(e)
+
+    return {
+        "job_id":     job.id,
+        "status":     job.status.value,
+        "status_url": f"/api/screening/jobs/{job.id}",
+    }
+
+
+# ── Chunked uploads ───────────────────────────────────────────────────────────
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+def _upload_job(db: Session, upload_id: int, user: User) -> ScreeningJob:
+    job = db.query(ScreeningJob).filter(ScreeningJob.id == upload_id).first()
+    if not job or job.clinician_user_id != user.id or job.last_chunk_at is None:
+        raise HTTPException(404, "Upload not found")
+    return job
+
+
+def _upload_status(job: ScreeningJob) -> UploadStatus:
+    return UploadStatus(
+        upload_id  = job.id,
+        received   = job.bytes_received,
+        size       = job.upload_size,
+        complete   = job.upload_complete,
+        upload_url = f"/api/screening/uploads/{job.id}",
+        status_url = f"/api/screening/jobs/{job.id}",
+    )
+
+
+@router.post("/uploads", status_code=201, response_model=UploadStatus)
+def create_upload(
+    body: UploadCreateRequest,
+    db:   Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Start a resumable upload.  The analysis job is queued immediately and
+    processes the video while chunks arrive (fragmented MP4 / WebM; other
+    formats are analysed once complete).
+    """
+    ext = body.filename.rsplit(".", 1)[-1].lower()
     if ext not in ALLOWED_EXTS:
         raise HTTPException(400, f"Unsupported format. Use: {', '.join(ALLOWED_EXTS)}")
+    if body.size is not None and body.size > uploads.max_upload_bytes():
+        raise uploads.too_large()
 
-    out: dict = {}
-
+    upload_path = screening_jobs.store_upload(b"", ext)
     try:
-        # 1. Save upload to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
+        job = screening_jobs.enqueue(db, upload_path, body.filename, current_user.id,
+                                     chunked=True, upload_size=body.size)
+    except screening_jobs.QueueFull as e:
+        os.unlink(upload_path)
+        raise _queue_full(e)
+    return _upload_status(job)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatus)
+def upload_status(
+    upload_id: int,
+    db:        Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Resume point of an interrupted upload: send the next chunk from `received`."""
+    return _upload_status(_upload_job(db, upload_id, current_user))
 
-        # 2. Run ML model (imported lazily so API starts even without ML deps)
-        try:
-            from ml.screening import analyze_video_with_explainability
-            out = analyze_video_with_explainability(tmp_path)
-        except ImportError:
-            # ML not installed — return a placeholder for dev/testing
-            out = {
-                "risk": 0.0,
-                "indicators": {},
-                "gaze_metrics": {},
-                "shap_importance": {},
-                "_ml_unavailable": True,
-            }
-
-        # 3. Generate SHAP heatmap PNG → base64
-        heatmap_b64: Optional[str] = None
-        try:
-            import io
-            import matplotlib
-            matplotlib.use("Agg")
-            import matplotlib.pyplot as plt
-
-            imp   = out.get("shap_importance", {})
-            names = [k for k, v in imp.items() if isinstance(v, (int, float))]
-            vals  = [imp[k] for k in names]
-            if names:
-                fig, ax = plt.subplots(figsize=(6, 4))
-                ax.barh(names, vals, color=["#e74c3c" if v > 0 else "#3498db" for v in vals])
-                ax.set_xlabel("Contribution to risk")
-                ax.set_title("Feature importance (SHAP)")
-                buf = io.BytesIO()
-                plt.savefig(buf, format="png", bbox_inches="tight")
-                buf.seek(0)
-                heatmap_b64 = base64.b64encode(buf.read()).decode()
-                plt.close()
-        except Exception as e:
-            print(f"[heatmap] skipped: {e}")
-
-        out["heatmap_base64"] = heatmap_b64
-
-        # 4. Persist to Postgres
-        log = ScreeningLog(
-            clinician_user_id = current_user.id,
-            video_path_hashed = hash_child_id(file.filename or "unknown"),
-            risk_score        = float(out.get("risk", 0.0)),
-            indicators_json   = json.dumps(out.get("indicators", {})),
-            shap_json         = json.dumps(out.get("shap_importance", {})),
-            heatmap_base64    = heatmap_b64,
-            consent_given     = True,
-        )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-
-        out["screening_log_id"]  = log.id
-        out["saved_to_database"] = True
-        print(f"✓ Screening saved (ID {log.id}) by user {current_user.id}")
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        out["error"]             = str(e)
-        out["saved_to_database"] = False
-    finally:
-        if "tmp_path" in locals() and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
 
+@router.put("/uploads/{upload_id}", response_model=UploadStatus)
+async def upload_chunk(
+    upload_id:     int,
+    request:       Request,
+    content_range: str     = Header(...),
+    db:            Session = Depends(get_db),
+    current_user:  User    = Depends(get_current_user),
+):
+    """
+    Append the request body at the byte range given by Content-Range
+    (`bytes 0-1048575/52428800`, total may be `*` until the last chunk).
+    Chunks must arrive in order: a wrong start gets 409 with the expected
+    offset in the Upload-Offset header.
+    """
+    job = await run_in_threadpool(_upload_job, db, upload_id, current_user)
+    if job.upload_complete:
+        raise HTTPException(409, "Upload already complete")
+    if job.status in (JobStatusEnum.done, JobStatusEnum.failed):
+        # e.g. rejected by the quality gate on the part already received
+        raise HTTPException(409, f"Screening already {job.status.value}")
+
+    match = _CONTENT_RANGE.fullmatch(content_range.strip())
+    if not match:
+        raise HTTPException(400, "Content-Range must look like 'bytes start-end/total'")
+    start, end = int(match[1]), int(match[2]) + 1
+    total      = None if match[3] == "*" else int(match[3])
+    if job.upload_size is not None:
+        if total is not None and total != job.upload_size:
+            raise HTTPException(400, f"Upload size is {job.upload_size} bytes, not {total}")
+        total = job.upload_size
+    if end <= start or (total is not None and end > total):
+        raise HTTPException(400, "Invalid Content-Range")
+    if max(end, total or 0) > uploads.max_upload_bytes():
+        raise uploads.too_large()
+    if start != job.bytes_received:
+        raise HTTPException(409, f"Expected the chunk starting at byte {job.bytes_received}",
+                            headers={"Upload-Offset": str(job.bytes_received)})
+
+    part, size = await screening_jobs.receive_chunk(job.upload_path, request.stream(), end - start)
+    if size != end - start:
+        screening_jobs.discard_chunk(part)
+        raise HTTPException(400, f"Chunk body is {size} bytes, Content-Range says {end - start}")
+    recorded = await run_in_threadpool(screening_jobs.record_chunk, db, job.id, start, end, total)
+    if not recorded:
+        # A concurrent request sent this range first; nothing of ours was written
+        screening_jobs.discard_chunk(part)
+        await run_in_threadpool(db.refresh, job)
+        raise HTTPException(409, f"Expected the chunk starting at byte {job.bytes_received}",
+                            headers={"Upload-Offset": str(job.bytes_received)})
+    await run_in_threadpool(screening_jobs.place_chunk, db, job.id, job.upload_path,
+                            part, start, end, total)
+    await run_in_threadpool(db.refresh, job)
+    return _upload_status(job)
+
+
+# ── GET /api/screening/jobs/{id} ──────────────────────────────────────────────
+@router.get("/jobs/{job_id}")
+def screening_job_status(
+    job_id: int,
+    db:     Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+    role = getattr(current_user.role, "value", str(current_user.role))
+    if not job or (job.clinician_user_id != current_user.id and role != "admin"):
+        raise HTTPException(404, "Job not found")
+
+    out = {
+        "job_id":           job.id,
+        "status":           job.status.value,
+        "created_at":       job.created_at,
+        "started_at":       job.started_at,
+        "finished_at":      job.finished_at,
+        "screening_log_id": job.screening_log_id,
+        "error":            job.error,
+    }
+    if not job.upload_complete:
+        out["upload"] = {"received": job.bytes_received, "size": job.upload_size}
+    if job.status == JobStatusEnum.queued:
+        out["queue_position"] = (
+            db.query(ScreeningJob)
+            .filter(ScreeningJob.status == JobStatusEnum.queued, ScreeningJob.id < job.id)
+            .count()
+        ) + 1
+    if job.result_json:
+        out["result"] = json.loads(job.result_json)
     return out
 
 
 # ── GET /api/screening/history ────────────────────────────────────────────────
+# Same bands as ml/screening.py: Low < 0.3 | Medium 0.3–0.7 | High > 0.7
+RISK_BANDS = {
+    "low":    lambda risk: risk < 0.3,
+    "medium": lambda risk: risk.between(0.3, 0.7),
+    "high":   lambda risk: risk > 0.7,
+}
+
+
+def _encode_cursor(created_at, log_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{log_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
 @router.get("/history", response_model=ScreeningHistoryResponse)
 def screening_history(
-    limit: int = 20,
+    limit:        int           = 20,
+    cursor:       Optional[str] = None,
+    clinician_id: Optional[int] = None,
+    patient_id:   Optional[int] = None,
+    risk_band:    Optional[str] = None,
     db:    Session = Depends(get_db),
     current_user: User = Depends(require_roles("admin", "clinician", "therapist")),
 ):
-    logs = (
-        db.query(ScreeningLog)
-        .order_by(ScreeningLog.created_at.desc())
-        .limit(min(limit, 100))
+    """
+    Screenings newest first, `limit` (max 100) per page.  Pages are keyed on
+    (created_at, id) — each one is an index range scan, however deep.
+    """
+    if risk_band is not None and risk_band not in RISK_BANDS:
+        raise HTTPException(400, f"Unknown risk_band. Use: {', '.join(RISK_BANDS)}")
+    limit = max(1, min(limit, 100))
+
+    # Only the columns the response needs (not shap_json / features_json / …)
+    query = db.query(
+        ScreeningLog.id, ScreeningLog.risk_score, ScreeningLog.created_at,
+        ScreeningLog.indicators_json, ScreeningLog.clinician_user_id, ScreeningLog.patient_id,
+    )
+    if clinician_id is not None:
+        query = query.filter(ScreeningLog.clinician_user_id == clinician_id)
+    if patient_id is not None:
+        query = query.filter(ScreeningLog.patient_id == patient_id)
+    if risk_band is not None:
+        query = query.filter(RISK_BANDS[risk_band](ScreeningLog.risk_score))
+    if cursor:
+        query = query.filter(
+            tuple_(ScreeningLog.created_at, ScreeningLog.id) < tuple_(*_decode_cursor(cursor))
+        )
+    rows = (
+        query.order_by(ScreeningLog.created_at.desc(), ScreeningLog.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
+    more, rows = len(rows) > limit, rows[:limit]
     items = [
         ScreeningHistoryItem(
-            id           = log.id,
-            risk_score   = log.risk_score,
-            created_at   = log.created_at,
-            indicators   = json.loads(log.indicators_json) if log.indicators_json else {},
-            clinician_id = log.clinician_user_id,
+            id           = row.id,
+            risk_score   = row.risk_score,
+            created_at   = row.created_at,
+            indicators   = json.loads(row.indicators_json) if row.indicators_json else {},
+            clinician_id = row.clinician_user_id,
+            patient_id   = row.patient_id,
         )
-        for log in logs
+        for row in rows
     ]
-    return ScreeningHistoryResponse(count=len(items), screenings=items)
+    return ScreeningHistoryResponse(
+        count       = len(items),
+        screenings  = items,
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id) if more else None,
+    )
+
+
+# ── Re-scoring ────────────────────────────────────────────────────────────────
+def _rescore_params(body: RescoreRequest) -> dict:
+    """Formula parameters set in the request body (others keep their defaults)."""
+    return body.model_dump(include=set(RescoreRequest.model_fields), exclude_none=True)
+
+
+# ── POST /api/screening/rescore ───────────────────────────────────────────────
+@router.post("/rescore", response_model=RescoreBatchResponse)
+def rescore_screenings(
+    body: RescoreBatchRequest,
+    db:   Session = Depends(get_db),
+    current_user: User = Depends(require_roles("admin", "clinician")),
+):
+    """Risk scores of stored screenings under new parameters (nothing is saved)."""
+    try:
+        from ml.scoring import ScoringParams
+        from ml.screening import rescore_many
+    except ImportError:
+        raise HTTPException(503, "ML module unavailable")
+
+    query = db.query(ScreeningLog.id, ScreeningLog.risk_score, ScreeningLog.features_json)
+    if body.ids:
+        query = query.filter(ScreeningLog.id.in_(body.ids))
+    rows = query.order_by(ScreeningLog.created_at.desc()).limit(min(body.limit, 10000)).all()
+
+    scored = [row for row in rows if row.features_json]
+    params = _rescore_params(body)
+    try:
+        risks = rescore_many([json.loads(row.features_json) for row in scored], **params)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+    items = [
+        RescoreBatchItem(id=row.id, stored_risk=row.risk_score, risk=float(risk))
+        for row, risk in zip(scored, risks)
+    ]
+    return RescoreBatchResponse(
+        count   = len(items),
+        skipped = len(rows) - len(scored),
+        params  = vars(ScoringParams(**params)),
+        scores  = items,
+    )
+
+
+# ── POST /api/screening/{id}/rescore ──────────────────────────────────────────
+@router.post("/{screening_id}/rescore")
+def rescore_screening(
+    screening_id: int,
+    body: RescoreRequest,
+    db:   Session = Depends(get_db),
+    current_user: User = Depends(require_roles("admin", "clinician")),
+):
+    """Re-score one stored screening without re-processing its video (nothing is saved)."""
+    log = db.query(ScreeningLog).filter(ScreeningLog.id == screening_id).first()
+    if not log:
+        raise HTTPException(404, "Screening not found")
+    if not log.features_json:
+        raise HTTPException(409, "Screening has no stored features to re-score")
+
+    try:
+        from ml.screening import rescore_with_explainability
+    except ImportError:
+        raise HTTPException(503, "ML module unavailable")
+
+    try:
+        out = rescore_with_explainability(json.loads(log.features_json), **_rescore_params(body))
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+    out["screening_log_id"] = log.id
+    out["stored_risk"]      = log.risk_score
+    return out
+
+
+def _readable_screening(db: Session, screening_id: int, user: User) -> ScreeningLog:
+    """The screening, if `user` submitted it or has a clinical role; 404 otherwise."""
+    log  = db.query(ScreeningLog).filter(ScreeningLog.id == screening_id).first()
+    role = getattr(user.role, "value", str(user.role))
+    if not log or (log.clinician_user_id != user.id
+                   and role not in ("admin", "clinician", "therapist")):
+        raise HTTPException(404, "Screening not found")
+    return log
+
+
+# ── GET /api/screening/{id}/heatmap ───────────────────────────────────────────
+@router.get("/{screening_id}/heatmap")
+def screening_heatmap(
+    screening_id:  int,
+    format:        str           = "svg",
+    if_none_match: Optional[str] = Header(None),
+    db:            Session       = Depends(get_db),
+    current_user:  User          = Depends(get_current_user),
+):
+    """
+    SHAP importance bar chart of a stored screening: the copy in the blob store
+    when it is in the requested format (the SVG saved with the screening, or a
+    migrated legacy PNG), else rendered and cached by content (charts.py).
+    Clients revalidate with If-None-Match.
+    """
+    if format not in charts.MEDIA_TYPES:
+        raise HTTPException(400, f"Unsupported format. Use: {', '.join(charts.MEDIA_TYPES)}")
+    log   = _readable_screening(db, screening_id, current_user)
+    chart = _stored_heatmap(log, charts.MEDIA_TYPES[format])
+    if chart is None:
+        try:
+            chart = charts.render(json.loads(log.shap_json) if log.shap_json else {}, format)
+        except charts.ChartUnavailable as e:
+            raise HTTPException(503, str(e))
+    if chart is None and format == "png" and log.heatmap_base64:
+        # Screenings stored before the blob store existed
+        body  = base64.b64decode(log.heatmap_base64)
+        chart = charts.Chart(body, "image/png", f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    if chart is None:
+        raise HTTPException(404, "Screening has no feature importances to plot")
+
+    headers = {"ETag": chart.etag, "Cache-Control": "private, max-age=3600"}
+    if if_none_match and chart.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(chart.body, media_type=chart.media_type, headers=headers)
+
+
+def _stored_heatmap(log: ScreeningLog, media_type: str) -> Optional[charts.Chart]:
+    """The screening's chart from the blob store, if it is kept there as `media_type`."""
+    if not log.heatmap_sha256:
+        return None
+    store = blobs.blob_store()
+    try:
+        info = store.head_object(log.heatmap_sha256)
+        if info.content_type != media_type:
+            return None
+        return charts.Chart(b"".join(store.get_object(info.key)), info.content_type, info.etag)
+    except blobs.BlobNotFound:
+        return None
+
+
+# ── GET /api/screening/{id}/artifacts/{key} ───────────────────────────────────
+def _artifact_keys(log: ScreeningLog) -> set[str]:
+    keys = {log.heatmap_sha256} if log.heatmap_sha256 else set()
+    try:
+        clips = json.loads(log.evidence_clips_json) if log.evidence_clips_json else []
+    except ValueError:
+        clips = []
+    keys.update(c["blob"] for c in clips if isinstance(c, dict) and c.get("blob"))
+    return keys
+
+
+@router.get("/{screening_id}/artifacts/{key}")
+def screening_artifact(
+    screening_id:  int,
+    key:           str,
+    range:         Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db:            Session       = Depends(get_db),
+    current_user:  User          = Depends(get_current_user),
+):
+    """
+    Stream an artifact of a screening (heatmap chart, evidence clip) from the
+    blob store.  Keys are content hashes, so the ETag never goes stale;
+    single byte ranges get 206 (video players seek with these).
+    """
+    log = _readable_screening(db, screening_id, current_user)
+    if key not in _artifact_keys(log):
+        raise HTTPException(404, "Artifact not found")
+    store = blobs.blob_store()
+    try:
+        info = store.head_object(key)
+    except blobs.BlobNotFound:
+        raise HTTPException(404, "Artifact is missing from the blob store")
+
+    headers = {
+        "ETag":          info.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+    if if_none_match and info.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    try:
+        byte_range = blobs.parse_range(range, info.size)
+    except ValueError as e:
+        raise HTTPException(416, "Range not satisfiable", headers={"Content-Range": str(e)})
+
+    if byte_range is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(store.get_object(key), media_type=info.content_type,
+                                 headers=headers)
+    start, end = byte_range
+    headers["Content-Range"]  = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(store.get_object(key, start, end), status_code=206,
+                             media_type=info.content_type, headers=headers)
+
+
+# ── GET /api/screening/models/health ─────────────────────────────────────────
+@router.get("/models/health")
+def models_health(
+    current_user: User = Depends(require_roles("admin")),
+):
+    try:
+        from ml.registry import models
+    except ImportError:
+        return {"ml_available": False, "models": {}}
+    return {"ml_available": True, "models": models.health()}
@@ -58,20 +58,64 @@ class ScreeningResult(BaseModel):
     indicators:        dict[str, Any]  = {}
     gaze_metrics:      dict[str, Any]  = {}
     shap_importance:   dict[str, Any]  = {}
-    heatmap_base64:    Optional[str]   = None
+    heatmap_url:       Optional[str]   = None   # GET → SHAP chart (SVG; ?format=png)
     error:             Optional[str]   = None
 
 
+class UploadCreateRequest(BaseModel):
+    """Start a chunked upload; `size` (bytes) may instead come with the last chunk."""
+    filename: str
+    size:     Optional[int] = None
+
+
+class UploadStatus(BaseModel):
+    upload_id:  int
+    received:   int             # bytes stored so far = offset of the next chunk
+    size:       Optional[int]
+    complete:   bool
+    upload_url: str
+    status_url: str
+
+
 class ScreeningHistoryItem(BaseModel):
     id:           int
     risk_score:   float
     created_at:   datetime
     indicators:   dict[str, Any] = {}
     clinician_id: Optional[int]  = None
+    patient_id:   Optional[int]  = None
 
     model_config = {"from_attributes": True}
 
 
 class ScreeningHistoryResponse(BaseModel):
-    count:      int
-    screenings: list[ScreeningHistoryItem]
+    count:       int
+    screenings:  list[ScreeningHistoryItem]
+    next_cursor: Optional[str] = None   # pass as ?cursor= for the next (older) page
+
+
+class RescoreRequest(BaseModel):
+    """Risk-formula parameters; omitted fields keep the production defaults."""
+    video_model_weight:            Optional[float] = None
+    mediapipe_quality_weight:      Optional[float] = None
+    min_face_ratio_for_confidence: Optional[float] = None
+    fixation_threshold:            Optional[float] = None
+    gesture_scale:                 Optional[float] = None
+
+
+class RescoreBatchRequest(RescoreRequest):
+    ids:   Optional[list[int]] = None   # default: most recent screenings
+    limit: int                 = 1000
+
+
+class RescoreBatchItem(BaseModel):
+    id:          int
+    stored_risk: float
+    risk:        float
+
+
+class RescoreBatchResponse(BaseModel):
+    count:   int
+    skipped: int
+    params:  dict[str, float]
+    scores:  list[RescoreBatchItem]
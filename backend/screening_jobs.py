@@ -0,0 +1,750 @@
+"""
+Screening job queue
+───────────────────
+POST /api/screening stores the upload and inserts a `screening_jobs` row, then
+returns immediately.  Worker processes claim queued rows, run the ML analysis
+and write the ScreeningLog row and the job result in a single transaction,
+so a job is never reported done without its log.  The row's SHAP chart (SVG)
+goes into the artifact blob store (blobs.py) and the row keeps its key.
+
+The queue lives in the application database (Postgres, or SQLite locally).
+A worker claims a job with a compare-and-set UPDATE (queued → running); the
+UPDATE succeeds for exactly one worker on both backends, so no broker or
+row-lock dialect features are needed.  While it analyses, the worker
+refreshes the job's heartbeat_at; a running job without a heartbeat for
+ML_JOB_TIMEOUT_SECONDS is presumed lost and requeued.  A worker only writes
+its result while it still owns the job (worker_id and status unchanged), so a
+requeued job is never finished twice.
+
+Chunked uploads (POST /api/screening/uploads) are queued as soon as the
+upload starts, but only claimable once there is work: the upload is complete,
+ML_UPLOAD_STEP_MB arrived since the last pass, or chunks paused for
+ML_UPLOAD_IDLE_SECONDS with something new.  A pass over an incomplete upload
+is a short job — it analyses the newly completed part of the file
+(ml/incremental.py), saves the analysis state next to the upload and returns
+the job to the queue — so no worker waits on a client's network.  The result
+is ready shortly after the last chunk.
+
+A whole-file upload whose content hash matches a finished screening from the
+same pipeline version is not analysed again: find_duplicate() /
+reuse_result() answer it from the stored result straight away.  Chunked
+uploads are hashed when their analysis finishes, so they are matched too.
+
+After every job a worker writes its stage-timing histograms (ml/metrics.py)
+to ML_METRICS_DIR; GET /metrics merges them with the API process's own.
+
+Workers start with the API (ML_JOB_WORKERS > 0) or standalone:
+
+    python screening_jobs.py --workers 2
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+import blobs
+import charts
+from config import settings
+from database import SessionLocal
+from models import JobStatusEnum, ScreeningJob, ScreeningLog, hash_child_id
+
+# Add ML root to path so ml.screening can be imported
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Retry-After when no finished job tells how long one takes
+DEFAULT_JOB_SECONDS = 30
+RETRY_AFTER_MAX     = 300
+
+UPLOAD_DIR  = Path(settings.ML_JOB_UPLOAD_DIR or Path(__file__).resolve().parent / ".job_uploads")
+METRICS_DIR = Path(settings.ML_METRICS_DIR or Path(__file__).resolve().parent / ".metrics")
+
+
+class QueueFull(Exception):
+    """Raised when ML_JOB_QUEUE_MAX jobs are already pending; see retry_after_seconds()."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Screening queue is full (retry in {retry_after}s)")
+        self.retry_after = retry_after
+
+
+# ── Analysis (runs inside a worker) ───────────────────────────────────────────
+
+def pipeline_version() -> Optional[str]:
+    """
+    What a result depends on besides the video: feature pipeline, backbone,
+    inference backend and quality gate.  None without the ML package (its
+    placeholder results are never reused).
+    """
+    try:
+        from ml.cache import PIPELINE_VERSION
+    except ImportError:
+        return None
+    return "/".join([
+        f"features-{PIPELINE_VERSION}",
+        os.environ.get("NEUROTHRIVE_VIDEO_BACKBONE", "vgg16"),
+        os.environ.get("NEUROTHRIVE_VIDEO_BACKEND", "auto"),
+        f"gate-{settings.ML_QUALITY_GATE_MIN_FACE_RATIO:g}-{settings.ML_QUALITY_GATE_SAMPLES}"
+        f"-{settings.ML_QUALITY_GATE_SECONDS:g}",
+    ])
+
+
+def quality_gate():
+    """QualityGate from settings, or None when the gate is disabled."""
+    from ml.screening import QualityGate
+    if settings.ML_QUALITY_GATE_MIN_FACE_RATIO <= 0:
+        return None
+    return QualityGate(
+        min_face_ratio = settings.ML_QUALITY_GATE_MIN_FACE_RATIO,
+        samples        = settings.ML_QUALITY_GATE_SAMPLES,
+        seconds        = settings.ML_QUALITY_GATE_SECONDS or None,
+    )
+
+
+def _incremental():
+    from ml.incremental import IncrementalAnalysis
+    return IncrementalAnalysis(quality_gate=quality_gate(), step_bytes=1)
+
+
+def _state_path(video_path: str) -> str:
+    return f"{video_path}.state"
+
+
+def analyze_pass(video_path: str, received: int) -> bool:
+    """
+    One incremental pass over a chunked upload still arriving: analyse what
+    became complete in its first `received` bytes, continuing from (and
+    saving) the state of earlier passes.  True when the quality gate already
+    rejects the video — the job can finish without the rest.
+    """
+    try:
+        analysis = _incremental()
+    except ImportError:
+        return False          # placeholder analysis once the upload is complete
+    analysis.restore(_state_path(video_path))
+    # claim_next only hands out uploads with enough new data
+    analysis.feed(video_path, received, force=True)
+    analysis.save(_state_path(video_path))
+    return analysis.rejected
+
+
+def analyze_upload(
+    video_path: str,
+    sha256:     Optional[str] = None,
+    chunked:    bool          = False,
+) -> tuple[dict, Optional[str]]:
+    """
+    ML analysis of a stored upload: (API-ready dict, the upload's content
+    hash).  `chunked`: finish the incremental analysis of a chunked upload
+    (see analyze_pass).  `sha256` is the hash, when already known; chunked
+    uploads get theirs here, read once with the analysis.
+    """
+    # Imported lazily so the API starts even without ML deps
+    try:
+        from ml.cache import file_sha256
+        from ml.screening import analyze_video_with_explainability
+        if not chunked:
+            sha256 = sha256 or file_sha256(video_path)
+            out = analyze_video_with_explainability(
+                video_path, quality_gate=quality_gate(), video_sha256=sha256,
+            )
+        else:
+            analysis = _incremental()
+            analysis.restore(_state_path(video_path))
+            out    = analysis.finish_with_explainability(video_path)
+            sha256 = analysis.sha256
+    except ImportError:
+        # ML not installed — return a placeholder for dev/testing
+        out = {
+            "risk": 0.0,
+            "indicators": {},
+            "gaze_metrics": {},
+            "shap_importance": {},
+            "_ml_unavailable": True,
+        }
+
+    # Rejected by the quality gate: run_job persists nothing for these
+    if out.get("details", {}).get("status") == "insufficient_quality":
+        out["status"] = "insufficient_quality"
+        out["error"]  = out["details"]["error"]
+    return out, sha256
+
+
+def metrics_text() -> str:
+    """Prometheus exposition of stage timings across the API and worker processes."""
+    try:
+        from ml.metrics import collect, prometheus
+    except ImportError:
+        return ""
+    return prometheus(collect(METRICS_DIR))
+
+
+def save_screening(
+    db:       Session,
+    out:      dict,
+    user_id:  Optional[int],
+    filename: Optional[str],
+    sha256:   Optional[str] = None,
+) -> ScreeningLog:
+    """Add the ScreeningLog row for an analysis result (caller commits)."""
+    score_features = out.get("details", {}).get("score_features")
+    importance     = out.get("shap_importance", {})
+    log = ScreeningLog(
+        clinician_user_id = user_id,
+        # The video's content hash when known; names are neither unique nor stable
+        video_path_hashed = sha256 or hash_child_id(filename or "unknown"),
+        risk_score        = float(out.get("risk", 0.0)),
+        indicators_json   = json.dumps(out.get("indicators", {})),
+        shap_json         = json.dumps(importance),
+        features_json     = json.dumps(score_features) if score_features else None,
+        heatmap_sha256    = _store_heatmap(importance),
+        consent_given     = True,
+    )
+    db.add(log)
+    db.flush()
+    return log
+
+
+def _store_heatmap(importance: dict) -> Optional[str]:
+    """Blob-store key of the SHAP chart (SVG), None when there is nothing to plot."""
+    chart = charts.render(importance, "svg")
+    if chart is None:
+        return None
+    try:
+        return blobs.blob_store().put_object(chart.body, chart.media_type).key
+    except OSError as e:
+        # GET /heatmap renders the chart on demand instead
+        print(f"[jobs] heatmap not stored: {e}")
+        return None
+
+
+def _to_json(out: dict) -> str:
+    # numpy arrays / scalars (e.g. details["trajectories"]) → plain lists / floats
+    return json.dumps(out, default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+
+
+# ── Queue operations ──────────────────────────────────────────────────────────
+
+def store_upload(data: bytes, ext: str) -> str:
+    """Write an upload where workers can read it; returns its path."""
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = UPLOAD_DIR / f"{uuid.uuid4().hex}.{ext}"
+    path.write_bytes(data)
+    return str(path)
+
+
+def pending_count(db: Session) -> int:
+    return (
+        db.query(ScreeningJob)
+        .filter(ScreeningJob.status.in_([JobStatusEnum.queued, JobStatusEnum.running]))
+        .count()
+    )
+
+
+def retry_after_seconds(db: Session) -> int:
+    """Expected wait for a free queue slot: recent mean job time / workers."""
+    recent = (
+        db.query(ScreeningJob.started_at, ScreeningJob.finished_at)
+        .filter(ScreeningJob.status == JobStatusEnum.done, ScreeningJob.started_at.isnot(None))
+        .order_by(ScreeningJob.finished_at.desc())
+        .limit(20)
+        .all()
+    )
+    seconds = [(finished - started).total_seconds() for started, finished in recent]
+    mean    = sum(seconds) / len(seconds) if seconds else DEFAULT_JOB_SECONDS
+    return max(1, min(RETRY_AFTER_MAX, math.ceil(mean / max(1, settings.ML_JOB_WORKERS))))
+
+
+def check_capacity(db: Session) -> None:
+    """Raise QueueFull when ML_JOB_QUEUE_MAX jobs are pending."""
+    if pending_count(db) >= settings.ML_JOB_QUEUE_MAX:
+        raise QueueFull(retry_after_seconds(db))
+
+
+def enqueue(
+    db:          Session,
+    upload_path: str,
+    filename:    Optional[str],
+    user_id:     Optional[int],
+    chunked:     bool          = False,
+    upload_size: Optional[int] = None,
+    sha256:      Optional[str] = None,
+) -> ScreeningJob:
+    """
+    Insert a queued job; raises QueueFull when ML_JOB_QUEUE_MAX jobs are pending.
+    `chunked`: the upload is still to arrive via record_chunk().
+    `sha256`: content hash computed while receiving (spares the worker a re-read).
+    """
+    check_capacity(db)
+    job = ScreeningJob(
+        status            = JobStatusEnum.queued,
+        clinician_user_id = user_id,
+        upload_path       = upload_path,
+        filename          = filename,
+        upload_complete   = not chunked,
+        upload_size       = upload_size,
+        bytes_received    = 0 if chunked else upload_size or 0,
+        upload_sha256     = sha256,
+        last_chunk_at     = datetime.utcnow() if chunked else None,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def find_duplicate(db: Session, sha256: str) -> Optional[ScreeningJob]:
+    """The latest finished screening of the same video bytes and pipeline version, if any."""
+    version = pipeline_version()
+    if version is None:
+        return None
+    return (
+        db.query(ScreeningJob)
+        .filter(
+            ScreeningJob.upload_sha256    == sha256,
+            ScreeningJob.pipeline_version == version,
+            ScreeningJob.status           == JobStatusEnum.done,
+            ScreeningJob.screening_log_id.isnot(None),
+        )
+        .order_by(ScreeningJob.id.desc())
+        .first()
+    )
+
+
+def reuse_result(
+    db:       Session,
+    source:   ScreeningJob,
+    filename: Optional[str],
+    user_id:  Optional[int],
+) -> ScreeningJob:
+    """
+    A finished job for a repeat upload, answered from `source`'s stored result:
+    the submitter gets their own ScreeningLog row and job, no ML runs.
+    """
+    out = json.loads(source.result_json)
+    log = save_screening(db, out, user_id, filename, source.upload_sha256)
+    out["screening_log_id"] = log.id
+    out["heatmap_url"]      = f"/api/screening/{log.id}/heatmap"
+    out["reused_from_job"]  = source.id
+    now = datetime.utcnow()
+    job = ScreeningJob(
+        status            = JobStatusEnum.done,
+        clinician_user_id = user_id,
+        upload_path       = "",          # nothing stored: the upload was discarded
+        filename          = filename,
+        upload_sha256     = source.upload_sha256,
+        upload_size       = source.upload_size,
+        bytes_received    = source.bytes_received,
+        pipeline_version  = source.pipeline_version,
+        screening_log_id  = log.id,
+        result_json       = _to_json(out),
+        started_at        = now,
+        finished_at       = now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+async def receive_chunk(upload_path: str, body, length: int) -> tuple[str, int]:
+    """
+    Stream a chunk's request body to a temp file next to its upload (at most
+    `length` bytes of it).  Returns (temp path, the body's actual size); see
+    place_chunk / discard_chunk.
+    """
+    part = f"{upload_path}.{uuid.uuid4().hex}.part"
+    size = 0
+    try:
+        with open(part, "wb") as f:
+            async for block in body:
+                if size < length:
+                    # Disk writes stay off the event loop
+                    await run_in_threadpool(f.write, block[: length - size])
+                size += len(block)
+    except BaseException:
+        discard_chunk(part)
+        raise
+    return part, size
+
+
+def discard_chunk(part: str) -> None:
+    if os.path.exists(part):
+        os.unlink(part)
+
+
+def record_chunk(db: Session, job_id: int, start: int, end: int, total: Optional[int]) -> bool:
+    """
+    Reserve bytes `start`..`end` of a chunked upload for one request, before
+    any of them reach the file.  Compare-and-set like claim_next: False when
+    a concurrent request already moved the offset (its chunk wins, ours is
+    discarded unwritten).
+    """
+    values = {
+        ScreeningJob.bytes_received: end,
+        ScreeningJob.last_chunk_at:  datetime.utcnow(),
+    }
+    if total is not None:
+        values[ScreeningJob.upload_size] = total
+    updated = (
+        db.query(ScreeningJob)
+        .filter(
+            ScreeningJob.id == job_id,
+            ScreeningJob.bytes_received == start,
+            ScreeningJob.upload_complete.is_(False),
+            ScreeningJob.status.in_([JobStatusEnum.queued, JobStatusEnum.running]),
+        )
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return bool(updated)
+
+
+def place_chunk(
+    db:          Session,
+    job_id:      int,
+    upload_path: str,
+    part:        str,
+    start:       int,
+    end:         int,
+    total:       Optional[int],
+) -> None:
+    """
+    Copy a chunk reserved by record_chunk from its temp file into the upload,
+    then mark the upload complete when it was the last one.  Workers read
+    only what is on disk, so a chunk still being copied is never analysed
+    half-written as complete.  On failure the reservation is undone.
+    """
+    try:
+        with open(part, "rb") as src, open(upload_path, "r+b") as dst:
+            dst.seek(start)
+            for block in iter(lambda: src.read(1 << 20), b""):
+                dst.write(block)
+    except BaseException:
+        with open(upload_path, "r+b") as dst:
+            dst.truncate(start)
+        db.query(ScreeningJob).filter(
+            ScreeningJob.id == job_id, ScreeningJob.bytes_received == end,
+        ).update({ScreeningJob.bytes_received: start}, synchronize_session=False)
+        db.commit()
+        raise
+    finally:
+        discard_chunk(part)
+    if end == total:
+        db.query(ScreeningJob).filter(ScreeningJob.id == job_id).update(
+            {ScreeningJob.upload_complete: True}, synchronize_session=False)
+        db.commit()
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[int]:
+    """Claim the oldest queued job with work to do; None when there is none."""
+    # A chunked upload still arriving is only worth a pass once enough is new
+    step        = int(settings.ML_UPLOAD_STEP_MB * (1 << 20))
+    idle_cutoff = datetime.utcnow() - timedelta(seconds=settings.ML_UPLOAD_IDLE_SECONDS)
+    while True:
+        job_id = (
+            db.query(ScreeningJob.id)
+            .filter(
+                ScreeningJob.status == JobStatusEnum.queued,
+                or_(ScreeningJob.upload_complete.is_(True),
+                    ScreeningJob.bytes_received >= ScreeningJob.analysed_upto + step,
+                    and_(ScreeningJob.bytes_received > ScreeningJob.analysed_upto,
+                         ScreeningJob.last_chunk_at < idle_cutoff)),
+            )
+            .order_by(ScreeningJob.created_at, ScreeningJob.id)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+        claimed = (
+            db.query(ScreeningJob)
+            .filter(ScreeningJob.id == job_id, ScreeningJob.status == JobStatusEnum.queued)
+            .update({
+                ScreeningJob.status:       JobStatusEnum.running,
+                ScreeningJob.worker_id:    worker_id,
+                ScreeningJob.started_at:   datetime.utcnow(),
+                ScreeningJob.heartbeat_at: datetime.utcnow(),
+                ScreeningJob.attempts:     ScreeningJob.attempts + 1,
+            }, synchronize_session=False)
+        )
+        db.commit()
+        if claimed:
+            return job_id
+        # Another worker won the race — try the next job
+
+
+def requeue_stale(db: Session) -> int:
+    """
+    Return jobs whose worker died mid-analysis to the queue (or fail them),
+    and fail chunked uploads abandoned for ML_UPLOAD_EXPIRE_SECONDS.
+    """
+    now    = datetime.utcnow()
+    cutoff = now - timedelta(seconds=settings.ML_JOB_TIMEOUT_SECONDS)
+    abandoned = (
+        db.query(ScreeningJob)
+        .filter(
+            ScreeningJob.status == JobStatusEnum.queued,
+            ScreeningJob.upload_complete.is_(False),
+            ScreeningJob.last_chunk_at < now - timedelta(seconds=settings.ML_UPLOAD_EXPIRE_SECONDS),
+        )
+        .all()
+    )
+    for job in abandoned:
+        job.status      = JobStatusEnum.failed
+        job.error       = "Upload abandoned before the last chunk"
+        job.finished_at = now
+        _remove_upload(job.upload_path)
+
+    # Live workers refresh heartbeat_at (see _Heartbeat), however long the job
+    stale  = (
+        db.query(ScreeningJob)
+        .filter(
+            ScreeningJob.status == JobStatusEnum.running,
+            or_(ScreeningJob.heartbeat_at < cutoff,
+                and_(ScreeningJob.heartbeat_at.is_(None), ScreeningJob.started_at < cutoff)),
+        )
+        .all()
+    )
+    for job in stale:
+        if job.attempts >= settings.ML_JOB_MAX_ATTEMPTS:
+            job.status      = JobStatusEnum.failed
+            job.error       = "Worker timed out"
+            job.finished_at = datetime.utcnow()
+            _remove_upload(job.upload_path)
+        else:
+            job.status = JobStatusEnum.queued
+        # The lost worker no longer owns it: its late result is discarded
+        job.worker_id    = None
+        job.started_at   = None
+        job.heartbeat_at = None
+    db.commit()
+    return len(stale)
+
+
+def _remove_upload(path: str) -> None:
+    """Delete an upload with its incremental-analysis sidecars and stray chunk temps."""
+    if not path:
+        return
+    stray = Path(path).parent.glob(f"{Path(path).name}.*.part")
+    for p in (path, _state_path(path), f"{path}.pass", *stray):
+        if os.path.exists(p):
+            os.unlink(p)
+
+
+class _Heartbeat:
+    """Refresh a claimed job's heartbeat_at every ML_JOB_HEARTBEAT_SECONDS (background thread)."""
+
+    def __init__(self, job_id: int, worker_id: str):
+        self.job_id    = job_id
+        self.worker_id = worker_id
+        self._stop     = threading.Event()
+        self._thread   = threading.Thread(target=self._run, name=f"heartbeat-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.ML_JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                db.query(ScreeningJob).filter(
+                    ScreeningJob.id        == self.job_id,
+                    ScreeningJob.worker_id == self.worker_id,
+                    ScreeningJob.status    == JobStatusEnum.running,
+                ).update({ScreeningJob.heartbeat_at: datetime.utcnow()},
+                         synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                print(f"[jobs] job {self.job_id}: heartbeat failed: {e}")
+            finally:
+                db.close()
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _finish(db: Session, job_id: int, worker_id: str, values: dict) -> bool:
+    """
+    Write a job's outcome (with anything else pending in `db`) only if
+    `worker_id` still owns it; otherwise roll back and return False.
+    """
+    updated = (
+        db.query(ScreeningJob)
+        .filter(
+            ScreeningJob.id        == job_id,
+            ScreeningJob.worker_id == worker_id,
+            ScreeningJob.status    == JobStatusEnum.running,
+        )
+        .update(values, synchronize_session=False)
+    )
+    if not updated:
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+def run_job(job_id: int, worker_id: str) -> None:
+    """Analyse a job claimed by `worker_id`; the ScreeningLog and 'done' status commit together."""
+    db = SessionLocal()
+    try:
+        job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+        if job is None or job.worker_id != worker_id:
+            return
+        upload_path = job.upload_path
+        try:
+            if not job.upload_complete:
+                # Reserved chunks may still be on their way into the file
+                received = min(job.bytes_received, os.path.getsize(upload_path))
+                with _Heartbeat(job_id, worker_id):
+                    rejected = analyze_pass(upload_path, received)
+                if not rejected:
+                    # Back to the queue (not an attempt) until more chunks arrive
+                    if _finish(db, job_id, worker_id, {
+                        ScreeningJob.status:        JobStatusEnum.queued,
+                        ScreeningJob.worker_id:     None,
+                        ScreeningJob.started_at:    None,
+                        ScreeningJob.heartbeat_at:  None,
+                        ScreeningJob.attempts:      ScreeningJob.attempts - 1,
+                        ScreeningJob.analysed_upto: received,
+                    }):
+                        print(f"[jobs] job {job_id} analysed {received} bytes of the upload")
+                    return
+            with _Heartbeat(job_id, worker_id):
+                # Chunked uploads finish the incremental analysis of earlier passes
+                out, sha256 = analyze_upload(upload_path, job.upload_sha256,
+                                             chunked=os.path.exists(_state_path(upload_path)))
+            # Chunked uploads are hashed only now; find_duplicate() matches on it
+            values = {ScreeningJob.status: JobStatusEnum.done, ScreeningJob.upload_sha256: sha256}
+            if out.get("status") != "insufficient_quality":
+                log = save_screening(db, out, job.clinician_user_id, job.filename, sha256)
+                out["screening_log_id"]  = log.id
+                out["saved_to_database"] = True
+                # SVG stored by save_screening(); other formats rendered on request
+                out["heatmap_url"]       = f"/api/screening/{log.id}/heatmap"
+                values[ScreeningJob.screening_log_id] = log.id
+            else:
+                out["saved_to_database"] = False
+            values[ScreeningJob.result_json] = _to_json(out)
+            if not out.get("_ml_unavailable"):
+                values[ScreeningJob.pipeline_version] = pipeline_version()
+        except Exception as e:
+            db.rollback()
+            values = {
+                ScreeningJob.status: JobStatusEnum.failed,
+                ScreeningJob.error:  f"{type(e).__name__}: {e}",
+            }
+        values[ScreeningJob.finished_at] = datetime.utcnow()
+        if not _finish(db, job_id, worker_id, values):
+            # Requeued while we ran (missed heartbeats): the new owner reports it
+            print(f"[jobs] job {job_id} no longer ours — result discarded")
+            return
+        print(f"[jobs] job {job_id} {values[ScreeningJob.status].value} "
+              f"(log {values.get(ScreeningJob.screening_log_id)})")
+        _remove_upload(upload_path)
+    finally:
+        db.close()
+
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+
+def worker_main(stop, poll_seconds: float) -> None:
+    """Worker process loop: claim → analyse → repeat until `stop` is set."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        from ml.screening import warm_up_models
+        warm_up_models()
+    except ImportError:
+        pass
+
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            job_id = claim_next(db, worker_id)
+            if job_id is None:
+                requeue_stale(db)
+        except Exception as e:
+            print(f"[jobs] {worker_id}: queue error: {e}")
+            job_id = None
+        finally:
+            db.close()
+
+        if job_id is None:
+            stop.wait(poll_seconds)
+        else:
+            run_job(job_id, worker_id)
+            _dump_metrics(worker_id)
+
+
+def _dump_metrics(worker_id: str) -> None:
+    try:
+        from ml.metrics import metrics
+        metrics.dump(METRICS_DIR / f"{worker_id.replace(':', '-')}.json")
+    except (ImportError, OSError) as e:
+        print(f"[jobs] {worker_id}: metrics not written: {e}")
+
+
+class WorkerPool:
+    """ML_JOB_WORKERS worker processes polling the job table."""
+
+    def __init__(self, workers: int, poll_seconds: float = 1.0):
+        self.workers      = workers
+        self.poll_seconds = poll_seconds
+        # spawn: workers must not inherit the API's DB connections / model state
+        self._ctx   = multiprocessing.get_context("spawn")
+        self._stop  = self._ctx.Event()
+        self._procs: list = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            proc = self._ctx.Process(
+                target=worker_main, args=(self._stop, self.poll_seconds),
+                name=f"screening-worker-{i}", daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+        print(f"[jobs] started {self.workers} screening worker(s)")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask workers to exit after their current job; terminate stragglers."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for proc in self._procs:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run screening job workers")
+    parser.add_argument("--workers", type=int, default=max(1, settings.ML_JOB_WORKERS))
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers, settings.ML_JOB_POLL_SECONDS)
+    pool.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
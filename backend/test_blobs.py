@@ -0,0 +1,101 @@
+"""
+Screening artifact blob store (blobs.py): Range parsing, the local store, and
+the charts new screenings keep in it.
+"""
+
+import hashlib
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import blobs
+from blobs import BlobNotFound, LocalBlobStore, is_key, parse_range
+from models import Base, User
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None,             None),
+    ("",               None),
+    ("bytes=0-99",     (0, 99)),
+    ("bytes=100-",     (100, 999)),
+    ("bytes=-100",     (900, 999)),      # suffix: the last 100 bytes
+    ("bytes=-5000",    (0, 999)),        # suffix longer than the object
+    ("bytes=990-5000", (990, 999)),      # end clamped to the object
+    (" bytes=5-5 ",    (5, 5)),
+    ("bytes=0-1,5-9",  None),            # multi-range: whole object
+    ("items=0-10",     None),
+    ("bytes=-",        None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1001", "bytes=50-10", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError, match=r"bytes \*/1000"):
+        parse_range(header, 1000)
+
+
+def test_store_is_content_addressed(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    body  = bytes(range(256)) * 4096            # several stream chunks
+    info  = store.put_object(body, "image/png")
+    assert info.key == hashlib.sha256(body).hexdigest() and is_key(info.key)
+    assert info.etag == f'"{info.key}"'
+    assert store.put_object(body, "image/png") == info          # stored once
+    assert store.head_object(info.key).content_type == "image/png"
+    assert b"".join(store.get_object(info.key)) == body
+    assert b"".join(store.get_object(info.key, 10, 19)) == body[10:20]
+    assert b"".join(store.get_object(info.key, len(body) - 3)) == body[-3:]
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".put-")] == []
+
+    store.delete_object(info.key)
+    with pytest.raises(BlobNotFound):
+        store.head_object(info.key)
+
+
+def test_store_rejects_non_keys(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    for key in ("../../etc/passwd", "ABC", "0" * 63):
+        with pytest.raises(BlobNotFound):
+            store.get_object(key)
+
+
+# ── Screening charts ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobs, "blob_store", lambda: LocalBlobStore(tmp_path))
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_new_screening_stores_its_chart(db, tmp_path):
+    # Importing the worker module sets up the app's database engine (driver from requirements.txt)
+    jobs = pytest.importorskip("screening_jobs")
+    sr   = pytest.importorskip("routers.screening")
+    out  = {"risk": 0.4, "shap_importance": {"gaze": 0.2, "gesture": -0.1, "note": "x"}}
+    log  = jobs.save_screening(db, out, None, "a.webm", "ab" * 32)
+    db.commit()
+    info = LocalBlobStore(tmp_path).head_object(log.heatmap_sha256)
+    assert info.content_type == "image/svg+xml"
+    assert jobs.save_screening(db, out, None, "b.webm").heatmap_sha256 == info.key   # stored once
+
+    user = User(id=1, email="dr@x", full_name="Dr", hashed_password="x", role="clinician")
+    resp = sr.screening_heatmap(log.id, format="svg", if_none_match=None, db=db, current_user=user)
+    assert resp.headers["etag"] == info.etag
+    assert resp.body == b"".join(LocalBlobStore(tmp_path).get_object(info.key))
+    assert sr._artifact_keys(log) == {info.key}
+
+
+def test_screening_without_importances_stores_nothing(db, tmp_path):
+    jobs = pytest.importorskip("screening_jobs")
+    log  = jobs.save_screening(db, {"risk": 0.1, "shap_importance": {"note": "n/a"}}, None, "c.webm")
+    assert log.heatmap_sha256 is None
+    assert not tmp_path.exists() or not any(tmp_path.iterdir())
@@ -0,0 +1,90 @@
+"""
+Keyset pagination of GET /api/screening/history, on an in-memory SQLite DB.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Importing the router sets up the app's database engine (driver from requirements.txt)
+sr = pytest.importorskip("routers.screening")
+
+from models import Base, ScreeningLog, User  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(id=1, email="admin@x", full_name="Admin", hashed_password="x", role="admin"),
+        User(id=2, email="dr@x", full_name="Dr", hashed_password="x", role="clinician"),
+    ])
+    t0 = datetime(2026, 1, 1)
+    for i in range(23):
+        session.add(ScreeningLog(
+            # Pairs share a timestamp, so ties are broken by id
+            created_at        = t0 + timedelta(minutes=i // 2),
+            risk_score        = (i % 10) / 10,
+            clinician_user_id = 1 + i % 2,
+            indicators_json   = "{}",
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _pages(db, clinician_id=None, risk_band=None) -> list[list[int]]:
+    user   = db.get(User, 1)
+    pages  = []
+    cursor = None
+    while True:
+        page = sr.screening_history(limit=5, cursor=cursor, clinician_id=clinician_id,
+                                    patient_id=None, risk_band=risk_band, db=db,
+                                    current_user=user)
+        pages.append([item.id for item in page.screenings])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+def _expected(db, keep=lambda log: True) -> list[int]:
+    logs = sorted(db.query(ScreeningLog).all(), key=lambda l: (l.created_at, l.id), reverse=True)
+    return [log.id for log in logs if keep(log)]
+
+
+def test_cursor_round_trip():
+    when = datetime(2026, 3, 4, 5, 6, 7, 890)
+    assert sr._decode_cursor(sr._encode_cursor(when, 42)) == (when, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm8tc2VwYXJhdG9y", "eHx5"])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as err:
+        sr._decode_cursor(cursor)
+    assert err.value.status_code == 400
+
+
+def test_pages_cover_every_row_once_in_order(db):
+    pages = _pages(db)
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == _expected(db)
+
+
+def test_pages_with_filters(db):
+    pages = _pages(db, clinician_id=2, risk_band="high")
+    assert sum(pages, []) == _expected(
+        db, lambda log: log.clinician_user_id == 2 and log.risk_score > 0.7)
+
+
+def test_last_full_page_has_no_cursor(db):
+    user = db.get(User, 1)
+    page = sr.screening_history(limit=23, cursor=None, clinician_id=None, patient_id=None,
+                                risk_band=None, db=db, current_user=user)
+    assert page.count == 23 and page.next_cursor is None
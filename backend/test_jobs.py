@@ -0,0 +1,125 @@
+"""
+Compare-and-set updates of the job queue (screening_jobs.py): claiming jobs
+and reserving chunk ranges, with two sessions racing on one SQLite file.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Importing the worker module sets up the app's database engine (driver from requirements.txt)
+jobs = pytest.importorskip("screening_jobs")
+
+from models import Base, JobStatusEnum, ScreeningJob  # noqa: E402
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    make = sessionmaker(bind=engine)
+    a, b = make(), make()
+    yield a, b
+    a.close()
+    b.close()
+    engine.dispose()
+
+
+def _job(db, **fields) -> int:
+    job = ScreeningJob(upload_path="", **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def _interleave(db, action) -> None:
+    """Run `action` just before `db`'s next UPDATE, as a concurrent worker would."""
+    pending = [action]
+
+    @event.listens_for(db, "do_orm_execute")
+    def _before(state):
+        if state.is_update and pending:
+            pending.pop()()
+
+
+# ── claim_next ────────────────────────────────────────────────────────────────
+
+def test_claim_race_has_one_winner(sessions):
+    a, b  = sessions
+    first = _job(a)
+    _interleave(b, lambda: jobs.claim_next(a, "worker-a"))
+    assert jobs.claim_next(b, "worker-b") is None        # lost the only job
+    job = a.get(ScreeningJob, first)
+    assert (job.status, job.worker_id, job.attempts) == (JobStatusEnum.running, "worker-a", 1)
+
+
+def test_claim_race_loser_takes_next_job(sessions):
+    a, b          = sessions
+    first, second = _job(a), _job(a)
+    _interleave(b, lambda: jobs.claim_next(a, "worker-a"))
+    assert jobs.claim_next(b, "worker-b") == second
+    assert a.get(ScreeningJob, first).worker_id == "worker-a"
+
+
+def test_claim_waits_for_enough_new_bytes(sessions, monkeypatch):
+    a, _ = sessions
+    monkeypatch.setattr(jobs.settings, "ML_UPLOAD_STEP_MB", 1)
+    job = _job(a, upload_complete=False, bytes_received=1000, analysed_upto=0,
+               last_chunk_at=datetime.utcnow())
+    assert jobs.claim_next(a, "w") is None                # < 1 MB new, still arriving
+    a.query(ScreeningJob).update({ScreeningJob.last_chunk_at: datetime.utcnow() - timedelta(hours=1)})
+    a.commit()
+    assert jobs.claim_next(a, "w") == job                 # upload went idle
+
+
+# ── record_chunk / place_chunk ────────────────────────────────────────────────
+
+def test_record_chunk_stale_offset_loses(sessions):
+    a, b = sessions
+    job  = _job(a, upload_complete=False, bytes_received=0, upload_size=200)
+    assert jobs.record_chunk(a, job, 0, 100, 200)
+    assert not jobs.record_chunk(b, job, 0, 100, 200)     # same range, already reserved
+    assert not jobs.record_chunk(b, job, 50, 150, 200)
+    assert jobs.record_chunk(b, job, 100, 200, 200)
+    a.expire_all()
+    row = a.get(ScreeningJob, job)
+    assert (row.bytes_received, row.upload_complete) == (200, False)   # place_chunk marks it
+
+
+def test_record_chunk_refused_once_finished(sessions):
+    a, _ = sessions
+    job  = _job(a, upload_complete=False, bytes_received=0, status=JobStatusEnum.failed)
+    assert not jobs.record_chunk(a, job, 0, 100, None)
+
+
+def test_place_chunk_completes_upload(sessions, tmp_path):
+    a, _   = sessions
+    upload = tmp_path / "upload.webm"
+    upload.write_bytes(b"")
+    job = _job(a, upload_complete=False, bytes_received=0, upload_size=6)
+    for start, data in ((0, b"abc"), (3, b"def")):
+        part = tmp_path / f"{start}.part"
+        part.write_bytes(data)
+        assert jobs.record_chunk(a, job, start, start + 3, 6)
+        jobs.place_chunk(a, job, str(upload), str(part), start, start + 3, 6)
+        assert not part.exists()
+    a.expire_all()
+    assert upload.read_bytes() == b"abcdef"
+    assert a.get(ScreeningJob, job).upload_complete
+
+
+def test_place_chunk_failure_undoes_reservation(sessions, tmp_path):
+    a, _   = sessions
+    upload = tmp_path / "upload.webm"
+    upload.write_bytes(b"abc")
+    job = _job(a, upload_complete=False, bytes_received=3, upload_size=6)
+    assert jobs.record_chunk(a, job, 3, 6, 6)
+    with pytest.raises(OSError):
+        jobs.place_chunk(a, job, str(upload), str(tmp_path / "missing.part"), 3, 6, 6)
+    a.expire_all()
+    row = a.get(ScreeningJob, job)
+    assert (row.bytes_received, row.upload_complete) == (3, False)
+    assert upload.read_bytes() == b"abc"
+    assert jobs.record_chunk(a, job, 3, 6, 6)             # the client can retry the chunk
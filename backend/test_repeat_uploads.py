@@ -0,0 +1,66 @@
+"""
+POST /api/screening with a full queue: a repeat upload is still answered from
+its stored result, a new one is refused with 429.
+"""
+
+import hashlib
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Importing the router sets up the app's database engine (driver from requirements.txt)
+sr   = pytest.importorskip("routers.screening")
+jobs = pytest.importorskip("screening_jobs")
+
+from auth_utils import get_current_user  # noqa: E402
+from database import get_db  # noqa: E402
+from models import Base, JobStatusEnum, ScreeningJob, User  # noqa: E402
+
+VIDEO = b"\x1aE\xdf\xa3 not really a video"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    user = User(id=1, email="dr@x", full_name="Dr", hashed_password="x", role="clinician")
+    session.add(user)
+    session.add(ScreeningJob(
+        status           = JobStatusEnum.done,
+        upload_path      = "",
+        upload_sha256    = hashlib.sha256(VIDEO).hexdigest(),
+        pipeline_version = "test",
+        screening_log_id = 1,
+        result_json      = json.dumps({"risk": 0.3}),
+    ))
+    session.commit()
+    monkeypatch.setattr(jobs, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(jobs, "pipeline_version", lambda: "test")
+    monkeypatch.setattr(jobs.settings, "ML_JOB_QUEUE_MAX", 0)     # always full
+
+    app = FastAPI()
+    app.include_router(sr.router, prefix="/api/screening")
+    app.dependency_overrides[get_db]           = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    session.close()
+
+
+def test_repeat_upload_is_answered_when_queue_is_full(client, tmp_path):
+    resp = client.post("/api/screening", files={"file": ("again.webm", VIDEO)})
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "done" and resp.json()["result"]["risk"] == 0.3
+    assert not any(tmp_path.iterdir())                           # upload discarded
+
+
+def test_new_upload_is_refused_when_queue_is_full(client, tmp_path):
+    resp = client.post("/api/screening", files={"file": ("new.webm", VIDEO + b"!")})
+    assert resp.status_code == 429 and "retry-after" in resp.headers
+    assert not any(tmp_path.iterdir())
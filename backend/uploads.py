@@ -0,0 +1,165 @@
+"""
+Streaming upload reception
+──────────────────────────
+POST /api/screening parses its multipart body straight off the request
+stream: the video part is written to the job upload directory as it
+arrives and hashed (SHA-256) in the same pass, so an upload never sits in
+memory whole — peak memory per upload is one network chunk, whatever the
+file size.  That per-chunk work runs in the thread pool, so a large upload
+never stalls the event loop.
+
+Bodies larger than ML_UPLOAD_MAX_MB get 413: before anything is read when
+Content-Length says so, otherwise as soon as the limit is crossed.
+"""
+
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from config import settings
+
+# Multipart boundaries, part headers and small form fields on top of the video
+_ENVELOPE_BYTES = 64 * 1024
+
+
+def max_upload_bytes() -> int:
+    return int(settings.ML_UPLOAD_MAX_MB * (1 << 20))
+
+
+def too_large() -> HTTPException:
+    return HTTPException(413, f"Video exceeds the {settings.ML_UPLOAD_MAX_MB:g} MB upload limit")
+
+
+@dataclass
+class StoredUpload:
+    """A video written to the upload directory by receive_video()."""
+
+    path:     str
+    filename: str
+    size:     int
+    sha256:   str
+
+
+class _VideoPart:
+    """multipart callbacks: stream the `field` file part to disk, hashing as it goes."""
+
+    def __init__(self, field: str, upload_dir: Path, allowed_exts: set[str], max_bytes: int):
+        self.field        = field
+        self.upload_dir   = upload_dir
+        self.allowed_exts = allowed_exts
+        self.max_bytes    = max_bytes
+        self.header_name  = b""
+        self.headers: dict[bytes, bytes] = {}
+        self.file         = None
+        self.path: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.size         = 0
+        self.hash         = hashlib.sha256()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin":       self.on_part_begin,
+            "on_header_field":     self.on_header_field,
+            "on_header_value":     self.on_header_value,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data":        self.on_part_data,
+            "on_part_end":         self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self.headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.header_name = data[start:end].lower()
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.headers[self.header_name] = self.headers.get(self.header_name, b"") + data[start:end]
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name     = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        if name != self.field or filename is None or self.file is not None:
+            return
+        self.filename = filename.decode("utf-8", "replace")
+        ext = self.filename.rsplit(".", 1)[-1].lower()
+        if ext not in self.allowed_exts:
+            raise HTTPException(400, f"Unsupported format. Use: {', '.join(self.allowed_exts)}")
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.path = str(self.upload_dir / f"{uuid.uuid4().hex}.{ext}")
+        self.file = open(self.path, "wb")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self.file is None or self.file.closed:
+            return
+        self.size += end - start
+        if self.size > self.max_bytes:
+            raise too_large()
+        block = data[start:end]
+        self.file.write(block)
+        self.hash.update(block)
+
+    def on_part_end(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def discard(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            os.unlink(self.path)
+            self.file = self.path = None
+
+
+async def receive_video(
+    request:      Request,
+    upload_dir:   Path,
+    allowed_exts: set[str],
+    field:        str = "file",
+) -> StoredUpload:
+    """
+    Stream the `field` video of a multipart/form-data request to
+    `upload_dir`.  Raises HTTPException 400 (no / unsupported file) or 413.
+    """
+    max_bytes = max_upload_bytes()
+    length    = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes + _ENVELOPE_BYTES:
+        raise too_large()
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise HTTPException(400, "Expected a multipart/form-data upload")
+
+    part   = _VideoPart(field, upload_dir, allowed_exts, max_bytes)
+    parser = MultipartParser(options[b"boundary"], part.callbacks())
+    body   = 0
+    try:
+        async for chunk in request.stream():
+            body += len(chunk)
+            if body > max_bytes + _ENVELOPE_BYTES:
+                raise too_large()
+            # Parsing, hashing and the disk write run off the event loop
+            await run_in_threadpool(parser.write, chunk)
+        parser.finalize()
+        if part.file is not None and not part.file.closed:
+            raise HTTPException(400, "Upload ended before the end of the file")
+    except ValueError as e:   # python-multipart parse errors
+        part.discard()
+        raise HTTPException(400, f"Malformed multipart body: {e}")
+    except BaseException:
+        part.discard()
+        raise
+
+    if part.path is None:
+        raise HTTPException(400, f"No '{field}' file in the upload")
+    return StoredUpload(part.path, part.filename, part.size, part.hash.hexdigest())
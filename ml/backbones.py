@@ -0,0 +1,183 @@
+"""
+Pluggable frame-feature backbones for the video classifier.
+
+The LSTM head only sees one pooled feature vector per sampled frame, so the
+CNN producing those vectors can be swapped for a much cheaper one.  Each
+backbone needs its own LSTM head, trained with ml/train_video_head.py and
+stored next to the VGG16 files with the same naming and config conventions:
+
+    models/autism_data/<backbone>-lstm-config.npy    {"num_input_tokens", "nb_classes",
+                                                      "labels", "expected_frames",
+                                                      "backbone"}
+    models/autism_data/<backbone>-lstm-weights.h5
+
+Selected with NEUROTHRIVE_VIDEO_BACKBONE (default "vgg16": the original
+vgg16LSTMVideoClassifier files, loaded unchanged).
+
+Approximate cost per 224×224 frame (multiply-adds, ImageNet reference):
+
+    vgg16                 15.5 G    4096-d (fc2)
+    efficientnet_b0        0.39 G   1280-d
+    mobilenet_v2           0.30 G   1280-d
+    mobilenet_v3_small     0.06 G    576-d
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+DEFAULT_BACKBONE = "vgg16"
+INPUT_SIZE       = 224
+
+# LSTM head, as in vgg16LSTMVideoClassifier
+HIDDEN_UNITS = 512
+
+
+def _mobilenet_v2_preprocess(x: np.ndarray) -> np.ndarray:
+    # keras.applications.mobilenet_v2.preprocess_input ("tf" mode)
+    return x / 127.5 - 1.0
+
+
+def _identity(x: np.ndarray) -> np.ndarray:
+    # MobileNetV3 / EfficientNet rescale 0–255 RGB inside the model
+    return x
+
+
+# keras.applications.vgg16.preprocess_input ("caffe" mode) channel means
+_VGG_MEAN = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+
+def vgg16_preprocess(x: np.ndarray) -> np.ndarray:
+    """NumPy equivalent of keras.applications.vgg16.preprocess_input."""
+    return x[..., ::-1] - _VGG_MEAN
+
+
+@dataclass(frozen=True)
+class Backbone:
+    """One frame-feature CNN: how to build it and what it expects."""
+
+    name:        str
+    feature_dim: int
+    preprocess:  Callable[[np.ndarray], np.ndarray]
+    build:       Callable[[], object]   # → Keras model, (n, 224, 224, 3) → (n, feature_dim)
+    # The VGG16 head was trained on BGR frames; new heads use RGB
+    rgb:         bool = True
+
+
+def _build_keras_app(app: str, **kwargs) -> Callable[[], object]:
+    def build():
+        from tensorflow.keras import applications
+        return getattr(applications, app)(
+            include_top=False, weights="imagenet", pooling="avg",
+            input_shape=(INPUT_SIZE, INPUT_SIZE, 3), **kwargs,
+        )
+    return build
+
+
+def _build_vgg16():
+    from tensorflow.keras import Model, applications
+    base = applications.VGG16(include_top=True, weights="imagenet")
+    return Model(base.input, base.layers[-2].output)   # fc2
+
+
+BACKBONES: dict[str, Backbone] = {
+    b.name: b for b in (
+        Backbone("vgg16",              4096, vgg16_preprocess,         _build_vgg16, rgb=False),
+        Backbone("efficientnet_b0",    1280, _identity,                _build_keras_app("EfficientNetB0")),
+        Backbone("mobilenet_v2",       1280, _mobilenet_v2_preprocess, _build_keras_app("MobileNetV2")),
+        Backbone("mobilenet_v3_small",  576, _identity,
+                 _build_keras_app("MobileNetV3Small", minimalistic=False)),
+    )
+}
+
+
+def get_backbone(name: str) -> Backbone:
+    try:
+        return BACKBONES[name]
+    except KeyError:
+        raise ValueError(f"Unknown backbone '{name}' (choose from {sorted(BACKBONES)})") from None
+
+
+def selected_backbone() -> str:
+    """Backbone name configured for this process (NEUROTHRIVE_VIDEO_BACKBONE)."""
+    name = os.environ.get("NEUROTHRIVE_VIDEO_BACKBONE", DEFAULT_BACKBONE)
+    get_backbone(name)
+    return name
+
+
+def backbone_model(predictor):
+    """The frame-feature model of any classifier (vgg16LSTMVideoClassifier names it vgg16_model)."""
+    return getattr(predictor, "backbone_model", None) or predictor.vgg16_model
+
+
+def head_paths(model_dir: Path, name: str) -> tuple[Path, Path]:
+    """(config.npy, weights.h5) of the LSTM head trained on `name` features."""
+    return (
+        Path(model_dir) / f"{name}-lstm-config.npy",
+        Path(model_dir) / f"{name}-lstm-weights.h5",
+    )
+
+
+def build_lstm_head(num_input_tokens: int, nb_classes: int):
+    """The vgg16LSTMVideoClassifier head architecture over any feature width."""
+    from tensorflow.keras import Sequential
+    from tensorflow.keras.layers import LSTM, Activation, Dense, Dropout
+
+    model = Sequential([
+        LSTM(HIDDEN_UNITS, input_shape=(None, num_input_tokens),
+             return_sequences=False, dropout=0.5),
+        Dense(512, activation="relu"),
+        Dropout(0.5),
+        Dense(nb_classes),
+        Activation("softmax"),
+    ])
+    model.compile(loss="categorical_crossentropy", optimizer="rmsprop", metrics=["accuracy"])
+    return model
+
+
+class BackboneFeatures:
+    """
+    Just the frame-feature half: what screening.VGG16FeatureConsumer needs
+    (``backbone_model`` / ``preprocess_input`` / ``rgb``).  Used on its own
+    to extract training features.
+    """
+
+    def __init__(self, backbone: Backbone):
+        self.backbone         = backbone.name
+        self.backbone_model   = backbone.build()
+        self.preprocess_input = backbone.preprocess
+        self.rgb              = backbone.rgb
+
+
+class BackboneLSTMClassifier(BackboneFeatures):
+    """
+    LSTM head over a lightweight backbone.  Exposes the attributes the
+    screening pipeline reads from vgg16LSTMVideoClassifier.
+    """
+
+    def __init__(self, backbone: Backbone, config: dict, weight_path: Path):
+        super().__init__(backbone)
+        self.num_input_tokens = int(config["num_input_tokens"])
+        self.nb_classes       = int(config["nb_classes"])
+        self.expected_frames  = int(config["expected_frames"])
+        self.labels           = config["labels"]
+        self.labels_idx2word  = {idx: word for word, idx in self.labels.items()}
+        self.model            = build_lstm_head(self.num_input_tokens, self.nb_classes)
+        self.model.load_weights(str(weight_path))
+
+
+def load_classifier(model_dir: Path, name: str) -> Optional[BackboneLSTMClassifier]:
+    """The `name` backbone + its trained head, or None when files / TensorFlow are missing."""
+    config_path, weight_path = head_paths(model_dir, name)
+    if not config_path.exists() or not weight_path.exists():
+        return None
+    try:
+        config = np.load(config_path, allow_pickle=True).item()
+        return BackboneLSTMClassifier(get_backbone(name), config, weight_path)
+    except ImportError:
+        return None
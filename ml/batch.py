@@ -0,0 +1,220 @@
+"""
+Batch screening over many videos (research re-runs of archived clips).
+
+Fans the videos out over a process pool — each worker loads its models once
+and keeps them warm — and streams one JSON line per video to the output file
+as soon as it finishes:
+
+    {"path": "/data/clips/a.mp4", "status": "ok", "risk_score": 0.41,
+     "video_model_prob": 0.38, "face_detection_ratio": 0.92,
+     "indicators": {...}, "gaze_metrics": {...}, "details": {..., "timings": {...}},
+     "seconds": 3.2}
+
+Failed videos are written with "status": "error" and an "error" message.
+Re-running with the same output file skips every video already recorded
+there (except errors, which are retried), so a crashed run resumes where it
+stopped.
+
+    python -m ml.screening data/clips/ "archive/**/*.avi" --out results.jsonl --workers 4
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# Futures in flight per worker: keeps the pool busy without queueing thousands
+_IN_FLIGHT_PER_WORKER = 2
+
+
+def discover(inputs: Iterable[str]) -> list[str]:
+    """Video files named by paths, directories (recursive) or glob patterns."""
+    found: dict[str, None] = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = [str(p) for p in path.rglob("*")]
+        elif any(c in item for c in "*?["):
+            matches = glob.glob(item, recursive=True)
+        else:
+            matches = [item]
+        for m in sorted(matches):
+            p = Path(m)
+            if p.is_file() and (p.suffix.lower() in VIDEO_EXTENSIONS or m == item):
+                found.setdefault(str(p.resolve()), None)
+    return list(found)
+
+
+def completed(out_path: Path) -> set[str]:
+    """Paths already recorded in a JSONL output (error records excluded)."""
+    done: set[str] = set()
+    if not out_path.exists():
+        return done
+    with open(out_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue   # line cut short by a crash
+            if record.get("status") != "error":
+                done.add(record["path"])
+    return done
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+def _init_worker() -> None:
+    from ml.screening import warm_up_models
+    warm_up_models()
+
+
+def _analyze_one(path: str, kwargs: dict) -> dict:
+    """One JSONL record for `path`; never raises."""
+    from ml.screening import analyze_video
+
+    t0 = time.perf_counter()
+    try:
+        result = analyze_video(path, **kwargs)
+    except Exception as e:
+        return {
+            "path":    path,
+            "status":  "error",
+            "error":   f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+
+    details = {k: v for k, v in result.details.items() if k != "trajectories"}
+    status  = details.get("status", "ok")
+    record  = {
+        "path":                 path,
+        "status":               status,
+        "risk_score":           result.risk_score,
+        "video_model_prob":     result.video_model_prob,
+        "face_detection_ratio": result.face_detection_ratio,
+        "indicators":           result.indicators,
+        "gaze_metrics":         result.gaze_metrics,
+        "details":              details,
+        "seconds":              round(time.perf_counter() - t0, 3),
+    }
+    # An unreadable file still scores (all-zero signals); flag it so it is retried
+    if status == "ok" and details.get("sampling", {}).get("frames_processed") == 0:
+        record["status"] = "error"
+        record["error"]  = "No frames could be decoded"
+    return record
+
+
+def _json_line(record: dict) -> str:
+    # numpy scalars / arrays → plain floats / lists
+    return json.dumps(record, default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def iter_results(paths: list[str], workers: int = 1, **kwargs) -> Iterator[dict]:
+    """Analyse `paths`, yielding records in completion order."""
+    if workers <= 1:
+        _init_worker()
+        for path in paths:
+            yield _analyze_one(path, kwargs)
+        return
+
+    # spawn: never fork a process that may already hold TF / MediaPipe state
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    pending = iter(paths)
+    running: set = set()
+    try:
+        while True:
+            for path in pending:
+                running.add(pool.submit(_analyze_one, path, kwargs))
+                if len(running) >= workers * _IN_FLIGHT_PER_WORKER:
+                    break
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_batch(
+    inputs:  Iterable[str],
+    out:     Path,
+    workers: int  = 1,
+    resume:  bool = True,
+    **kwargs,
+) -> dict:
+    """
+    Screen every video named by `inputs`, appending one JSON line per video to
+    `out`.  kwargs go to analyze_video.  Returns counts per status.
+    """
+    out   = Path(out)
+    paths = discover(inputs)
+    skip  = completed(out) if resume else set()
+    todo  = [p for p in paths if p not in skip]
+    print(f"[batch] {len(paths)} video(s), {len(paths) - len(todo)} already done, "
+          f"{len(todo)} to analyse with {workers} worker(s)", file=sys.stderr)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    with open(out, "a+") as f:
+        # A crash can leave a partial last line; start ours on a fresh one
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+        for i, record in enumerate(iter_results(todo, workers, **kwargs), 1):
+            f.write(_json_line(record) + "\n")
+            f.flush()
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            risk = record.get("risk_score")
+            print(f"[batch] {i}/{len(todo)} {record['status']:<20} "
+                  f"{'' if risk is None else f'risk={risk:.3f} '}"
+                  f"({record['seconds']:.1f}s) {record['path']}", file=sys.stderr)
+    return counts
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m ml.screening",
+        description="Screen one video (text output) or many videos (JSONL output)",
+    )
+    parser.add_argument("inputs", nargs="+", help="video files, directories or glob patterns")
+    parser.add_argument("--out", type=Path, help="JSONL output (batch mode; appended to)")
+    parser.add_argument("--workers", type=int, default=1, help="analysis processes")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="re-analyse videos already recorded in --out")
+    parser.add_argument("--target-fps", type=float, default=None)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--roi-mode", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the feature cache")
+    args = parser.parse_args(argv)
+
+    if args.out is None:
+        parser.error("--out is required for directories, globs or several videos")
+
+    counts = run_batch(
+        args.inputs, args.out,
+        workers=args.workers,
+        resume=not args.no_resume,
+        target_fps=args.target_fps,
+        max_frames=args.max_frames,
+        roi_mode=args.roi_mode,
+        use_cache=not args.no_cache,
+    )
+    print(f"[batch] finished: {counts or 'nothing to do'}", file=sys.stderr)
+    return 1 if counts.get("error") else 0
@@ -0,0 +1,330 @@
+"""
+Reproducible benchmark for the video screening pipeline.
+
+Generates a synthetic video (a rendered face drifting over a textured
+background) or loops the bundled test_video.mp4 to the requested length,
+then times each pipeline stage in isolation and the end-to-end
+``analyze_video`` path.  Every stage runs in a fresh process, so its peak
+RSS is its own and model loading is excluded by an untimed warm-up run.
+
+Usage:
+  python ml/benchmark.py --width 640 --height 480 --fps 30 --duration 20
+  python ml/benchmark.py --source loop --duration 60 --out bench.json
+  python ml/benchmark.py --compare baseline.json --tolerance 0.15
+
+Output (JSON, also printed):
+  {"config": {...}, "environment": {...},
+   "stages": {"decode": {"frames": 600, "fps": 912.4, "p50_s": 0.66,
+                         "p95_s": 0.71, "peak_rss_mb": 118.2}, ...}}
+
+--compare exits with status 1 when any stage's p50 latency or peak memory
+is more than --tolerance above the baseline (same config expected).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.metrics import peak_rss_mb  # noqa: E402
+
+TEST_VIDEO = ROOT / "test_video.mp4"
+VIDEO_DIR  = Path(__file__).resolve().parent / ".cache" / "benchmark"
+
+STAGES = ("decode", "face_mesh", "pose", "vgg16", "quality_gate", "end_to_end")
+
+
+# ── Input videos ──────────────────────────────────────────────────────────────
+
+def _draw_face(frame: np.ndarray, cx: int, cy: int, size: int, eyes_open: bool) -> None:
+    """Frontal cartoon face: skin ellipse, eyes with irises, brows, nose, mouth."""
+    ax, ay = size // 2, int(size * 0.65)
+    cv2.ellipse(frame, (cx, cy), (ax, ay), 0, 0, 360, (140, 170, 215), -1)
+    for side in (-1, 1):
+        ex, ey = cx + side * ax // 2, cy - ay // 5
+        if eyes_open:
+            cv2.ellipse(frame, (ex, ey), (ax // 4, ax // 8), 0, 0, 360, (245, 245, 245), -1)
+            cv2.circle(frame, (ex, ey), ax // 10, (60, 40, 30), -1)
+        else:
+            cv2.line(frame, (ex - ax // 4, ey), (ex + ax // 4, ey), (60, 60, 90), 2)
+        cv2.line(frame, (ex - ax // 4, ey - ay // 5), (ex + ax // 4, ey - ay // 4), (50, 60, 80), 3)
+    cv2.line(frame, (cx, cy - ay // 10), (cx - ax // 10, cy + ay // 5), (100, 120, 170), 2)
+    cv2.ellipse(frame, (cx, cy + ay // 2), (ax // 3, ay // 10), 0, 0, 180, (70, 70, 160), 3)
+
+
+def synthetic_video(path: Path, width: int, height: int, fps: float, duration: float) -> Path:
+    """Deterministic MJPG video of a face drifting and blinking over a fixed background."""
+    rng        = np.random.default_rng(0)
+    background = cv2.GaussianBlur(
+        rng.integers(40, 200, (height, width, 3), dtype=np.uint8), (0, 0), 8
+    )
+    size   = min(width, height) // 3
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    try:
+        for i in range(int(round(fps * duration))):
+            t     = i / fps
+            frame = background.copy()
+            cx    = int(width / 2 + width / 6 * np.sin(2 * np.pi * t / 7))
+            cy    = int(height / 2 + height / 10 * np.sin(2 * np.pi * t / 5))
+            _draw_face(frame, cx, cy, size, eyes_open=(t % 4) > 0.15)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def looped_video(path: Path, source: Path, width: Optional[int], height: Optional[int],
+                 duration: float) -> Path:
+    """Repeat `source` (resized to width x height when given) up to `duration` seconds."""
+    cap = cv2.VideoCapture(str(source))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if width and height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"Cannot read frames from {source}")
+
+    h, w   = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    try:
+        for i in range(int(round(fps * duration))):
+            writer.write(frames[i % len(frames)])
+    finally:
+        writer.release()
+    return path
+
+
+def prepare_video(config: dict) -> Path:
+    """Build (or reuse) the benchmark input described by `config`."""
+    spec = json.dumps({k: config[k] for k in ("source", "width", "height", "fps", "duration")},
+                      sort_keys=True)
+    VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+    path = VIDEO_DIR / f"{hashlib.sha1(spec.encode()).hexdigest()[:16]}.avi"
+    if path.exists():
+        return path
+    tmp = path.with_suffix(".tmp.avi")
+    if config["source"] == "loop":
+        looped_video(tmp, TEST_VIDEO, config["width"], config["height"], config["duration"])
+    else:
+        synthetic_video(tmp, config["width"], config["height"], config["fps"], config["duration"])
+    os.replace(tmp, path)
+    return path
+
+
+# ── Stage runners (executed in a fresh worker process) ────────────────────────
+
+def _run_stage(stage: str, video_path: str, config: dict) -> Optional[int]:
+    """Run one stage once; returns frames delivered (None when unavailable here)."""
+    from ml.frames import FrameSource
+    from ml.registry import models
+    from ml.screening import (
+        DEFAULT_PREFETCH, FaceMeshConsumer, PoseConsumer, QualityGate, VGG16FeatureConsumer,
+        _run_quality_gate, analyze_video,
+    )
+
+    prefetch = DEFAULT_PREFETCH if config["prefetch"] is None else config["prefetch"]
+
+    if stage == "end_to_end":
+        result = analyze_video(
+            video_path,
+            target_fps=config["target_fps"],
+            roi_mode=config["roi_mode"],
+            workers=config["workers"],
+            use_cache=False,
+            prefetch=prefetch,
+        )
+        return result.details["sampling"]["frames_processed"]
+    if stage == "quality_gate":
+        return _run_quality_gate(video_path, QualityGate())["frames_sampled"]
+
+    source = FrameSource(video_path, target_fps=config["target_fps"],
+                         prefetch=prefetch)
+    if stage == "face_mesh":
+        source.register(FaceMeshConsumer())
+    elif stage == "pose":
+        source.register(PoseConsumer())
+    elif stage == "vgg16":
+        predictor = models.get("video_classifier")
+        if predictor is None:
+            return None
+        source.register(VGG16FeatureConsumer(predictor))
+    source.run()
+    return source.sampling()["frames_processed"]
+
+
+def _bench_stage(stage: str, video_path: str, config: dict) -> Optional[dict]:
+    """Untimed warm-up, then `repeat` timed runs of one stage."""
+    if _run_stage(stage, video_path, config) is None:
+        return None
+    walls = []
+    for _ in range(config["repeat"]):
+        t0     = time.perf_counter()
+        frames = _run_stage(stage, video_path, config)
+        walls.append(time.perf_counter() - t0)
+
+    p50 = float(np.percentile(walls, 50))
+    return {
+        "frames":      frames,
+        "fps":         round(frames / p50, 2) if p50 > 0 else None,
+        "p50_s":       round(p50, 4),
+        "p95_s":       round(float(np.percentile(walls, 95)), 4),
+        "runs":        [round(w, 4) for w in walls],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(config: dict) -> dict:
+    video_path = str(prepare_video(config))
+    cap        = cv2.VideoCapture(video_path)
+    info       = {
+        "path":        video_path,
+        "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "fps":         cap.get(cv2.CAP_PROP_FPS),
+    }
+    cap.release()
+
+    stages = {}
+    ctx    = multiprocessing.get_context("spawn")
+    for stage in config["stages"]:
+        # One process per stage: isolated peak RSS, no state shared between stages
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            stats = pool.submit(_bench_stage, stage, video_path, config).result()
+        if stats is None:
+            print(f"[benchmark] {stage}: skipped (not available)")
+            continue
+        print(f"[benchmark] {stage}: p50 {stats['p50_s']:.3f}s  {stats['fps']} fps  "
+              f"peak {stats['peak_rss_mb']} MB")
+        stages[stage] = stats
+
+    return {
+        "config":      config,
+        "video":       info,
+        "environment": _environment(),
+        "stages":      stages,
+    }
+
+
+def _environment() -> dict:
+    env = {
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy":     np.__version__,
+        "opencv":    cv2.__version__,
+    }
+    try:
+        import mediapipe
+        env["mediapipe"] = getattr(mediapipe, "__version__", "unknown")
+    except ImportError:
+        env["mediapipe"] = None
+    return env
+
+
+# ── Baseline comparison ───────────────────────────────────────────────────────
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of `current` against `baseline` (empty list → pass)."""
+    ignore = {"stages", "repeat"}
+    if ({k: v for k, v in current["config"].items() if k not in ignore}
+            != {k: v for k, v in baseline["config"].items() if k not in ignore}):
+        print("[benchmark] warning: video / pipeline config differs from the baseline's")
+
+    regressions = []
+    for stage, base in baseline["stages"].items():
+        cur = current["stages"].get(stage)
+        if cur is None:
+            continue
+        for key in ("p50_s", "peak_rss_mb"):
+            if base.get(key) and cur.get(key) is not None:
+                change = cur[key] / base[key] - 1.0
+                line   = f"{stage:<13} {key:<12} {base[key]:>10} → {cur[key]:>10}  ({change:+.1%})"
+                print(line)
+                if change > tolerance:
+                    regressions.append(line)
+    return regressions
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the video screening pipeline")
+    parser.add_argument("--source", choices=["synthetic", "loop"], default="synthetic",
+                        help="rendered face video, or test_video.mp4 looped")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0, help="synthetic video fps")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--target-fps", type=float, default=None)
+    parser.add_argument("--roi-mode", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="end_to_end segment workers")
+    parser.add_argument("--prefetch", type=int, default=None,
+                        help="frames decoded ahead in a background thread "
+                             "(default: the pipeline's, 0 on single-core hosts)")
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown / memory growth")
+    args = parser.parse_args(argv)
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    config = {
+        "source":     args.source,
+        # Looped input keeps test_video.mp4's own fps
+        "width":      args.width,
+        "height":     args.height,
+        "fps":        args.fps if args.source == "synthetic" else None,
+        "duration":   args.duration,
+        "repeat":     args.repeat,
+        "stages":     stages,
+        "target_fps": args.target_fps,
+        "roi_mode":   args.roi_mode,
+        "workers":    args.workers,
+        "prefetch":   args.prefetch,
+    }
+    results = run_benchmark(config)
+    text    = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        args.out.write_text(text + "\n")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print(f"[benchmark] {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("[benchmark] no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
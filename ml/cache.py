@@ -0,0 +1,179 @@
+"""
+Content-addressed feature cache for screening videos.
+
+Re-uploads of the same clinical video (second reviewer, retry after a
+timeout, weight experiments) should not pay the MediaPipe + VGG16 cost
+again.  Entries are keyed by the SHA-256 of the video bytes, the pipeline
+version and the extraction options, and hold:
+
+    meta.json      per-video metrics (mediapipe, pose_gaze, sampling)
+    arrays.npz     compressed per-frame eye-centre / pose landmark arrays
+                   and VGG16 features
+
+The cache lives on local disk and is size-bounded: least-recently-used
+entries (by directory mtime, refreshed on every hit) are evicted first.
+Each process keeps a running total of the cache size and only rescans the
+directory when that total goes over budget (or every RESCAN_SECONDS, to pick
+up entries written by other workers).
+
+Configuration (environment):
+    NEUROTHRIVE_FEATURE_CACHE_DIR   cache root   (default: ml/.cache/features)
+    NEUROTHRIVE_FEATURE_CACHE_MB    size budget  (default: 2048; 0 disables)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Bump whenever extracted features change meaning, so stale entries never match
+PIPELINE_VERSION = "2"
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "features"
+DEFAULT_CACHE_MB  = 2048
+HASH_CHUNK_BYTES  = 1 << 20
+RESCAN_SECONDS    = 300
+
+_ARRAY_KEYS = ("eye_frames", "eye_centers", "pose_frames", "pose_landmarks")
+
+
+def file_sha256(path: str) -> str:
+    """Streaming SHA-256 of a file's bytes (constant memory)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """Size-bounded, content-addressed on-disk cache of extracted features."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root      = Path(root)
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        # Running size total, trusted until RESCAN_SECONDS after the last scan
+        self._size: Optional[int] = None
+        self._scanned_at = 0.0
+
+    def key(self, video_sha256: str, options: dict) -> str:
+        """Entry key from the content hash, pipeline version and extraction options."""
+        blob = json.dumps(
+            {"sha256": video_sha256, "version": PIPELINE_VERSION, "options": options},
+            sort_keys=True,
+        )
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    # ── Read ──────────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached features for `key`, or None.  Marks the entry most-recently used."""
+        entry = self._dir(key)
+        try:
+            meta = json.loads((entry / "meta.json").read_text())
+            with np.load(entry / "arrays.npz") as npz:
+                arrays = {k: npz[k] for k in npz.files}
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+
+        features = {
+            "mediapipe":      meta["mediapipe"],
+            "pose_gaze":      meta["pose_gaze"],
+            "sampling":       meta["sampling"],
+            "vgg16_features": arrays.get("vgg16_features"),
+        }
+        if all(k in arrays for k in _ARRAY_KEYS):
+            features["trajectories"] = {k: arrays[k] for k in _ARRAY_KEYS}
+        return features
+
+    # ── Write ─────────────────────────────────────────────────────────────────
+
+    def put(self, key: str, features: dict) -> None:
+        """Store features atomically, then evict LRU entries over the size budget."""
+        entry = self._dir(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = dict(features.get("trajectories") or {})
+        if features.get("vgg16_features") is not None:
+            arrays["vgg16_features"] = features["vgg16_features"]
+        meta = {k: features[k] for k in ("mediapipe", "pose_gaze", "sampling")}
+
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry.parent))
+        try:
+            (tmp / "meta.json").write_text(json.dumps(meta, default=float))
+            np.savez_compressed(tmp / "arrays.npz", **arrays)
+            size = _entry_size(tmp)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # Entry already written by a concurrent worker — keep theirs
+                shutil.rmtree(tmp, ignore_errors=True)
+                size = 0
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        with self._lock:
+            fresh = self._size is not None and time.monotonic() - self._scanned_at < RESCAN_SECONDS
+            if fresh:
+                self._size += size
+                if self._size <= self.max_bytes:
+                    return
+        self.evict()
+
+    def evict(self) -> None:
+        """Rescan the cache and delete least-recently-used entries until it fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for shard in self.root.glob("??"):
+                try:
+                    children = list(shard.iterdir())
+                except OSError:
+                    continue
+                for entry in children:
+                    if entry.name.startswith(".tmp-"):
+                        continue
+                    try:
+                        entries.append((entry.stat().st_mtime, _entry_size(entry), entry))
+                    except OSError:
+                        continue    # evicted by another worker meanwhile
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+            self._size       = total
+            self._scanned_at = time.monotonic()
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir())
+
+
+_default: Optional[FeatureCache] = None
+
+
+def default_cache() -> Optional[FeatureCache]:
+    """Process-wide cache configured from the environment (None when disabled)."""
+    global _default
+    if _default is None:
+        max_mb = int(os.environ.get("NEUROTHRIVE_FEATURE_CACHE_MB", DEFAULT_CACHE_MB))
+        if max_mb <= 0:
+            return None
+        root = Path(os.environ.get("NEUROTHRIVE_FEATURE_CACHE_DIR", DEFAULT_CACHE_DIR))
+        _default = FeatureCache(root, max_mb * 1024 * 1024)
+    return _default
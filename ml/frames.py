@@ -0,0 +1,454 @@
+"""
+Shared video frame source for the screening pipeline.
+
+Decodes every frame of a video exactly once and fans it out to the
+registered consumers (Face Mesh, Pose, VGG16 feature extractor, ...).
+Each consumer keeps its own accumulator and turns it into a summary dict
+when the stream ends.
+
+    source = FrameSource(video_path)
+    source.register(FaceMeshConsumer())
+    source.register(PoseConsumer())
+    outputs = source.run()        → {"face_mesh": {...}, "pose": {...}}
+
+Frame sampling
+--------------
+``target_fps`` / ``max_frames`` thin the stream to every ``stride``-th frame.
+Skipped frames are only grabbed (or seeked over for large strides), never
+retrieved, colour-converted or handed to a model.
+
+Timings
+-------
+``FrameSource.timings`` records wall / CPU time per stage: "decode" (read,
+grab and seek) plus one stage per consumer (start, process and finish).  The
+lazy BGR→RGB conversion is charged to the first consumer that asks for it.
+
+Prefetch
+--------
+With ``prefetch=N`` a background thread decodes (and converts to RGB) up to
+N frames ahead while the consumers run inference on the current one.  Frames
+are decoded into a fixed pool of N + 2 reusable buffers, so there is no
+per-frame allocation; consumers must not keep frame arrays past ``process``.
+CPU times are then per thread, and "decode_wait" records how long inference
+waited for the decoder.
+
+Segments
+--------
+``start_frame`` / ``end_frame`` restrict the source to one time segment of
+the video (see screening.analyze_video(workers=...)).  Segment starts should
+be multiples of the stride so sampled frames match a sequential run.
+
+``first_index`` says the file is a later part of a longer video (a chunk of
+an upload, see ml/incremental.py): frame indices and timestamps are then
+those of the whole video.  ``position`` is the number of frames of the file
+read or grabbed by the last ``run`` — where the next part starts.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import cv2
+import numpy as np
+
+from ml.metrics import StageTimings, current_rss_mb
+
+DEFAULT_FPS = 30.0
+
+# Strides at least this long seek instead of grabbing every skipped frame
+_SEEK_MIN_SKIP = 60
+
+
+@dataclass
+class VideoInfo:
+    """Container-level metadata shared with every consumer."""
+
+    path:         str
+    opened:       bool
+    fps:          float
+    frame_count:  int    # as declared by the container (may be 0 / approximate)
+    width:        int
+    height:       int
+    stride:       int   = 1     # every stride-th frame is delivered to consumers
+    sample_fps:   float = DEFAULT_FPS
+    start_frame:  int   = 0     # first frame of this segment
+
+    @property
+    def frame_step(self) -> float:
+        """Source frames represented by one delivered frame (fps / sample_fps)."""
+        return self.fps / self.sample_fps if self.sample_fps > 0 else 1.0
+
+    @property
+    def expected_samples(self) -> int:
+        """Frames that will be delivered from start_frame to the declared end (0 if unknown)."""
+        remaining = max(0, self.frame_count - self.start_frame)
+        return -(-remaining // self.stride)
+
+
+class Frame:
+    """
+    One decoded frame.  The RGB view is converted lazily and cached, so the
+    BGR→RGB conversion runs at most once no matter how many consumers ask.
+    """
+
+    __slots__ = ("index", "timestamp", "bgr", "_rgb")
+
+    def __init__(self, index: int, timestamp: float, bgr: np.ndarray,
+                 rgb: Optional[np.ndarray] = None):
+        self.index     = index
+        self.timestamp = timestamp
+        self.bgr       = bgr
+        self._rgb      = rgb
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+
+class FrameConsumer:
+    """
+    Base class for per-frame consumers.
+
+    Subclasses set ``name`` (the key of their output in ``FrameSource.run``)
+    and override ``start`` / ``process`` / ``finish``.  ``needs_rgb = False``
+    tells a prefetching source not to convert frames for this consumer.
+
+    Frame pixels are only valid during ``process``: with prefetching, the
+    buffers are reused for later frames, so copy anything kept longer.
+    """
+
+    name      = "consumer"
+    needs_rgb = True
+
+    def start(self, info: VideoInfo) -> None:
+        """Called once before the first frame (also when the video failed to open)."""
+
+    def process(self, frame: Frame) -> None:
+        """Called for every decoded frame, in order."""
+
+    def finish(self) -> dict:
+        """
+        Called once after the last frame; returns the consumer's summary.
+        Summaries of consecutive segments must be mergeable by the caller.
+        """
+        return {}
+
+    def close(self) -> None:
+        """Release model handles.  Always called, even if decoding failed."""
+
+
+def probe(video_path: str) -> tuple[float, int]:
+    """(fps, declared frame count) without decoding; (DEFAULT_FPS, 0) if unreadable."""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            return DEFAULT_FPS, 0
+        return (cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS,
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0))
+    finally:
+        cap.release()
+
+
+def sampling_stride(
+    fps:         float,
+    frame_count: int,
+    target_fps:  Optional[float],
+    max_frames:  Optional[int],
+) -> int:
+    """Frame stride that honours target_fps and spreads max_frames over the video."""
+    stride = 1
+    if target_fps and 0 < target_fps < fps:
+        stride = max(1, int(round(fps / target_fps)))
+    if max_frames and frame_count > max_frames:
+        # Spread the frame budget over the whole video, not just its start
+        stride = max(stride, -(-frame_count // max_frames))
+    return stride
+
+
+_END = object()   # end-of-stream marker on the prefetch queue
+
+
+class _BufferPool:
+    """
+    Fixed set of frame buffers cycled between the decode thread and the
+    consumers.  Its size bounds how far decoding can run ahead.
+    """
+
+    def __init__(self, size: int, stop: threading.Event):
+        self.bgr: list[Optional[np.ndarray]] = [None] * size
+        self.rgb: list[Optional[np.ndarray]] = [None] * size
+        self._free = queue.Queue()
+        self._stop = stop
+        for slot in range(size):
+            self._free.put(slot)
+
+    def acquire(self) -> Optional[int]:
+        """A free slot; None once the source is stopped."""
+        while not self._stop.is_set():
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def release(self, slot: Optional[int]) -> None:
+        if slot is not None:
+            self._free.put(slot)
+
+
+class FrameSource:
+    """Single-decode video reader that fans frames out to consumers."""
+
+    def __init__(
+        self,
+        video_path:  str,
+        target_fps:  Optional[float] = None,
+        max_frames:  Optional[int]   = None,
+        start_frame: int             = 0,
+        end_frame:   Optional[int]   = None,
+        stride:      Optional[int]   = None,
+        prefetch:    int             = 0,
+        first_index: int             = 0,
+    ):
+        self.video_path       = str(video_path)
+        self.target_fps       = target_fps
+        self.max_frames       = max_frames
+        self.start_frame      = start_frame
+        self.end_frame        = end_frame
+        self.fixed_stride     = stride
+        self.prefetch         = max(0, int(prefetch))
+        self.first_index      = first_index
+        self.position         = 0
+        self.consumers: list[FrameConsumer] = []
+        self.info: Optional[VideoInfo] = None
+        self.frames_processed = 0
+        self.timings          = StageTimings()
+
+    def register(self, consumer: FrameConsumer) -> FrameConsumer:
+        if any(c.name == consumer.name for c in self.consumers):
+            raise ValueError(f"Consumer '{consumer.name}' already registered")
+        self.consumers.append(consumer)
+        return consumer
+
+    def _stride(self, fps: float, frame_count: int) -> int:
+        if self.fixed_stride:
+            return self.fixed_stride
+        return sampling_stride(fps, frame_count, self.target_fps, self.max_frames)
+
+    def sampling(self) -> dict:
+        """Sampling actually used by the last ``run`` (for result details)."""
+        info = self.info
+        return {
+            "source_fps":       info.fps if info else None,
+            "target_fps":       self.target_fps,
+            "max_frames":       self.max_frames,
+            "stride":           info.stride if info else 1,
+            "sample_fps":       info.sample_fps if info else None,
+            "frames_processed": self.frames_processed,
+        }
+
+    def _skip(self, cap: cv2.VideoCapture, next_index: int, count: int) -> bool:
+        """Advance past `count` frames without retrieving them."""
+        if count >= _SEEK_MIN_SKIP and cap.set(cv2.CAP_PROP_POS_FRAMES, next_index - 1):
+            # A seek past the end still succeeds: grab the last skipped frame to be sure
+            if cap.grab():
+                self.position = next_index
+                return True
+            # Count the frames left before the end one by one instead
+            if not cap.set(cv2.CAP_PROP_POS_FRAMES, self.position):
+                return False
+            count = next_index - self.position
+        for _ in range(count):
+            if not cap.grab():
+                return False
+            self.position += 1
+        return True
+
+    def _decode(
+        self,
+        cap:       cv2.VideoCapture,
+        index:     int,
+        cpu,
+        pool:      Optional[_BufferPool] = None,
+        want_rgb:  bool = False,
+        timings:   Optional[StageTimings] = None,
+    ) -> Iterator[tuple[Frame, Optional[int]]]:
+        """
+        Yield (frame, pool slot) for every sampled frame from `index` on,
+        charging read / convert / skip time to the "decode" stage of
+        `timings` (default: the source's).
+        With a pool, frames are decoded into its buffers (slot is then
+        returned to the pool by the caller once the frame is consumed).
+        """
+        timings = self.timings if timings is None else timings
+        clock   = time.perf_counter
+        info    = self.info
+        stride  = info.stride
+        yielded = 0
+        while True:
+            if self.max_frames and yielded >= self.max_frames:
+                return
+            if self.end_frame is not None and index >= self.end_frame:
+                return
+            slot = pool.acquire() if pool else None
+            if pool and slot is None:
+                return   # stopped by the consumer side
+
+            w0, c0 = clock(), cpu()
+            if pool:
+                ret, bgr = cap.read(pool.bgr[slot])
+                rgb      = None
+                if ret:
+                    pool.bgr[slot] = bgr
+                    if want_rgb:
+                        rgb = pool.rgb[slot] = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB,
+                                                            dst=pool.rgb[slot])
+            else:
+                ret, bgr = cap.read()
+                rgb      = None
+            timings.add("decode", clock() - w0, cpu() - c0, frames=int(ret))
+            if not ret:
+                if pool:
+                    pool.release(slot)
+                return
+            self.position = index + 1
+
+            at = self.first_index + index
+            yield Frame(at, at / info.fps, bgr, rgb), slot
+            yielded += 1
+
+            if stride > 1:
+                w0, c0  = clock(), cpu()
+                skipped = self._skip(cap, index + stride, stride - 1)
+                timings.add("decode", clock() - w0, cpu() - c0)
+                if not skipped:
+                    return
+            index += stride
+
+    def _prefetched(
+        self,
+        cap:   cv2.VideoCapture,
+        index: int,
+        stop:  threading.Event,
+    ) -> Iterator[tuple[Frame, Optional[int]]]:
+        """
+        _decode running in a background thread, `prefetch` frames ahead.
+        OpenCV decoding and colour conversion release the GIL, so the thread
+        decodes while the consumers run inference.  The thread keeps its own
+        decode timings, added to the source's once it has stopped, so only
+        the consumer thread ever writes those.
+        """
+        pool     = _BufferPool(self.prefetch + 2, stop)
+        frames   = queue.Queue()
+        want_rgb = any(getattr(c, "needs_rgb", True) for c in self.consumers)
+        decoded  = StageTimings()
+
+        def produce():
+            # Never blocks on put: the pool already bounds frames in flight
+            try:
+                for item in self._decode(cap, index, time.thread_time, pool, want_rgb, decoded):
+                    frames.put(item)
+                frames.put(_END)
+            except BaseException as e:
+                frames.put(e)
+
+        thread = threading.Thread(target=produce, name="frame-decode", daemon=True)
+        thread.start()
+        self._decode_thread = thread
+        try:
+            while True:
+                w0    = time.perf_counter()
+                item  = frames.get()
+                self.timings.add("decode_wait", time.perf_counter() - w0, 0.0)
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+                pool.release(item[1])
+        finally:
+            stop.set()
+            thread.join()
+            self.timings.merge(decoded)
+
+    def run(self) -> dict[str, dict]:
+        """Decode the video once; return {consumer.name: consumer.finish()}."""
+        timings = self.timings = StageTimings()
+        clock   = time.perf_counter
+        # Per-thread CPU when decoding overlaps inference in another thread
+        cpu     = time.thread_time if self.prefetch > 0 else time.process_time
+
+        rss0   = current_rss_mb()
+        w0, c0 = clock(), cpu()
+        cap = cv2.VideoCapture(self.video_path)
+        opened = cap.isOpened()
+
+        fps         = (cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS) if opened else DEFAULT_FPS
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0) if opened else 0
+        stride      = self._stride(fps, frame_count)
+
+        self.info = VideoInfo(
+            path        = self.video_path,
+            opened      = opened,
+            fps         = fps,
+            frame_count = frame_count,
+            width       = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0) if opened else 0,
+            height      = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0) if opened else 0,
+            stride      = stride,
+            sample_fps  = fps / stride,
+            start_frame = self.first_index + self.start_frame,
+        )
+        if frame_count:
+            self.info.frame_count += self.first_index
+        self.frames_processed = 0
+        self.position         = 0
+        self._decode_thread   = None
+        stop = threading.Event()
+
+        try:
+            index = self.start_frame
+            if opened and index > 0:
+                opened = self._skip(cap, index, index)
+            timings.add("decode", clock() - w0, cpu() - c0)
+
+            w1, c1 = clock(), cpu()
+            for consumer in self.consumers:
+                consumer.start(self.info)
+                w2, c2 = clock(), cpu()
+                timings.add(consumer.name, w2 - w1, c2 - c1)
+                w1, c1 = w2, c2
+
+            if opened:
+                stream = (self._prefetched(cap, index, stop) if self.prefetch > 0
+                          else self._decode(cap, index, cpu))
+                for frame, _ in stream:
+                    w1, c1 = clock(), cpu()
+                    for consumer in self.consumers:
+                        consumer.process(frame)
+                        w2, c2 = clock(), cpu()
+                        timings.add(consumer.name, w2 - w1, c2 - c1, frames=1)
+                        w1, c1 = w2, c2
+                    self.frames_processed += 1
+
+            w1, c1 = clock(), cpu()
+            outputs = {}
+            for consumer in self.consumers:
+                outputs[consumer.name] = consumer.finish()
+                w2, c2 = clock(), cpu()
+                timings.add(consumer.name, w2 - w1, c2 - c1)
+                w1, c1 = w2, c2
+            return outputs
+        finally:
+            stop.set()
+            if self._decode_thread is not None:
+                self._decode_thread.join()
+            cap.release()
+            for consumer in self.consumers:
+                consumer.close()
+            timings.mark_rss("decode", *(c.name for c in self.consumers), since=rss0)
@@ -0,0 +1,619 @@
+"""
+Incremental screening of a video that is still being uploaded.
+
+Streaming-friendly containers are written as a header followed by
+self-contained fragments:
+
+    fragmented MP4  : ftyp, moov, then (moof, mdat) pairs
+    WebM / Matroska : EBML header, Segment { Info, Tracks, Cluster, Cluster, ... }
+
+complete_prefix() finds how many leading bytes of a partial file are whole
+fragments, cut where decoding can resume: the next fragment starts with a
+video keyframe.  IncrementalAnalysis decodes only the fragments completed
+since its last pass — the header plus those fragments form a small playable
+file whose frames are numbered from where the previous pass stopped — so
+every byte is decoded once however many passes an upload takes.  When the
+last chunk lands only the final fragments are left to analyse:
+
+    analysis = IncrementalAnalysis(quality_gate=QualityGate())
+    while uploading:
+        analysis.feed(path, bytes_received)
+        if analysis.rejected:         # first_seconds gate failed on what arrived
+            break
+    out = analysis.finish_with_explainability(path)
+
+Between passes the analysis can be saved to disk (save() / restore()), so
+each pass may run in a different worker process.
+
+Other containers (MP4 with its index at the end, AVI, ...) have no usable
+prefix; finish() then analyses the whole file in one pass.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import time
+from typing import BinaryIO, Optional
+
+from ml.cache import default_cache, file_sha256
+from ml.frames import probe, sampling_stride
+from ml.metrics import StageTimings
+from ml.registry import models
+from ml.roi import DEFAULT_INFERENCE_SIZE
+from ml.scoring import DEFAULT_PARAMS, ScoringParams
+from ml.screening import (
+    DEFAULT_PREFETCH, DEFAULT_VGG_BATCH_SIZE, PipelineOptions, QualityGate, ScreeningResult,
+    _cache_options, _explained, _features_from_outputs, _gate_verdict, _merge_segments,
+    _missing_video_result, _predict_from_features, _run_quality_gate, _run_segment,
+    _timed_result, analyze_video,
+)
+
+# Analyse once at least this much more of the upload is complete: every pass
+# restarts the decoder and the models' tracking state
+DEFAULT_STEP_BYTES = 4 << 20
+
+# Bump when the saved pass state changes shape
+STATE_VERSION = 1
+
+
+# ── Complete-prefix detection ─────────────────────────────────────────────────
+
+def complete_prefix(path: str, size: int) -> int:
+    """
+    Length of the longest prefix of the first `size` bytes of `path` that ends
+    on a fragment boundary of a fragmented MP4 / WebM file, where the next
+    fragment starts with a video keyframe (0 for other formats or before the
+    first such boundary).
+    """
+    return _layout(path, size)[1]
+
+
+def init_segment(path: str, size: int) -> bytes:
+    """
+    The header every fragment decodes against (b"" before it is complete, or
+    for other formats).  Matroska headers get an unknown-size Segment, so a
+    header followed by any run of clusters is a valid file.
+    """
+    header_end, _ = _layout(path, size)
+    if not header_end:
+        return b""
+    with open(path, "rb") as f:
+        head = f.read(header_end)
+        if head[:4] != _EBML_HEADER.to_bytes(4, "big"):
+            return head
+        _, data_size, header = _element(f, 0)
+        segment = header + data_size
+        _, _, seg_header = _element(f, segment)
+    return (head[:segment] + _SEGMENT.to_bytes(4, "big") + _UNKNOWN_SIZE
+            + head[segment + seg_header:])
+
+
+def _layout(path: str, size: int) -> tuple[int, int]:
+    """(header length, complete prefix) of the first `size` bytes of `path`."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if head[4:8] == b"ftyp":
+            return _mp4_layout(f, size)
+        if head[:4] == _EBML_HEADER.to_bytes(4, "big"):
+            return _matroska_layout(f, size)
+    return 0, 0
+
+
+# ── Fragmented MP4 ────────────────────────────────────────────────────────────
+
+_NON_SYNC = 0x00010000     # sample_is_non_sync_sample in ISO BMFF sample flags
+
+
+def _boxes(f: BinaryIO, start: int, end: int):
+    """(type, box start, payload offset, box end) of the complete boxes in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        box_size, box_type = struct.unpack(">I4s", header[:8])
+        payload = pos + 8
+        if box_size == 1:                  # 64-bit size follows the type
+            if len(header) < 16:
+                return
+            box_size = struct.unpack(">Q", header[8:16])[0]
+            payload += 8
+        if box_size < 8 or pos + box_size > end:
+            return                         # incomplete (or "to end of file")
+        yield box_type, pos, payload, pos + box_size
+        pos += box_size
+
+
+def _child(f: BinaryIO, start: int, end: int, box_type: bytes) -> Optional[tuple[int, int]]:
+    for kind, _, payload, box_end in _boxes(f, start, end):
+        if kind == box_type:
+            return payload, box_end
+    return None
+
+
+def _u32(f: BinaryIO, pos: int) -> int:
+    f.seek(pos)
+    return struct.unpack(">I", f.read(4))[0]
+
+
+def _mp4_video_track(f: BinaryIO, moov: int, moov_end: int) -> tuple[Optional[int], dict]:
+    """(video track_ID, {track_ID: trex default_sample_flags}) from the moov box."""
+    video = None
+    for kind, _, payload, box_end in _boxes(f, moov, moov_end):
+        if kind != b"trak":
+            continue
+        tkhd = _child(f, payload, box_end, b"tkhd")
+        mdia = _child(f, payload, box_end, b"mdia")
+        hdlr = mdia and _child(f, mdia[0], mdia[1], b"hdlr")
+        if tkhd and hdlr:
+            f.seek(hdlr[0] + 8)
+            if f.read(4) == b"vide":
+                f.seek(tkhd[0])
+                version = f.read(1)[0]
+                video = _u32(f, tkhd[0] + (20 if version == 1 else 12))
+                break
+    defaults = {}
+    mvex = _child(f, moov, moov_end, b"mvex")
+    if mvex:
+        for kind, _, payload, _ in _boxes(f, mvex[0], mvex[1]):
+            if kind == b"trex":
+                defaults[_u32(f, payload + 4)] = _u32(f, payload + 20)
+    return video, defaults
+
+
+def _mp4_starts_on_keyframe(f: BinaryIO, moof: int, moof_end: int,
+                            video: Optional[int], defaults: dict) -> bool:
+    """Whether the first video sample of this moof is a sync sample."""
+    for kind, _, payload, box_end in _boxes(f, moof, moof_end):
+        if kind != b"traf":
+            continue
+        tfhd = _child(f, payload, box_end, b"tfhd")
+        trun = _child(f, payload, box_end, b"trun")
+        if not tfhd or not trun:
+            continue
+        tf_flags = _u32(f, tfhd[0]) & 0xFFFFFF
+        track    = _u32(f, tfhd[0] + 4)
+        if video is not None and track != video:
+            continue
+        flags = defaults.get(track, 0)
+        if tf_flags & 0x20:                # default-sample-flags-present
+            offset = tfhd[0] + 8 + 8 * bool(tf_flags & 0x01) + 4 * sum(
+                bool(tf_flags & bit) for bit in (0x02, 0x08, 0x10))
+            flags = _u32(f, offset)
+        tr_flags = _u32(f, trun[0]) & 0xFFFFFF
+        entry    = trun[0] + 8 + 4 * bool(tr_flags & 0x01)
+        if tr_flags & 0x04:                # first-sample-flags-present
+            flags = _u32(f, entry)
+        elif tr_flags & 0x400:             # per-sample flags
+            entry += 4 * sum(bool(tr_flags & bit) for bit in (0x100, 0x200))
+            flags = _u32(f, entry)
+        return not flags & _NON_SYNC
+    return True
+
+
+def _mp4_layout(f: BinaryIO, size: int) -> tuple[int, int]:
+    header = end = 0
+    video, defaults = None, {}
+    fragment_end = None                    # end of the last complete (moof, mdat)
+    for kind, start, payload, box_end in _boxes(f, 0, size):
+        if kind == b"moov":
+            video, defaults = _mp4_video_track(f, payload, box_end)
+        elif kind == b"moof":
+            header = header or start
+            if fragment_end is not None and _mp4_starts_on_keyframe(
+                    f, payload, box_end, video, defaults):
+                end = fragment_end
+            fragment_end = None
+        elif kind == b"mdat" and header:
+            fragment_end = box_end         # a moof and its samples
+    return header, end
+
+
+# ── WebM / Matroska ───────────────────────────────────────────────────────────
+
+_EBML_HEADER  = 0x1A45DFA3
+_SEGMENT      = 0x18538067
+_CLUSTER      = 0x1F43B675
+_TRACKS       = 0x1654AE6B
+_TRACK_ENTRY  = 0xAE
+_TRACK_NUMBER = 0xD7
+_TRACK_TYPE   = 0x83
+_SIMPLE_BLOCK = 0xA3
+_BLOCK_GROUP  = 0xA0
+_BLOCK        = 0xA1
+_REFERENCE    = 0xFB
+_UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+# Segment children; one of these after an unknown-size Cluster ends it
+_SEGMENT_CHILDREN = {
+    0x114D9B74,   # SeekHead
+    0x1549A966,   # Info
+    _TRACKS,
+    _CLUSTER,
+    0x1C53BB6B,   # Cues
+    0x1043A770,   # Chapters
+    0x1254C367,   # Tags
+    0x1941A469,   # Attachments
+}
+
+
+def _vint(f: BinaryIO, keep_marker: bool) -> tuple[Optional[int], int]:
+    """EBML variable-length integer → (value, length); value None when unknown / truncated."""
+    first = f.read(1)
+    if not first:
+        return None, 0
+    b      = first[0]
+    length = 9 - b.bit_length() if b else 9
+    if length > 8:
+        return None, 0
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        return None, 0
+    value = b if keep_marker else b & ((1 << (8 - length)) - 1)
+    for c in rest:
+        value = (value << 8) | c
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length                # all ones: "unknown size"
+    return value, length
+
+
+def _element(f: BinaryIO, pos: int) -> tuple[Optional[int], Optional[int], int]:
+    """(id, data size, header length) of the EBML element at `pos`."""
+    f.seek(pos)
+    element_id, id_len = _vint(f, keep_marker=True)
+    if element_id is None:
+        return None, None, 0
+    data_size, size_len = _vint(f, keep_marker=False)
+    if size_len == 0:
+        return None, None, 0
+    return element_id, data_size, id_len + size_len
+
+
+def _children(f: BinaryIO, start: int, end: int):
+    """(id, data offset, data size) of the sized child elements in [start, end)."""
+    pos = start
+    while pos < end:
+        element_id, data_size, header = _element(f, pos)
+        if element_id is None or data_size is None or pos + header + data_size > end:
+            return
+        yield element_id, pos + header, data_size
+        pos += header + data_size
+
+
+def _uint(f: BinaryIO, pos: int, size: int) -> int:
+    f.seek(pos)
+    return int.from_bytes(f.read(size), "big")
+
+
+def _matroska_video_track(f: BinaryIO, pos: int, size: int) -> Optional[int]:
+    for element_id, data, data_size in _children(f, pos, pos + size):
+        if element_id != _TRACK_ENTRY:
+            continue
+        fields = {e: (d, n) for e, d, n in _children(f, data, data + data_size)}
+        if _TRACK_TYPE in fields and _uint(f, *fields[_TRACK_TYPE]) == 1:
+            if _TRACK_NUMBER in fields:
+                return _uint(f, *fields[_TRACK_NUMBER])
+    return None
+
+
+def _block_track(f: BinaryIO, pos: int) -> tuple[Optional[int], int]:
+    """(track number, header length) of a (Simple)Block's data at `pos`."""
+    f.seek(pos)
+    return _vint(f, keep_marker=False)
+
+
+def _cluster_keyframe(f: BinaryIO, pos: int, size: int, video: Optional[int]) -> Optional[bool]:
+    """
+    Whether the first video block of the cluster whose data starts at `pos`
+    is a keyframe; None while that block has not arrived.
+    """
+    while pos < size:
+        element_id, data_size, header = _element(f, pos)
+        if element_id is None or data_size is None:
+            return None
+        data = pos + header
+        if element_id == _SIMPLE_BLOCK:
+            # track, int16 timecode, flags: the frame data need not be in yet
+            track, length = _block_track(f, data)
+            if not length or data + length + 3 > size:
+                return None
+            if video is None or track == video:
+                f.seek(data + length + 2)
+                return bool(f.read(1)[0] & 0x80)
+        elif data + data_size > size:
+            return None
+        elif element_id == _BLOCK_GROUP:
+            fields = {e: d for e, d, _ in _children(f, data, data + data_size)}
+            if _BLOCK in fields:
+                track, _ = _block_track(f, fields[_BLOCK])
+                if video is None or track == video:
+                    return _REFERENCE not in fields
+        elif element_id in _SEGMENT_CHILDREN:
+            return None                         # empty cluster
+        pos = data + data_size
+    return None
+
+
+def _matroska_layout(f: BinaryIO, size: int) -> tuple[int, int]:
+    element_id, data_size, header = _element(f, 0)
+    if element_id != _EBML_HEADER or data_size is None:
+        return 0, 0
+    pos = header + data_size
+    element_id, _, header = _element(f, pos)
+    if element_id != _SEGMENT:
+        return 0, 0
+    pos += header
+
+    first = end = 0
+    video = None
+    fragment_end = None                    # end of the last complete cluster
+    while pos < size:
+        element_id, data_size, header = _element(f, pos)
+        if element_id is None:
+            break
+        if element_id == _CLUSTER:
+            first = first or pos
+            if fragment_end is not None:
+                key = _cluster_keyframe(f, pos + header, size, video)
+                if key is None:
+                    break
+                if key:
+                    end = fragment_end
+        elif element_id == _TRACKS and data_size is not None and pos + header + data_size <= size:
+            video = _matroska_video_track(f, pos + header, data_size)
+        if data_size is not None:
+            if pos + header + data_size > size:
+                break
+            pos += header + data_size
+        elif element_id == _CLUSTER:
+            # Live WebM (e.g. MediaRecorder): the cluster ends where the next one starts
+            pos = _unsized_cluster_end(f, pos + header, size)
+            if pos is None:
+                break
+        else:
+            break
+        if element_id == _CLUSTER:
+            fragment_end = pos
+    return first, end
+
+
+def _unsized_cluster_end(f: BinaryIO, pos: int, size: int) -> Optional[int]:
+    """Offset of the Segment child following an unknown-size Cluster; None if not there yet."""
+    while pos < size:
+        element_id, data_size, header = _element(f, pos)
+        if element_id is None:
+            return None
+        if element_id in _SEGMENT_CHILDREN:
+            return pos
+        if data_size is None or pos + header + data_size > size:
+            return None
+        pos += header + data_size
+    return None
+
+
+# ── Incremental analysis ──────────────────────────────────────────────────────
+
+class IncrementalAnalysis:
+    """
+    Screening of one growing upload.  feed() analyses the fragments completed
+    since the last pass; finish() analyses the rest once the file is whole
+    and returns the same ScreeningResult analyze_video would, with
+    details["sampling"]["segments"] = number of passes.
+
+    A quality gate in first_seconds mode is checked after every pass: once
+    `rejected` is set, finish() returns the gate rejection without decoding
+    the rest.  A sparse gate samples the whole video, so finish() runs it
+    (as analyze_video does) before decoding the last fragments.
+
+    Feature-cache entries are written on finish() (keyed by the complete
+    file, whose hash is then `sha256`), so re-uploads of the video are
+    served from the cache.
+    """
+
+    def __init__(
+        self,
+        target_fps:     Optional[float]       = None,
+        vgg_batch_size: int                   = DEFAULT_VGG_BATCH_SIZE,
+        roi_mode:       bool                  = False,
+        inference_size: int                   = DEFAULT_INFERENCE_SIZE,
+        use_cache:      bool                  = True,
+        quality_gate:   Optional[QualityGate] = None,
+        prefetch:       int                   = DEFAULT_PREFETCH,
+        params:         ScoringParams         = DEFAULT_PARAMS,
+        step_bytes:     int                   = DEFAULT_STEP_BYTES,
+    ):
+        self.predictor  = models.get("video_classifier")
+        self.cache      = default_cache() if use_cache else None
+        # Cache entries always carry the per-frame landmark arrays
+        self.opts       = PipelineOptions(target_fps, None, vgg_batch_size, roi_mode,
+                                          inference_size, self.cache is not None, prefetch)
+        self.gate       = quality_gate
+        self.params     = params
+        self.step_bytes = max(1, int(step_bytes))
+        self.sha256: Optional[str] = None
+        # Progress (what save() / restore() carry between passes)
+        self.header     = b""       # init segment every pass decodes against
+        self.parts: list[dict] = []
+        self.stride: Optional[int] = None
+        self.next_frame = 0         # global index of the next pass's first frame
+        self.analysed   = 0         # bytes of the upload analysed (header included)
+        self.elapsed    = 0.0       # wall time spent in passes
+        self.verdict: Optional[dict] = None   # quality-gate rejection, once known
+
+    @property
+    def rejected(self) -> bool:
+        return self.verdict is not None
+
+    def feed(self, video_path: str, received: int, force: bool = False) -> int:
+        """
+        Analyse what became complete in the first `received` bytes of
+        `video_path`, if at least step_bytes did (any amount with `force`).
+        Returns frames analysed.
+        """
+        if self.rejected:
+            return 0
+        header_end, end = _layout(video_path, received)
+        if not self.header and end:
+            self.header   = init_segment(video_path, received)
+            self.analysed = header_end
+        if end <= self.analysed or (end - self.analysed < self.step_bytes and not force):
+            return 0
+        t0 = time.perf_counter()
+        frames = self._pass(video_path, end)
+        self.analysed = end
+        self._check_gate()
+        self.elapsed += time.perf_counter() - t0
+        return frames
+
+    def _pass(self, video_path: str, end: int) -> int:
+        """
+        Decode bytes analysed..end of `video_path` (whole fragments) as one
+        more segment: header + those fragments, written to a scratch file.
+        """
+        scratch = f"{video_path}.pass"
+        try:
+            with open(video_path, "rb") as src, open(scratch, "wb") as dst:
+                dst.write(self.header)
+                src.seek(self.analysed)
+                _copy_bytes(src, dst, end - self.analysed)
+            stride  = self.stride or sampling_stride(probe(scratch)[0], 0, self.opts.target_fps, None)
+            # Keep the sampling grid of a sequential run: every stride-th frame of the video
+            outputs = _run_segment(scratch, self.predictor, self.opts,
+                                   -self.next_frame % stride, None, stride, self.next_frame)
+        finally:
+            if os.path.exists(scratch):
+                os.unlink(scratch)
+        self.stride      = stride
+        self.next_frame += outputs.pop("frames_read")
+        if outputs["sampling"]["frames_processed"]:
+            self.parts.append(outputs)
+        return outputs["sampling"]["frames_processed"]
+
+    def _check_gate(self) -> None:
+        """Reject early once the gate's first seconds show too few faces."""
+        # A sparse gate judges samples spread over the whole video: see finish()
+        if self.gate is None or not self.gate.seconds or not self.parts:
+            return
+        frames = sum(p["face_mesh"]["frame_count"] for p in self.parts)
+        faces  = sum(p["face_mesh"]["face_detected"] for p in self.parts)
+        fps    = self.parts[0]["sampling"]["source_fps"] or 1.0
+        ratio  = faces / frames if frames else 0.0
+        if self.next_frame / fps >= self.gate.seconds and ratio < self.gate.min_face_ratio:
+            self.verdict = {
+                "passed":         False,
+                "mode":           "received",
+                "face_ratio":     ratio,
+                "frames_sampled": frames,
+                "min_face_ratio": self.gate.min_face_ratio,
+            }
+
+    def finish(self, video_path: str) -> ScreeningResult:
+        """Result for the complete upload at `video_path`."""
+        if not os.path.isfile(video_path):
+            return _missing_video_result()
+        if self.rejected:
+            return self._rejection(StageTimings(), 0.0)
+
+        self.sha256 = file_sha256(video_path)
+        if not self.parts:
+            # Not a streamable container (or too short to have been fed)
+            return analyze_video(
+                video_path,
+                video_model_weight            = self.params.video_model_weight,
+                mediapipe_quality_weight      = self.params.mediapipe_quality_weight,
+                min_face_ratio_for_confidence = self.params.min_face_ratio_for_confidence,
+                target_fps                    = self.opts.target_fps,
+                vgg_batch_size                = self.opts.vgg_batch_size,
+                roi_mode                      = self.opts.roi_mode,
+                inference_size                = self.opts.inference_size,
+                use_cache                     = self.cache is not None,
+                quality_gate                  = self.gate,
+                prefetch                      = self.opts.prefetch,
+                video_sha256                  = self.sha256,
+            )
+
+        t0           = time.perf_counter()
+        verdict      = None
+        gate_timings = StageTimings()
+        if self.gate is not None and not self.gate.seconds:
+            # As in analyze_video: samples spread over the whole video
+            with gate_timings.stage("quality_gate"):
+                verdict = _run_quality_gate(video_path, self.gate)
+            if not verdict["passed"]:
+                self.verdict = verdict
+                return self._rejection(gate_timings, time.perf_counter() - t0)
+
+        size = os.path.getsize(video_path)
+        if size > self.analysed:
+            self._pass(video_path, size)
+        outputs  = _merge_segments(self.parts)
+        features = _features_from_outputs(outputs, self.opts)
+        timings  = features["timings"].merge(gate_timings)
+
+        if self.cache is not None:
+            with timings.stage("cache"):
+                key = self.cache.key(self.sha256, _cache_options(self.opts, self.predictor))
+                self.cache.put(key, features)
+            features["cache"] = {"key": key, "hit": False}
+        features.pop("trajectories", None)
+        if verdict is not None:
+            features["quality_gate"] = verdict
+        elif self.gate is not None:
+            with timings.stage("quality_gate"):
+                features["quality_gate"] = _gate_verdict(features, self.gate)
+
+        prob = label = None
+        lstm = StageTimings()
+        if "quality_gate" in features and not features["quality_gate"]["passed"]:
+            features = {"quality_gate": features["quality_gate"], "timings": timings}
+        elif self.predictor is not None:
+            with lstm.stage("lstm"):
+                prob, label = _predict_from_features(self.predictor, features["vgg16_features"])
+        features["elapsed"] = self.elapsed + time.perf_counter() - t0
+        return _timed_result(features, prob, label, lstm, self.params)
+
+    def _rejection(self, timings: StageTimings, elapsed: float) -> ScreeningResult:
+        """The gate rejection, timed over the passes so far plus `timings`."""
+        for part in self.parts:
+            timings = timings.merge(part["timings"])
+        features = {"quality_gate": self.verdict, "timings": timings,
+                    "elapsed": self.elapsed + elapsed}
+        return _timed_result(features, None, None, StageTimings(), self.params)
+
+    def finish_with_explainability(self, video_path: str) -> dict:
+        """finish() in the analyze_video_with_explainability format."""
+        return _explained(self.finish(video_path), self.params)
+
+    # ── Between passes ────────────────────────────────────────────────────────
+
+    _STATE = ("header", "parts", "stride", "next_frame", "analysed", "elapsed", "verdict")
+
+    def save(self, path: str) -> None:
+        """Write the progress so far (not the models) for restore() in a later pass."""
+        state = {"version": STATE_VERSION, **{k: getattr(self, k) for k in self._STATE}}
+        tmp   = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def restore(self, path: str) -> bool:
+        """Continue from a save(); False (starting afresh) when there is none."""
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get("version") != STATE_VERSION:
+            return False
+        for key in self._STATE:
+            setattr(self, key, state[key])
+        return True
+
+
+def _copy_bytes(src: BinaryIO, dst: BinaryIO, n: int) -> None:
+    while n > 0:
+        block = src.read(min(n, 1 << 20))
+        if not block:
+            raise EOFError("upload is shorter than the bytes reported received")
+        dst.write(block)
+        n -= len(block)
@@ -0,0 +1,73 @@
+"""
+Bulk conversion of MediaPipe landmark lists to NumPy.
+
+MediaPipe returns landmarks as protobuf messages.  The consumers used to read
+them with per-landmark Python loops, building a fresh float64 array (and for
+the eyes a handful of small arrays) every frame.  LandmarkBuffer streams the
+coordinates (one ``map(attrgetter(...))`` pass, flattened) through
+``np.fromiter`` as float32 straight into a buffer that is allocated once per
+consumer and reused for every frame — no per-frame lists or float64 arrays.
+
+``select`` converts only the requested landmark indices, so the six Face Mesh
+eye points are read without touching the other ~470 landmarks.
+
+MediaPipe stores coordinates as float32, so the buffers are lossless.
+"""
+
+from __future__ import annotations
+
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+FACE_MESH_LANDMARKS = 478   # 468 mesh points + 10 iris points (refine_landmarks)
+POSE_LANDMARKS      = 33
+
+_GETTERS = {
+    2: attrgetter("x", "y"),
+    3: attrgetter("x", "y", "z"),
+}
+
+
+class LandmarkBuffer:
+    """
+    Reusable (landmarks, dims) float32 buffer for one consumer.
+
+    The returned arrays are views into the buffer: they are overwritten by the
+    next ``fill`` / ``select`` call, so copy anything that must outlive a frame.
+    """
+
+    def __init__(self, capacity: int, dims: int = 3):
+        if dims not in _GETTERS:
+            raise ValueError(f"dims must be one of {sorted(_GETTERS)}")
+        self.dims  = dims
+        self._get  = _GETTERS[dims]
+        self._buf  = np.empty((capacity, dims), dtype=np.float32)
+        self._idx: dict[tuple, list[int]] = {}
+
+    def _rows(self, n: int) -> np.ndarray:
+        if n > len(self._buf):
+            self._buf = np.empty((n, self.dims), dtype=np.float32)
+        return self._buf[:n]
+
+    def _read(self, out: np.ndarray, landmarks) -> np.ndarray:
+        coords = chain.from_iterable(map(self._get, landmarks))
+        out.reshape(-1)[:] = np.fromiter(coords, dtype=np.float32, count=out.size)
+        return out
+
+    def fill(self, landmarks) -> np.ndarray:
+        """All landmarks → (n, dims) view."""
+        return self._read(self._rows(len(landmarks)), landmarks)
+
+    def available(self, indices: tuple[int, ...], n: int) -> list[int]:
+        """The subset of `indices` present in an n-landmark list (cached)."""
+        key = (indices, n)
+        if key not in self._idx:
+            self._idx[key] = [i for i in indices if i < n]
+        return self._idx[key]
+
+    def select(self, landmarks, indices: tuple[int, ...]) -> np.ndarray:
+        """Only `indices` (those present in the list) → (k, dims) view, in order."""
+        idx = self.available(indices, len(landmarks))
+        return self._read(self._rows(len(idx)), map(landmarks.__getitem__, idx))
@@ -0,0 +1,246 @@
+"""
+Lightweight stage profiling for the screening pipeline.
+
+StageTimings     per-analysis accumulator — wall-clock and CPU seconds, frames
+                 and memory per stage (decode, face_mesh, pose, vgg16, lstm,
+                 ...).  Rendered into ScreeningResult.details["timings"].
+MetricsRegistry  process-wide histograms of stage wall time, fed by every
+                 analysis.  Exported as a dict or Prometheus text; snapshots of
+                 several worker processes merge by addition.
+
+Cost is a couple of clock reads per frame and stage, so it stays on in
+production.
+
+    from ml.metrics import metrics, prometheus
+    prometheus(metrics.snapshot())   → "screening_stage_seconds_bucket{stage=...} ..."
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+# Histogram bucket upper bounds, seconds
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process over its whole lifetime so far
+    (None where unsupported) — not attributable to any one stage.
+    """
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process right now (None where unsupported)."""
+    try:
+        with open("/proc/self/statm") as f:    # Linux: size resident shared ... (pages)
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * _PAGE_SIZE / (1 << 20), 1)
+
+
+class StageTimings:
+    """
+    Wall / CPU seconds, frames and memory per pipeline stage of one analysis.
+
+    Memory per stage is `rss_delta_mb`, the largest change in current RSS
+    over one run of the stage (stages interleaved frame by frame — decode and
+    the frame consumers — each get the whole frame loop's).  `peak_rss_mb` is
+    the process-lifetime peak when the stage ended, so it only ever grows.
+    """
+
+    def __init__(self):
+        # name → [wall_s, cpu_s, frames, peak_rss_mb, rss_delta_mb]
+        self.stages: dict[str, list] = {}
+
+    def add(self, name: str, wall: float, cpu: float, frames: int = 0) -> None:
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = [0.0, 0.0, 0, None, None]
+        s[0] += wall
+        s[1] += cpu
+        s[2] += frames
+
+    def mark_rss(self, *names: str, since: Optional[float] = None) -> None:
+        """
+        Record the process peak RSS against the given stages, and the change
+        in current RSS `since` a current_rss_mb() reading taken when they began.
+        """
+        rss   = peak_rss_mb()
+        now   = current_rss_mb() if since is not None else None
+        delta = round(now - since, 1) if now is not None else None
+        for name in names:
+            s = self.stages.get(name)
+            if s is None:
+                continue
+            s[3] = rss
+            if delta is not None:
+                s[4] = delta if s[4] is None else max(s[4], delta)
+
+    @contextmanager
+    def stage(self, name: str, frames: int = 0) -> Iterator[None]:
+        w0, c0, m0 = time.perf_counter(), time.process_time(), current_rss_mb()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - w0, time.process_time() - c0, frames)
+            self.mark_rss(name, since=m0)
+
+    def merge(self, other: Optional["StageTimings"]) -> "StageTimings":
+        """Add another analysis part (e.g. a parallel segment) into this one."""
+        if other is None:
+            return self
+        for name, (wall, cpu, frames, rss, delta) in other.stages.items():
+            self.add(name, wall, cpu, frames)
+            mine = self.stages[name]
+            if rss is not None:
+                mine[3] = rss if mine[3] is None else max(mine[3], rss)
+            if delta is not None:
+                mine[4] = delta if mine[4] is None else max(mine[4], delta)
+        return self
+
+    def as_dict(self) -> dict:
+        return {
+            name: {
+                "wall_s":       round(wall, 6),
+                "cpu_s":        round(cpu, 6),
+                "frames":       frames,
+                "rss_delta_mb": delta,
+                "peak_rss_mb":  rss,
+            }
+            for name, (wall, cpu, frames, rss, delta) in self.stages.items()
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe, process-wide stage histograms (Prometheus-style, cumulative)."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock   = threading.Lock()
+        self._stages: dict[str, dict] = {}
+        self._peak_rss_mb: Optional[float] = None
+
+    def observe(self, timings: dict) -> None:
+        """Record one analysis' details["timings"] (one observation per stage)."""
+        with self._lock:
+            for name, t in timings.items():
+                s = self._stages.get(name)
+                if s is None:
+                    s = self._stages[name] = {
+                        "count": 0, "wall_s": 0.0, "cpu_s": 0.0, "frames": 0,
+                        "buckets": [0] * len(self.buckets),
+                    }
+                s["count"]  += 1
+                s["wall_s"] += t["wall_s"]
+                s["cpu_s"]  += t["cpu_s"]
+                s["frames"] += t["frames"]
+                for i, bound in enumerate(self.buckets):
+                    if t["wall_s"] <= bound:
+                        s["buckets"][i] += 1
+            self._peak_rss_mb = peak_rss_mb()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "buckets":     list(self.buckets),
+                "stages":      json.loads(json.dumps(self._stages)),
+                "peak_rss_mb": self._peak_rss_mb,
+            }
+
+    def dump(self, path: Path) -> None:
+        """Atomically write snapshot() as JSON, for collection by another process."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Sum snapshots of several processes (same buckets); peak RSS is the max."""
+    merged: dict = {"buckets": list(DEFAULT_BUCKETS), "stages": {}, "peak_rss_mb": None}
+    for snap in snapshots:
+        merged["buckets"] = snap["buckets"]
+        for name, s in snap["stages"].items():
+            m = merged["stages"].setdefault(
+                name, {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "frames": 0,
+                       "buckets": [0] * len(snap["buckets"])},
+            )
+            for key in ("count", "wall_s", "cpu_s", "frames"):
+                m[key] += s[key]
+            m["buckets"] = [a + b for a, b in zip(m["buckets"], s["buckets"])]
+        if snap.get("peak_rss_mb") is not None:
+            merged["peak_rss_mb"] = max(merged["peak_rss_mb"] or 0.0, snap["peak_rss_mb"])
+    return merged
+
+
+def collect(directory: Path, include_self: bool = True) -> dict:
+    """Merge the snapshot files in `directory` (one per worker) with this process."""
+    snapshots = [metrics.snapshot()] if include_self else []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return merge_snapshots(snapshots)
+
+
+def prometheus(snapshot: dict) -> str:
+    """Prometheus text exposition of a snapshot."""
+    lines = [
+        "# HELP screening_stage_seconds Wall-clock seconds per screening pipeline stage",
+        "# TYPE screening_stage_seconds histogram",
+    ]
+    for name, s in sorted(snapshot["stages"].items()):
+        for bound, count in zip(snapshot["buckets"], s["buckets"]):
+            lines.append(f'screening_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'screening_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {s["count"]}')
+        lines.append(f'screening_stage_seconds_sum{{stage="{name}"}} {s["wall_s"]}')
+        lines.append(f'screening_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+
+    lines += [
+        "# HELP screening_stage_cpu_seconds_total CPU seconds per screening pipeline stage",
+        "# TYPE screening_stage_cpu_seconds_total counter",
+    ]
+    lines += [
+        f'screening_stage_cpu_seconds_total{{stage="{name}"}} {s["cpu_s"]}'
+        for name, s in sorted(snapshot["stages"].items())
+    ]
+    lines += [
+        "# HELP screening_stage_frames_total Frames processed per screening pipeline stage",
+        "# TYPE screening_stage_frames_total counter",
+    ]
+    lines += [
+        f'screening_stage_frames_total{{stage="{name}"}} {s["frames"]}'
+        for name, s in sorted(snapshot["stages"].items())
+    ]
+    if snapshot.get("peak_rss_mb") is not None:
+        lines += [
+            "# HELP screening_peak_rss_bytes Peak resident set size of the screening processes",
+            "# TYPE screening_peak_rss_bytes gauge",
+            f"screening_peak_rss_bytes {int(snapshot['peak_rss_mb'] * (1 << 20))}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
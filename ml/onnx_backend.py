@@ -0,0 +1,293 @@
+"""
+ONNX Runtime backend for the backbone+LSTM video classifier.
+
+The Keras path imports TensorFlow (slow) and runs the frame backbone (VGG16
+by default, see ml/backbones.py) and the LSTM head through Keras on CPU.
+``export`` converts both to ONNX once; when the exported files are present,
+``_load_video_classifier`` serves an OnnxVideoClassifier instead.  It exposes
+the same attributes the pipeline uses (``backbone_model.predict``,
+``model.predict``, ``labels``, ``labels_idx2word``, ``expected_frames``) and
+needs neither TensorFlow nor Keras at inference time.
+
+Files (next to the Keras weights, models/autism_data/onnx/):
+    backbone.onnx / lstm.onnx             float32 graphs
+    backbone.int8.onnx / lstm.int8.onnx   dynamic int8 quantization (--quantize)
+    meta.json                             labels, expected_frames, backbone,
+                                          weights hash
+
+Int8 quantizes the dense (MatMul / Gemm) and LSTM weights; the convolutions
+stay float32 because ONNX Runtime's integer convolutions are slower than its
+float ones on x86 CPUs.
+
+Backend selection (environment):
+    NEUROTHRIVE_VIDEO_BACKEND   auto (default: onnx when exported, else keras)
+                                | onnx | onnx-int8 | keras
+    NEUROTHRIVE_ONNX_THREADS    intra-op threads per session (default: ORT's)
+
+    python -m ml.onnx_backend export [--quantize]
+    python -m ml.onnx_backend check [video ...] [--int8] [--tolerance 1e-3]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.backbones import DEFAULT_BACKBONE, backbone_model, get_backbone, head_paths  # noqa: E402
+from ml.cache import file_sha256  # noqa: E402
+
+MODEL_DIR     = Path(__file__).resolve().parent / "video-asd-model" / "models" / "autism_data"
+ONNX_DIR      = MODEL_DIR / "onnx"
+DEFAULT_OPSET = 13
+
+
+def _weights_sha256(backbone: str) -> Optional[str]:
+    """Hash of the Keras head weights an export was (or would be) made from."""
+    weights = head_paths(MODEL_DIR, backbone)[1]
+    return file_sha256(str(weights)) if weights.exists() else None
+
+
+def _paths(directory: Path, quantized: bool) -> dict[str, Path]:
+    suffix = ".int8.onnx" if quantized else ".onnx"
+    return {
+        "backbone": directory / f"backbone{suffix}",
+        "lstm":     directory / f"lstm{suffix}",
+        "meta":     directory / "meta.json",
+    }
+
+
+# ── Inference ─────────────────────────────────────────────────────────────────
+
+class _OnnxModel:
+    """Keras-style ``predict`` over an ONNX Runtime CPU session."""
+
+    def __init__(self, path: Path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(os.environ.get("NEUROTHRIVE_ONNX_THREADS", 0))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session    = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"],
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, x: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        # The whole array is one ORT run; batch_size / verbose are Keras-only
+        return self.session.run(None, {self.input_name: np.asarray(x, dtype=np.float32)})[0]
+
+
+class OnnxVideoClassifier:
+    """Drop-in replacement for vgg16LSTMVideoClassifier at inference time."""
+
+    def __init__(self, directory: Path = ONNX_DIR, quantized: bool = False):
+        paths    = _paths(Path(directory), quantized)
+        meta     = json.loads(paths["meta"].read_text())
+        backbone = get_backbone(meta.get("backbone", DEFAULT_BACKBONE))
+
+        self.backend          = "onnx-int8" if quantized else "onnx"
+        self.backbone         = backbone.name
+        self.backbone_model   = _OnnxModel(paths["backbone"])
+        self.preprocess_input = backbone.preprocess
+        self.rgb              = backbone.rgb
+        self.model            = _OnnxModel(paths["lstm"])
+        self.expected_frames  = meta["expected_frames"]
+        # Keras keeps labels as {word: index}; only the key order is used
+        self.labels           = {word: i for i, word in enumerate(meta["labels"])}
+        self.labels_idx2word  = {int(k): v for k, v in meta["labels_idx2word"].items()}
+
+
+def load(
+    directory: Path = ONNX_DIR,
+    quantized: bool = False,
+    backbone:  str  = DEFAULT_BACKBONE,
+) -> Optional[OnnxVideoClassifier]:
+    """
+    The exported classifier, or None when onnxruntime or the files are missing,
+    or the export was made for another backbone or from other Keras weights.
+    """
+    paths = _paths(Path(directory), quantized)
+    if not all(p.exists() for p in paths.values()):
+        return None
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return None
+
+    meta = json.loads(paths["meta"].read_text())
+    if meta.get("backbone", DEFAULT_BACKBONE) != backbone:
+        return None
+    weights = _weights_sha256(backbone)
+    if weights is not None and meta.get("weights_sha256") != weights:
+        print(f"[onnx] {directory} was exported from other weights; re-run export")
+        return None
+    return OnnxVideoClassifier(directory, quantized)
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+
+def export(
+    predictor,
+    directory: Path = ONNX_DIR,
+    quantize:  bool = False,
+    opset:     int  = DEFAULT_OPSET,
+) -> dict[str, str]:
+    """Convert a loaded Keras classifier to ONNX (+ int8); returns written paths."""
+    import tensorflow as tf
+    import tf2onnx
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    fp32, int8 = _paths(directory, False), _paths(directory, True)
+
+    backbone = getattr(predictor, "backbone", DEFAULT_BACKBONE)
+    written  = {}
+    for name, model in (("backbone", backbone_model(predictor)), ("lstm", predictor.model)):
+        spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input"),)
+        tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset,
+                                   output_path=str(fp32[name]))
+        written[name] = str(fp32[name])
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(
+                str(fp32[name]), str(int8[name]),
+                weight_type=QuantType.QInt8,
+                op_types_to_quantize=["MatMul", "Gemm", "LSTM"],
+            )
+            written[f"{name}.int8"] = str(int8[name])
+
+    meta = {
+        "labels":          [str(word) for word in predictor.labels],
+        "labels_idx2word": {str(k): str(v) for k, v in predictor.labels_idx2word.items()},
+        "expected_frames": int(predictor.expected_frames),
+        "opset":           opset,
+        "backbone":        backbone,
+        "weights_sha256":  _weights_sha256(backbone),
+    }
+    fp32["meta"].write_text(json.dumps(meta, indent=2))
+    written["meta"] = str(fp32["meta"])
+    return written
+
+
+# ── Parity / speed check ──────────────────────────────────────────────────────
+
+def _run(predictor, video_path: str) -> tuple[Optional[np.ndarray], np.ndarray, float, float]:
+    """(backbone features, LSTM softmax row, backbone seconds, head seconds)."""
+    from ml.frames import FrameSource
+    from ml.screening import VGG16FeatureConsumer, _pad_sequence
+
+    source = FrameSource(video_path, target_fps=1.0)
+    source.register(VGG16FeatureConsumer(predictor))
+    features = source.run()["vgg16"]["features"]
+    backbone = source.timings.stages["vgg16"][0]   # the feature consumer's stage name
+    if features is None:
+        return None, np.array([]), backbone, 0.0
+
+    x  = _pad_sequence(features, predictor.expected_frames)[None]
+    t0 = time.perf_counter()
+    probs = predictor.model.predict(x, batch_size=1, verbose=0)[0]
+    return features, probs, backbone, time.perf_counter() - t0
+
+
+def check(videos: list[str], quantized: bool = False, repeat: int = 3) -> dict:
+    """
+    Run the Keras and ONNX classifiers on the same videos: probability parity
+    and CPU time of the backbone and head (best of `repeat`, after a warm-up).
+    """
+    from ml.screening import _asd_probability, _load_keras_classifier
+
+    keras_predictor = _load_keras_classifier()
+    onnx_predictor  = load(quantized=quantized)
+    if keras_predictor is None or onnx_predictor is None:
+        raise RuntimeError("Both the Keras weights and the ONNX export are needed")
+
+    report = {"backend": onnx_predictor.backend, "videos": []}
+    totals = {"keras": [0.0, 0.0], "onnx": [0.0, 0.0]}
+    for video in videos:
+        row = {"path": video}
+        for name, predictor in (("keras", keras_predictor), ("onnx", onnx_predictor)):
+            _run(predictor, video)   # warm-up
+            runs = [_run(predictor, video) for _ in range(max(1, repeat))]
+            features, probs = runs[0][0], runs[0][1]
+            backbone = min(r[2] for r in runs)
+            head     = min(r[3] for r in runs)
+            totals[name][0] += backbone
+            totals[name][1] += head
+            row[name] = {
+                "features":   features,
+                "probs":      probs,
+                "prob_asd":   _asd_probability(predictor, probs) if probs.size else None,
+                "backbone_s": round(backbone, 4),
+                "head_s":     round(head, 4),
+            }
+        k, o = row["keras"], row["onnx"]
+        if k["probs"].size and o["probs"].size:
+            row["max_prob_diff"]    = float(np.max(np.abs(k["probs"] - o["probs"])))
+            row["max_feature_diff"] = float(np.max(np.abs(k["features"] - o["features"])))
+            row["same_label"]       = int(np.argmax(k["probs"])) == int(np.argmax(o["probs"]))
+        for name in ("keras", "onnx"):
+            for key in ("features", "probs"):
+                row[name].pop(key)
+        report["videos"].append(row)
+
+    diffs = [v["max_prob_diff"] for v in report["videos"] if "max_prob_diff" in v]
+    report["max_prob_diff"]    = max(diffs) if diffs else None
+    report["backbone_speedup"] = round(totals["keras"][0] / totals["onnx"][0], 2) if totals["onnx"][0] else None
+    report["head_speedup"]     = round(totals["keras"][1] / totals["onnx"][1], 2) if totals["onnx"][1] else None
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export / check the ONNX video classifier")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="convert the Keras classifier to ONNX")
+    p_export.add_argument("--quantize", action="store_true", help="also write int8 models")
+    p_export.add_argument("--opset", type=int, default=DEFAULT_OPSET)
+    p_export.add_argument("--out", type=Path, default=ONNX_DIR)
+
+    p_check = sub.add_parser("check", help="probability parity and CPU speedup vs Keras")
+    p_check.add_argument("videos", nargs="*", default=[str(ROOT / "test_video.mp4")])
+    p_check.add_argument("--int8", action="store_true", help="check the quantized models")
+    p_check.add_argument("--repeat", type=int, default=3)
+    p_check.add_argument("--tolerance", type=float, default=1e-3,
+                         help="max allowed |P_keras - P_onnx| (int8: try 0.05)")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from ml.screening import _load_keras_classifier
+        predictor = _load_keras_classifier()
+        if predictor is None:
+            print("Keras classifier not available (weights or Keras missing)")
+            return 1
+        for name, path in export(predictor, args.out, args.quantize, args.opset).items():
+            print(f"{name:<11} {path}")
+        return 0
+
+    report = check(args.videos, quantized=args.int8, repeat=args.repeat)
+    print(json.dumps(report, indent=2))
+    if report["max_prob_diff"] is not None and report["max_prob_diff"] > args.tolerance:
+        print(f"[onnx] parity FAILED: {report['max_prob_diff']:.2e} > {args.tolerance:.0e}")
+        return 1
+    print(f"[onnx] parity OK; backbone {report['backbone_speedup']}x, "
+          f"head {report['head_speedup']}x faster than Keras")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
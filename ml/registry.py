@@ -0,0 +1,202 @@
+"""
+Process-resident model registry.
+
+Loads each model once per process and keeps it warm, so steady-state
+screenings pay no model-construction cost.
+
+Two kinds of entries
+--------------------
+register(name, loader)        shared singleton (e.g. the VGG16+LSTM classifier).
+                              ``get(name)`` returns the same object every time.
+register_pool(name, factory)  stateful, non-thread-safe graphs (MediaPipe
+                              FaceMesh / Pose).  ``lease(name)`` hands out an
+                              idle instance and returns it to the pool after use.
+
+A loader may return None to signal "not available here" (e.g. weights
+absent); that state is cached and reported by ``health()`` until ``reload``.
+A loader that raises is reported as "error" and retried on the next access.
+
+    from ml.registry import models
+    models.register("behavioral", lambda: joblib.load(path))
+    models.warm_up()
+    models.health()   → {"behavioral": {"state": "ready", "load_seconds": 0.4, ...}}
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+UNLOADED    = "unloaded"
+LOADING     = "loading"
+READY       = "ready"
+UNAVAILABLE = "unavailable"   # loader returned None
+FAILED      = "error"         # loader raised
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], pooled: bool, max_idle: int):
+        self.name         = name
+        self.loader       = loader
+        self.pooled       = pooled
+        self.max_idle     = max_idle
+        self.lock         = threading.Lock()
+        self.state        = UNLOADED
+        self.value: Any   = None
+        self.idle: list   = []
+        self.created      = 0
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str]          = None
+
+    def _build(self) -> Any:
+        t0 = time.perf_counter()
+        try:
+            value = self.loader()
+        except Exception as e:
+            self.state, self.error = FAILED, f"{type(e).__name__}: {e}"
+            raise
+        self.load_seconds = round(time.perf_counter() - t0, 4)
+        self.error        = None
+        if value is not None:
+            self.created += 1
+        if not self.pooled:
+            # get() reads value lock-free once state says so: publish it first
+            self.value = value
+        self.state = READY if value is not None else UNAVAILABLE
+        return value
+
+    def status(self) -> dict:
+        out = {
+            "state":        self.state,
+            "kind":         "pool" if self.pooled else "singleton",
+            "load_seconds": self.load_seconds,
+            "error":        self.error,
+        }
+        if self.pooled:
+            out["instances_created"] = self.created
+            out["instances_idle"]    = len(self.idle)
+        return out
+
+
+class ModelRegistry:
+    """Thread-safe, lazily-loading registry of warm models."""
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    # ── Registration ──────────────────────────────────────────────────────────
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register a shared singleton.  Re-registering an existing name is a no-op."""
+        self._add(name, loader, pooled=False, max_idle=0)
+
+    def register_pool(self, name: str, factory: Callable[[], Any], max_idle: int = 4) -> None:
+        """Register a pool of per-request instances (at most `max_idle` kept warm)."""
+        self._add(name, factory, pooled=True, max_idle=max_idle)
+
+    def _add(self, name: str, loader: Callable[[], Any], pooled: bool, max_idle: int) -> None:
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, pooled, max_idle)
+
+    def _entry(self, name: str) -> _Entry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Model '{name}' is not registered") from None
+
+    # ── Access ────────────────────────────────────────────────────────────────
+
+    def get(self, name: str) -> Any:
+        """Return the resident singleton, loading it on first use (None if unavailable)."""
+        entry = self._entry(name)
+        if entry.pooled:
+            raise TypeError(f"Model '{name}' is pooled — use lease()")
+        if entry.state in (READY, UNAVAILABLE):
+            return entry.value
+        with entry.lock:
+            if entry.state not in (READY, UNAVAILABLE):
+                entry.state = LOADING
+                entry._build()
+            return entry.value
+
+    def acquire(self, name: str) -> Any:
+        """Take an idle pooled instance, building a new one if none is idle."""
+        entry = self._entry(name)
+        if not entry.pooled:
+            raise TypeError(f"Model '{name}' is a singleton — use get()")
+        with entry.lock:
+            if entry.idle:
+                return entry.idle.pop()
+            if entry.state == UNLOADED:
+                entry.state = LOADING
+        return entry._build()
+
+    def release(self, name: str, instance: Any) -> None:
+        """Return a pooled instance; closed if the pool is already full."""
+        if instance is None:
+            return
+        entry = self._entry(name)
+        reset = getattr(instance, "reset", None)
+        if callable(reset):
+            try:
+                reset()   # drop tracking state carried over from the last video
+            except Exception:
+                pass
+        with entry.lock:
+            if len(entry.idle) < entry.max_idle:
+                entry.idle.append(instance)
+                return
+        close = getattr(instance, "close", None)
+        if callable(close):
+            close()
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        instance = self.acquire(name)
+        try:
+            yield instance
+        finally:
+            self.release(name, instance)
+
+    # ── Lifecycle / health ────────────────────────────────────────────────────
+
+    def warm_up(self, names: Optional[list[str]] = None) -> dict:
+        """
+        Load singletons and pre-build one instance of each pool; returns health().
+        Failures are recorded in the entry's health state instead of raised.
+        """
+        for name in names or list(self._entries):
+            entry = self._entry(name)
+            try:
+                if entry.pooled:
+                    self.release(name, self.acquire(name))
+                else:
+                    self.get(name)
+            except Exception:
+                pass
+        return self.health()
+
+    def reload(self, name: str) -> None:
+        """Forget the cached model / pool so the next access reloads it."""
+        entry = self._entry(name)
+        with entry.lock:
+            idle, entry.idle = entry.idle, []
+            entry.state, entry.value, entry.error = UNLOADED, None, None
+        for instance in idle:
+            close = getattr(instance, "close", None)
+            if callable(close):
+                close()
+
+    def health(self) -> dict:
+        return {name: entry.status() for name, entry in self._entries.items()}
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._entries and self._entries[name].state == READY
+
+
+# Process-wide registry
+models = ModelRegistry()
@@ -0,0 +1,100 @@
+"""
+Face-ROI tracking and downscaled inference for the MediaPipe stages.
+
+On high-resolution uploads most pixels are far from the child's face.
+FaceROITracker crops each frame around the previous frame's face bounding box
+(plus a margin), downscales the crop to ``inference_size`` and maps the
+resulting landmarks back to normalised full-frame coordinates, so metrics
+such as eye_landmark_variance stay comparable with full-frame inference.
+When the face is lost the next frame is searched at full resolution.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_INFERENCE_SIZE = 320    # long side (px) of the image handed to MediaPipe
+DEFAULT_ROI_MARGIN     = 0.35   # extra context around the face box, per side
+
+
+def downscale_rgb(bgr: np.ndarray, max_side: int) -> np.ndarray:
+    """BGR frame → RGB image whose long side is at most `max_side`."""
+    h, w  = bgr.shape[:2]
+    scale = max_side / max(h, w)
+    if scale < 1.0:
+        bgr = cv2.resize(bgr, (max(1, int(w * scale)), max(1, int(h * scale))),
+                         interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+
+class FaceROITracker:
+    """Tracks the face box across frames and converts ROI ↔ full-frame coordinates."""
+
+    def __init__(
+        self,
+        inference_size: int   = DEFAULT_INFERENCE_SIZE,
+        margin:         float = DEFAULT_ROI_MARGIN,
+    ):
+        self.inference_size = inference_size
+        self.margin         = margin
+        # Face box from the last frame, normalised full-frame (x0, y0, x1, y1)
+        self.box: Optional[tuple[float, float, float, float]] = None
+        # Region handed to MediaPipe for the current frame, normalised (x0, y0, w, h)
+        self.roi: tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)
+        self.full_searches = 0
+        self.roi_frames    = 0
+
+    def prepare(self, bgr: np.ndarray) -> np.ndarray:
+        """RGB image for this frame: a downscaled face crop, or the full frame when lost."""
+        h, w = bgr.shape[:2]
+        if self.box is None:
+            self.roi = (0.0, 0.0, 1.0, 1.0)
+            self.full_searches += 1
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+        bx0, by0, bx1, by1 = self.box
+        # Square crop in pixel space so MediaPipe sees an undistorted face
+        side = max((bx1 - bx0) * w, (by1 - by0) * h) * (1.0 + 2.0 * self.margin)
+        cx   = (bx0 + bx1) / 2.0 * w
+        cy   = (by0 + by1) / 2.0 * h
+        x0   = int(max(0, np.floor(cx - side / 2.0)))
+        y0   = int(max(0, np.floor(cy - side / 2.0)))
+        x1   = int(min(w, np.ceil(cx + side / 2.0)))
+        y1   = int(min(h, np.ceil(cy + side / 2.0)))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.box = None
+            return self.prepare(bgr)
+
+        self.roi = (x0 / w, y0 / h, (x1 - x0) / w, (y1 - y0) / h)
+        self.roi_frames += 1
+        return downscale_rgb(bgr[y0:y1, x0:x1], self.inference_size)
+
+    def to_full(self, pts: np.ndarray) -> np.ndarray:
+        """Map (N, 2|3) landmarks normalised to the ROI into full-frame coordinates."""
+        rx, ry, rw, rh = self.roi
+        out = np.array(pts, dtype=np.float64, copy=True)
+        out[:, 0] = rx + out[:, 0] * rw
+        out[:, 1] = ry + out[:, 1] * rh
+        if out.shape[1] > 2:
+            out[:, 2] *= rw   # MediaPipe z uses the same scale as x
+        return out
+
+    def update(self, pts_full: Optional[np.ndarray]) -> None:
+        """Record this frame's face (full-frame landmarks), or None when no face was found."""
+        if pts_full is None or len(pts_full) == 0:
+            self.box = None
+            return
+        x0, y0 = np.clip(pts_full[:, :2].min(axis=0), 0.0, 1.0)
+        x1, y1 = np.clip(pts_full[:, :2].max(axis=0), 0.0, 1.0)
+        self.box = (float(x0), float(y0), float(x1), float(y1)) if x1 > x0 and y1 > y0 else None
+
+    def stats(self) -> dict:
+        return {
+            "inference_size": self.inference_size,
+            "margin":         self.margin,
+            "roi_frames":     self.roi_frames,
+            "full_searches":  self.full_searches,
+        }
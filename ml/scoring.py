@@ -0,0 +1,166 @@
+"""
+Risk scoring from extracted screening features.
+
+The risk formula is kept apart from feature extraction so a stored screening
+can be re-scored with different parameters without decoding the video again:
+
+    from ml.screening import rescore, rescore_many
+    rescore(result.details["score_features"], video_model_weight=0.7)
+    rescore_many(stored_features, fixation_threshold=0.03)   → np.ndarray
+
+ScoringParams   tunable parameters (defaults = the production formula)
+risk_scores     the formula over numpy arrays — scores one screening or
+                thousands in a single vectorised pass
+fixation_time   gaze fixation seconds from an eye-centre trajectory, used when
+                the fixation threshold differs from the one used at extraction
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ml.cache import default_cache
+
+DEFAULT_FIXATION_THRESHOLD = 0.02   # 2% normalised eye movement per source frame
+MIN_FIXATION_SAMPLES       = 6      # fewer valid eye centres → no fixation estimate
+
+# Fallback heuristic (video model unavailable)
+_FALLBACK_FIXATION_WEIGHT = 0.50
+_FALLBACK_GESTURE_WEIGHT  = 0.35
+_FALLBACK_FACE_WEIGHT     = 0.15
+_FIXATION_SATURATION_SEC  = 10.0    # fixation at or above this → no fixation risk
+
+# Scalar columns of a score_features dict used by the formula
+_COLUMNS = (
+    "video_model_prob",
+    "face_detection_ratio",
+    "gaze_fixation_time",
+    "gesture_anomaly_score",
+)
+
+
+@dataclass(frozen=True)
+class ScoringParams:
+    """Tunable parameters of the risk formula."""
+
+    video_model_weight:            float = 0.85
+    mediapipe_quality_weight:      float = 0.15
+    min_face_ratio_for_confidence: float = 0.30
+    fixation_threshold:            float = DEFAULT_FIXATION_THRESHOLD
+    gesture_scale:                 float = 100.0   # pose variance → gesture risk
+
+
+DEFAULT_PARAMS = ScoringParams()
+
+
+def risk_scores(
+    video_prob,
+    face_ratio,
+    fixation_time,
+    gesture_score,
+    params: ScoringParams = DEFAULT_PARAMS,
+) -> np.ndarray:
+    """
+    Risk formula over broadcastable arrays (or scalars).
+
+    Rows whose ``video_prob`` is NaN have no video-model output and use the
+    MediaPipe fallback heuristic instead.
+    """
+    video_prob    = np.asarray(video_prob,    dtype=np.float64)
+    face_ratio    = np.asarray(face_ratio,    dtype=np.float64)
+    fixation_time = np.asarray(fixation_time, dtype=np.float64)
+    gesture_score = np.asarray(gesture_score, dtype=np.float64)
+
+    # Quality adjustment: downweight the video model when the face is rarely seen
+    min_ratio      = params.min_face_ratio_for_confidence
+    quality_factor = np.minimum(face_ratio / min_ratio, 1.0) if min_ratio > 0 else 1.0
+    model_risk = np.clip(
+        params.video_model_weight * video_prob * quality_factor
+        + params.mediapipe_quality_weight * (1.0 - face_ratio),
+        0.0, 1.0,
+    )
+
+    # Low fixation → higher risk; high gesture variance → higher risk
+    fixation_risk = np.maximum(0.0, 1.0 - fixation_time / _FIXATION_SATURATION_SEC)
+    gesture_risk  = np.minimum(1.0, gesture_score * params.gesture_scale)
+    fallback_risk = np.clip(
+        _FALLBACK_FIXATION_WEIGHT * fixation_risk
+        + _FALLBACK_GESTURE_WEIGHT * gesture_risk
+        + _FALLBACK_FACE_WEIGHT * (1.0 - face_ratio),
+        0.0, 1.0,
+    )
+    return np.where(np.isnan(video_prob), fallback_risk, model_risk)
+
+
+def fixation_time(
+    eye_centers: np.ndarray,
+    threshold:   float,
+    frame_step:  float,
+    sample_fps:  float,
+) -> float:
+    """
+    Gaze fixation seconds over a trajectory of valid eye centres: consecutive
+    pairs moving less than ``threshold`` per source frame (scaled by the
+    sampling ``frame_step``), converted to seconds at ``sample_fps``.
+    """
+    centers = np.asarray(eye_centers, dtype=np.float64).reshape(-1, 2)
+    if len(centers) < MIN_FIXATION_SAMPLES or sample_fps <= 0:
+        return 0.0
+    moves = np.linalg.norm(np.diff(centers, axis=0), axis=1)
+    return float(np.count_nonzero(moves < threshold * frame_step) / sample_fps)
+
+
+def rescored_fixation(features: dict, threshold: float) -> float:
+    """
+    gaze_fixation_time of stored score features under ``threshold``.
+
+    The stored value is reused when the threshold is unchanged; otherwise the
+    eye-centre trajectory is taken from ``features["eye_centers"]`` or the
+    feature-cache entry named by ``features["cache_key"]``.
+    """
+    if threshold == features.get("fixation_threshold", DEFAULT_FIXATION_THRESHOLD):
+        return features["gaze_fixation_time"]
+
+    centers = features.get("eye_centers")
+    if centers is None and features.get("cache_key"):
+        cache  = default_cache()
+        cached = cache.get(features["cache_key"]) if cache else None
+        if cached and "trajectories" in cached:
+            centers = cached["trajectories"]["eye_centers"]
+    if centers is None:
+        raise ValueError(
+            "Re-scoring with a different fixation_threshold needs the eye-centre "
+            "trajectory (features['eye_centers'] or a feature-cache entry)"
+        )
+
+    sample_fps = features["sample_fps"]
+    return fixation_time(centers, threshold, features["fps"] / sample_fps, sample_fps)
+
+
+def feature_table(features_list: list[dict]) -> dict[str, np.ndarray]:
+    """Columnar float arrays of the formula inputs (None → NaN)."""
+    return {
+        col: np.array(
+            [np.nan if f.get(col) is None else f[col] for f in features_list],
+            dtype=np.float64,
+        )
+        for col in _COLUMNS
+    }
+
+
+def score_table(
+    table:    dict[str, np.ndarray],
+    params:   ScoringParams = DEFAULT_PARAMS,
+    fixation: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Risk scores for a feature_table, optionally with recomputed fixation times."""
+    return risk_scores(
+        table["video_model_prob"],
+        table["face_detection_ratio"],
+        table["gaze_fixation_time"] if fixation is None else fixation,
+        table["gesture_anomaly_score"],
+        params,
+    )
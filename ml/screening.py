@@ -10,15 +10,30 @@ Entry points
 analyze_video(video_path, ...)                → ScreeningResult
 analyze_video_with_explainability(video_path) → dict  (API-ready)
 explain_risk_score(result)                    → dict  (SHAP-style)
+rescore(score_features, **params)             → ScreeningResult  (no decoding)
+rescore_many(score_features_list, **params)   → np.ndarray  (vectorised)
+warm_up_models()                              → dict  (registry health)
+
+Many videos at once (process pool, resumable JSONL output; see ml/batch.py):
+    python -m ml.screening clips/ "archive/**/*.mp4" --out results.jsonl --workers 4
+
+A video still being uploaded (fragmented MP4 / WebM) can be analysed as it
+arrives with ml/incremental.py (IncrementalAnalysis).
+
+analyze_video(..., quality_gate=QualityGate()) checks face presence on a few
+frames first and returns an "insufficient_quality" result for unusable videos.
 
 Risk bands:  Low < 0.3 | Medium 0.3–0.7 | High > 0.7
 """
 
 from __future__ import annotations
 
+import multiprocessing
 import os
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 from typing import Optional
 
@@ -27,10 +42,32 @@ import numpy as np
 
 # ── Paths ─────────────────────────────────────────────────────────────────────
 ML_DIR        = Path(__file__).resolve().parent
+ROOT_DIR      = ML_DIR.parent
 VIDEO_ASD_DIR = ML_DIR / "video-asd-model"
 
 if str(VIDEO_ASD_DIR) not in sys.path:
     sys.path.insert(0, str(VIDEO_ASD_DIR))
+# Allow `python ml/screening.py` as well as `python -m ml.screening`
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from ml.backbones import (  # noqa: E402
+    DEFAULT_BACKBONE, backbone_model, load_classifier as load_backbone_classifier,
+    selected_backbone,
+)
+from ml.cache import FeatureCache, default_cache, file_sha256  # noqa: E402
+from ml.frames import (  # noqa: E402
+    DEFAULT_FPS, Frame, FrameConsumer, FrameSource, VideoInfo, probe, sampling_stride,
+)
+from ml.landmarks import FACE_MESH_LANDMARKS, POSE_LANDMARKS, LandmarkBuffer  # noqa: E402
+from ml.metrics import StageTimings, metrics  # noqa: E402
+from ml.registry import models  # noqa: E402
+from ml.roi import DEFAULT_INFERENCE_SIZE, FaceROITracker, downscale_rgb  # noqa: E402
+from ml.scoring import (  # noqa: E402
+    DEFAULT_FIXATION_THRESHOLD, DEFAULT_PARAMS, MIN_FIXATION_SAMPLES, ScoringParams,
+    feature_table, rescored_fixation, risk_scores, score_table,
+)
+from ml.stats import FixationRun, Moments, Trajectory  # noqa: E402
 
 
 # ── Result dataclass ──────────────────────────────────────────────────────────
@@ -47,196 +84,385 @@ class ScreeningResult:
     indicators:           dict            # gaze_fixation_time (s), gesture_anomalies
 
 
-# ── MediaPipe helpers ─────────────────────────────────────────────────────────
+# ── MediaPipe consumers ───────────────────────────────────────────────────────
 
-def _extract_mediapipe_features(video_path: str) -> dict:
-    """
-    Extract Face Mesh metrics from every frame.
-    Returns face_detection_ratio, iris_detected_ratio, eye_landmark_variance, fps.
-    """
+_EYE_CORNER_IDX = (33, 133, 362, 263)                # eye corner proxies for gaze variance
+_EYE_CENTER_IDX = _EYE_CORNER_IDX + (468, 473)      # corners + iris centres
+_FIXATION_THRESHOLD = DEFAULT_FIXATION_THRESHOLD    # 2% normalised movement per frame
+
+
+def _create_face_mesh():
     import mediapipe as mp
 
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh    = mp_face_mesh.FaceMesh(
+    return mp.solutions.face_mesh.FaceMesh(
         max_num_faces=1,
         refine_landmarks=True,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
     )
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return {
-            "face_detection_ratio": 0.0,
-            "frame_count":          0,
-            "eye_landmark_variance": None,
-            "iris_detected_ratio":  None,
-            "fps":                  30.0,
-        }
 
-    fps              = cap.get(cv2.CAP_PROP_FPS) or 30.0
-    frame_count      = 0
-    face_detected    = 0
-    iris_detected    = 0
-    eye_positions    = []
+def _create_pose():
+    import mediapipe as mp
 
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frame_count += 1
-
-            rgb     = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb)
-
-            if results.multi_face_landmarks:
-                face_detected += 1
-                lm = results.multi_face_landmarks[0]
-
-                # Iris landmarks available only in refine mode (index >= 468)
-                if len(lm.landmark) >= 478:
-                    iris_detected += 1
-
-                # Eye corner proxies for gaze variance
-                for idx in [33, 133, 362, 263]:
-                    if idx < len(lm.landmark):
-                        p = lm.landmark[idx]
-                        eye_positions.append((p.x, p.y))
-            else:
-                eye_positions.append((np.nan, np.nan))
-    finally:
-        cap.release()
-        face_mesh.close()
-
-    face_ratio = face_detected / frame_count if frame_count > 0 else 0.0
-    iris_ratio = iris_detected / frame_count if frame_count > 0 else 0.0
-
-    eye_arr = np.array(
-        [p for p in eye_positions if not (np.isnan(p[0]) or np.isnan(p[1]))]
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
     )
-    eye_var = float(np.var(eye_arr)) if len(eye_arr) > 1 else None
 
-    return {
+
+# Graphs are stateful and not thread-safe: one leased instance per video
+models.register_pool("face_mesh", _create_face_mesh)
+models.register_pool("pose",      _create_pose)
+
+
+class FaceMeshConsumer(FrameConsumer):
+    """
+    Single Face Mesh pass over the shared frame stream.
+    Produces face_detection_ratio, iris_detected_ratio, eye_landmark_variance
+    and gaze_fixation_time (seconds where eye gaze is stable).
+
+    With a FaceROITracker, inference runs on a downscaled crop around the last
+    face and landmarks are mapped back to full-frame coordinates.
+
+    Memory is O(1) in video length; the per-frame eye-centre trajectory is
+    only kept when `keep_trajectory` is set.
+    """
+
+    name = "face_mesh"
+
+    def __init__(
+        self,
+        tracker:         Optional[FaceROITracker] = None,
+        keep_trajectory: bool                     = False,
+    ):
+        self.face_mesh     = None
+        self.tracker       = tracker
+        self.needs_rgb     = tracker is None   # the tracker crops from BGR
+        self.fps           = DEFAULT_FPS
+        self.sample_fps    = DEFAULT_FPS
+        self.threshold     = _FIXATION_THRESHOLD
+        self.frame_count   = 0
+        self.face_detected = 0
+        self.iris_detected = 0
+        # Variance is taken over every x and y value of every corner point
+        self.eye_moments   = Moments.zeros()
+        self.fixation      = FixationRun.empty()
+        self.trajectory    = Trajectory() if keep_trajectory else None
+        # Reused for every frame: full landmark list in ROI mode, eye points otherwise
+        self.landmarks     = LandmarkBuffer(FACE_MESH_LANDMARKS, dims=2)
+
+    def start(self, info: VideoInfo) -> None:
+        self.fps        = info.fps
+        self.sample_fps = info.sample_fps
+        # The threshold is per source frame; sampled frames are frame_step apart
+        self.threshold  = _FIXATION_THRESHOLD * info.frame_step
+        if self.trajectory is not None and info.expected_samples:
+            self.trajectory = Trajectory(info.expected_samples)
+        if info.opened:
+            self.face_mesh = models.acquire("face_mesh")
+
+    def process(self, frame: Frame) -> None:
+        self.frame_count += 1
+        image   = self.tracker.prepare(frame.bgr) if self.tracker else frame.rgb
+        results = self.face_mesh.process(image)
+        if not results.multi_face_landmarks:
+            if self.tracker:
+                self.tracker.update(None)
+            return
+
+        self.face_detected += 1
+        lms = results.multi_face_landmarks[0].landmark
+        n   = len(lms)
+        if self.tracker:
+            # The tracker needs the whole face for its bounding box
+            xy = self.tracker.to_full(self.landmarks.fill(lms))
+            self.tracker.update(xy)
+            eye = xy[self.landmarks.available(_EYE_CENTER_IDX, n)]
+        else:
+            eye = self.landmarks.select(lms, _EYE_CENTER_IDX).astype(np.float64)
+
+        # Iris landmarks available only in refine mode (index >= 468)
+        if n >= FACE_MESH_LANDMARKS:
+            self.iris_detected += 1
+
+        # Corners lead _EYE_CENTER_IDX; samples are x0, y0, x1, y1, ...
+        corners = eye[: len(self.landmarks.available(_EYE_CORNER_IDX, n))]
+        self.eye_moments.add_batch(corners.reshape(-1))
+
+        if len(eye) > 0:
+            eye_center = eye.mean(axis=0)
+            self.fixation.add(eye_center, self.threshold)
+            if self.trajectory is not None:
+                self.trajectory.append(frame.index, eye_center)
+
+    def finish(self) -> dict:
+        """Mergeable partial state; see _merge_face / _face_metrics."""
+        out = {
+            "frame_count":   self.frame_count,
+            "face_detected": self.face_detected,
+            "iris_detected": self.iris_detected,
+            "eye_moments":   self.eye_moments if self.eye_moments.n else None,
+            "fixation":      self.fixation,
+            "threshold":     self.threshold,
+            "fps":           float(self.fps),
+            "sample_fps":    float(self.sample_fps),
+        }
+        if self.tracker:
+            out["roi"] = self.tracker.stats()
+        if self.trajectory is not None:
+            out["trajectory"] = self.trajectory.arrays()
+        return out
+
+    def close(self) -> None:
+        if self.face_mesh is not None:
+            models.release("face_mesh", self.face_mesh)
+            self.face_mesh = None
+
+
+class PoseConsumer(FrameConsumer):
+    """
+    MediaPipe Pose pass: gesture_anomaly_score = mean per-joint landmark
+    variance (proxy for atypical movement).
+
+    Pose needs the whole body, so it is never face-cropped; with
+    `inference_size` the full frame is only downscaled.  Landmarks are
+    normalised, so the score is resolution-independent.
+
+    Per-joint variance is accumulated online (O(1) memory); the landmark
+    trajectory is only kept when `keep_trajectory` is set.
+    """
+
+    name = "pose"
+
+    def __init__(self, inference_size: Optional[int] = None, keep_trajectory: bool = False):
+        self.pose           = None
+        self.inference_size = inference_size
+        self.needs_rgb      = not inference_size
+        self.moments: Optional[Moments] = None
+        self.trajectory     = Trajectory() if keep_trajectory else None
+        self.landmarks      = LandmarkBuffer(POSE_LANDMARKS, dims=3)
+
+    def start(self, info: VideoInfo) -> None:
+        if self.trajectory is not None and info.expected_samples:
+            self.trajectory = Trajectory(info.expected_samples)
+        if info.opened:
+            self.pose = models.acquire("pose")
+
+    def process(self, frame: Frame) -> None:
+        image = (
+            downscale_rgb(frame.bgr, self.inference_size)
+            if self.inference_size else frame.rgb
+        )
+        pose_results = self.pose.process(image)
+        if pose_results.pose_landmarks:
+            lms = self.landmarks.fill(pose_results.pose_landmarks.landmark)
+            if self.moments is None:
+                self.moments = Moments.zeros(lms.shape)   # (joints, 3)
+            self.moments.add(lms)
+            if self.trajectory is not None:
+                self.trajectory.append(frame.index, lms)
+
+    def finish(self) -> dict:
+        """Mergeable partial state: per-joint (joints, 3) moments over frames."""
+        out = {"pose_moments": self.moments}
+        if self.trajectory is not None:
+            out["trajectory"] = self.trajectory.arrays()
+        return out
+
+    def close(self) -> None:
+        if self.pose is not None:
+            models.release("pose", self.pose)
+            self.pose = None
+
+
+def _merge_face(a: dict, b: dict) -> dict:
+    """Combine Face Mesh partials of segment `a` and the segment `b` that follows it."""
+    out = dict(a)
+    for key in ("frame_count", "face_detected", "iris_detected"):
+        out[key] = a[key] + b[key]
+    out["eye_moments"] = Moments.merge(a["eye_moments"], b["eye_moments"])
+    out["fixation"]    = FixationRun.merge(a["fixation"], b["fixation"], a["threshold"])
+    if "roi" in a and "roi" in b:
+        out["roi"] = {
+            k: (a["roi"][k] + b["roi"][k] if k in ("roi_frames", "full_searches") else v)
+            for k, v in a["roi"].items()
+        }
+    if "trajectory" in a:
+        out["trajectory"] = _concat_trajectories(a["trajectory"], b["trajectory"])
+    return out
+
+
+def _concat_trajectories(a: tuple, b: tuple) -> tuple:
+    """Concatenate (frame indices, values) trajectories of consecutive segments."""
+    if len(a[0]) == 0:
+        return b
+    if len(b[0]) == 0:
+        return a
+    return np.concatenate([a[0], b[0]]), np.concatenate([a[1], b[1]])
+
+
+def _face_metrics(partial: dict) -> dict:
+    """Final Face Mesh metrics from a (possibly merged) partial."""
+    n          = partial["frame_count"]
+    face_ratio = partial["face_detected"] / n if n > 0 else 0.0
+    iris_ratio = partial["iris_detected"] / n if n > 0 else None
+
+    # More than one (x, y) corner point ⇔ more than two scalar samples
+    eye = partial["eye_moments"]
+    eye_var = float(eye.variance) if eye is not None and eye.n > 2 else None
+
+    gaze_fixation_sec = 0.0
+    fixation = partial["fixation"]
+    if fixation.n_valid >= MIN_FIXATION_SAMPLES:
+        gaze_fixation_sec = fixation.fix_frames / partial["sample_fps"]
+
+    out = {
         "face_detection_ratio":  face_ratio,
-        "frame_count":           frame_count,
+        "frame_count":           n,
         "eye_landmark_variance": eye_var,
         "iris_detected_ratio":   iris_ratio,
-        "fps":                   fps,
+        "gaze_fixation_time":    float(gaze_fixation_sec),
+        "fps":                   partial["fps"],
     }
+    if "roi" in partial:
+        out["roi"] = partial["roi"]
+    return out
+
+
+def _merge_pose(a: dict, b: dict) -> dict:
+    out = {"pose_moments": Moments.merge(a["pose_moments"], b["pose_moments"])}
+    if "trajectory" in a:
+        out["trajectory"] = _concat_trajectories(a["trajectory"], b["trajectory"])
+    return out
 
 
-def _extract_pose_and_gaze(video_path: str) -> dict:
+def _pose_metrics(partial: dict) -> dict:
+    moments = partial["pose_moments"]
+    gesture_anomaly = 0.0
+    if moments is not None and moments.n > 2:
+        gesture_anomaly = float(np.mean(moments.variance))
+    return {"gesture_anomaly_score": gesture_anomaly}
+
+
+# ── Quality gate ──────────────────────────────────────────────────────────────
+
+@dataclass
+class QualityGate:
     """
-    Extract MediaPipe Pose + Face Mesh to compute:
-      - gaze_fixation_time  : seconds where eye gaze is stable
-      - gesture_anomaly_score: pose landmark variance (proxy for atypical movement)
+    Cheap face-presence check run before the expensive stages.
+
+    Samples `samples` frames spread over the whole video (seeking past the
+    rest), or every frame at `sample_fps` over the first `seconds` when set.
+    Videos whose face ratio falls below `min_face_ratio` are not analysed.
     """
-    import mediapipe as mp
 
-    mp_face_mesh = mp.solutions.face_mesh
-    mp_pose      = mp.solutions.pose
+    min_face_ratio: float           = 0.10
+    samples:        int             = 24
+    seconds:        Optional[float] = None
+    sample_fps:     float           = 2.0
 
-    face_mesh = mp_face_mesh.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-    )
-    pose = mp_pose.Pose(
-        static_image_mode=False,
-        model_complexity=1,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-    )
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return {
-            "gaze_fixation_time":    0.0,
-            "gesture_anomaly_score": 0.0,
-            "pose_landmarks":        [],
-            "fps":                   30.0,
-        }
+class FacePresenceConsumer(FrameConsumer):
+    """Counts sampled frames in which Face Mesh finds a face."""
 
-    fps             = cap.get(cv2.CAP_PROP_FPS) or 30.0
-    eye_positions   = []
-    pose_lm_list    = []
+    name = "face_presence"
 
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            rgb          = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            face_results = face_mesh.process(rgb)
-            pose_results = pose.process(rgb)
-
-            # ── Eye centre from face landmarks ────────────────────────────────
-            if face_results.multi_face_landmarks:
-                lm         = face_results.multi_face_landmarks[0]
-                eye_center = np.zeros(2)
-                count      = 0
-                for idx in [33, 133, 362, 263, 468, 473]:
-                    if idx < len(lm.landmark):
-                        p           = lm.landmark[idx]
-                        eye_center += np.array([p.x, p.y])
-                        count      += 1
-                if count > 0:
-                    eye_positions.append(eye_center / count)
-                else:
-                    eye_positions.append(np.array([np.nan, np.nan]))
-            else:
-                eye_positions.append(np.array([np.nan, np.nan]))
-
-            # ── Pose landmarks ────────────────────────────────────────────────
-            if pose_results.pose_landmarks:
-                lms = [(p.x, p.y, p.z) for p in pose_results.pose_landmarks.landmark]
-                pose_lm_list.append(np.array(lms))
-    finally:
-        cap.release()
-        face_mesh.close()
-        pose.close()
-
-    # ── Gaze fixation time ────────────────────────────────────────────────────
-    gaze_fixation_sec = 0.0
-    if len(eye_positions) > 1:
-        valid = np.array([p for p in eye_positions if not np.any(np.isnan(p))])
-        if len(valid) > 5:
-            diffs      = np.linalg.norm(np.diff(valid, axis=0), axis=1)
-            fix_frames = int(np.sum(diffs < 0.02))  # threshold: 2% normalised movement
-            gaze_fixation_sec = fix_frames / fps
-
-    # ── Gesture anomaly score ─────────────────────────────────────────────────
-    gesture_anomaly = 0.0
-    if len(pose_lm_list) > 2:
-        stack           = np.stack(pose_lm_list)            # (frames, joints, 3)
-        gesture_anomaly = float(np.mean(np.var(stack, axis=0)))
+    def __init__(self):
+        self.face_mesh = None
+        self.frames    = 0
+        self.faces     = 0
+
+    def start(self, info: VideoInfo) -> None:
+        if info.opened:
+            self.face_mesh = models.acquire("face_mesh")
+
+    def process(self, frame: Frame) -> None:
+        self.frames += 1
+        if self.face_mesh.process(frame.rgb).multi_face_landmarks:
+            self.faces += 1
 
+    def finish(self) -> dict:
+        return {"frames": self.frames, "faces": self.faces}
+
+    def close(self) -> None:
+        if self.face_mesh is not None:
+            models.release("face_mesh", self.face_mesh)
+            self.face_mesh = None
+
+
+def _gate_verdict(features: dict, gate: QualityGate) -> dict:
+    """Gate verdict from already-extracted features (e.g. a cache hit)."""
+    mp_features = features["mediapipe"]
     return {
-        "gaze_fixation_time":    float(gaze_fixation_sec),
-        "gesture_anomaly_score": float(gesture_anomaly),
-        "pose_landmarks":        pose_lm_list,
-        "fps":                   float(fps),
+        "passed":         mp_features["face_detection_ratio"] >= gate.min_face_ratio,
+        "mode":           "full",
+        "face_ratio":     mp_features["face_detection_ratio"],
+        "frames_sampled": mp_features["frame_count"],
+        "min_face_ratio": gate.min_face_ratio,
+    }
+
+
+def _run_quality_gate(video_path: str, gate: QualityGate) -> dict:
+    """Face-presence verdict for the gate; see QualityGate."""
+    if gate.seconds:
+        fps, _ = probe(video_path)
+        source = FrameSource(video_path, target_fps=gate.sample_fps,
+                             end_frame=int(round(gate.seconds * fps)))
+        mode   = "first_seconds"
+    else:
+        source = FrameSource(video_path, max_frames=gate.samples)
+        mode   = "sparse"
+    source.register(FacePresenceConsumer())
+    counts = source.run()["face_presence"]
+
+    face_ratio = counts["faces"] / counts["frames"] if counts["frames"] else 0.0
+    return {
+        "passed":         face_ratio >= gate.min_face_ratio,
+        "mode":           mode,
+        "face_ratio":     face_ratio,
+        "frames_sampled": counts["frames"],
+        "min_face_ratio": gate.min_face_ratio,
     }
 
 
 # ── VGG16 + LSTM model ────────────────────────────────────────────────────────
 
-def _get_video_model_prediction(
-    video_path: str,
-) -> tuple[Optional[float], Optional[str]]:
+def _load_video_classifier():
     """
-    Run the VGG16+LSTM classifier from video-asd-model.
-    Returns (P(ASD), predicted_label) or (None, None) when weights are absent.
+    The backbone+LSTM classifier for NEUROTHRIVE_VIDEO_BACKBONE (see
+    ml/backbones.py): the ONNX Runtime export when present (see
+    ml/onnx_backend.py and NEUROTHRIVE_VIDEO_BACKEND), else the Keras model.
+    Returns None when neither is available.
     """
-    model_dir   = VIDEO_ASD_DIR / "models" / "autism_data"
+    backbone = selected_backbone()
+    backend  = os.environ.get("NEUROTHRIVE_VIDEO_BACKEND", "auto")
+    if backend != "keras":
+        from ml.onnx_backend import load as load_onnx
+        predictor = load_onnx(quantized=(backend == "onnx-int8"), backbone=backbone)
+        if predictor is not None or backend != "auto":
+            return predictor
+    return _load_keras_classifier(backbone)
+
+
+def _load_keras_classifier(backbone: Optional[str] = None):
+    """
+    Build the Keras classifier: vgg16LSTMVideoClassifier from video-asd-model,
+    or a lightweight backbone with its own trained head.
+    Returns the loaded predictor, or None when weights / Keras are absent.
+    """
+    model_dir = VIDEO_ASD_DIR / "models" / "autism_data"
+    backbone  = backbone or selected_backbone()
+    if backbone != DEFAULT_BACKBONE:
+        return load_backbone_classifier(model_dir, backbone)
+
     config_path = model_dir / "vgg16-lstm-config.npy"
     weight_path = model_dir / "vgg16-lstm-weights.h5"
 
     if not config_path.exists() or not weight_path.exists():
-        return None, None
+        return None
 
     # Keras backend compatibility shim (TF1 legacy)
     try:
@@ -248,54 +474,600 @@ def _get_video_model_prediction(
 
     try:
         from recurrent_networks import vgg16LSTMVideoClassifier
-        from vgg16_feature_extractor import extract_vgg16_features_live
     except ImportError:
-        return None, None
+        return None
 
     try:
         predictor = vgg16LSTMVideoClassifier()
         predictor.load_model(str(config_path), str(weight_path))
+        return predictor
+    except Exception:
+        return None
 
-        x = extract_vgg16_features_live(predictor.vgg16_model, video_path)
-        if x is None or len(x) == 0:
-            return None, None
 
-        frames   = x.shape[0]
-        expected = predictor.expected_frames
+# Loaded once per process; models.reload("video_classifier") picks up new weights
+models.register("video_classifier", _load_video_classifier)
+
 
-        if frames > expected:
-            x = x[:expected, :]
-        elif frames < expected:
-            padded          = np.zeros((expected, x.shape[1]), dtype=x.dtype)
-            padded[:frames] = x
-            x               = padded
+# Frames per VGG16 forward pass: 8 × 224×224×3 float32 ≈ 4.8 MB input, which
+# keeps the conv activations of one batch within a typical server L2/L3 budget.
+DEFAULT_VGG_BATCH_SIZE = 8
 
-        probs      = predictor.model.predict(np.array([x]), verbose=0)[0]
-        pred_class = int(np.argmax(probs))
-        pred_label = predictor.labels_idx2word[pred_class]
 
-        # Find ASD class probability
-        asd_prob = 0.0
-        for idx, label in enumerate(predictor.labels):
-            if "autism" in str(label).lower() or "asd" in str(label).lower():
-                asd_prob = float(probs[idx])
-                break
-        if asd_prob == 0.0:
-            asd_prob = float(probs[0])  # fallback: treat class 0 as ASD proxy
+class VGG16FeatureConsumer(FrameConsumer):
+    """
+    Backbone features for the LSTM head (VGG16, or the configured lightweight
+    backbone; the stage keeps the name "vgg16").
+    Samples one frame per second of video, matching extract_vgg16_features_live,
+    and runs the backbone on `batch_size` sampled frames per forward pass.
+    """
 
-        return asd_prob, pred_label
+    name = "vgg16"
+
+    def __init__(self, predictor, batch_size: int = DEFAULT_VGG_BATCH_SIZE):
+        self.predictor   = predictor
+        self.backbone    = backbone_model(predictor)
+        self.rgb         = getattr(predictor, "rgb", False)
+        self.needs_rgb   = self.rgb
+        self.batch_size  = max(1, int(batch_size))
+        self.preprocess  = None
+        self.features: list[np.ndarray] = []
+        self.next_second = 0
+        self.failed      = False
+        self._batch      = np.empty((self.batch_size, 224, 224, 3), dtype=np.float32)
+        self._pending    = 0
+
+    def start(self, info: VideoInfo) -> None:
+        # A segment starting mid-video continues at the next whole second
+        self.next_second = int(np.ceil(info.start_frame / info.fps - 1e-9))
+        # ONNX / lightweight backbones bring their own NumPy preprocessing
+        self.preprocess = getattr(self.predictor, "preprocess_input", None)
+        if self.preprocess is None:
+            try:
+                from keras.applications.vgg16 import preprocess_input
+                self.preprocess = preprocess_input
+            except ImportError:
+                self.failed = True
+
+    def process(self, frame: Frame) -> None:
+        # Next sample is due at t = next_second
+        if self.failed or frame.timestamp < self.next_second:
+            return
+        self.next_second += 1
+        self._batch[self._pending] = cv2.resize(
+            frame.rgb if self.rgb else frame.bgr, (224, 224), interpolation=cv2.INTER_AREA
+        )
+        self._pending += 1
+        if self._pending == self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        n, self._pending = self._pending, 0
+        if n == 0 or self.failed:
+            return
+        try:
+            out = self.backbone.predict(
+                self.preprocess(self._batch[:n]), batch_size=n, verbose=0
+            )
+            self.features.extend(out.reshape(n, -1))
+        except Exception:
+            self.failed = True
+
+    def finish(self) -> dict:
+        self._flush()
+        if self.failed or not self.features:
+            return {"features": None}
+        return {"features": np.array(self.features)}
+
+
+def _pad_sequence(x: np.ndarray, expected: int) -> np.ndarray:
+    """Truncate / zero-pad a (frames, features) array to `expected` frames."""
+    frames = x.shape[0]
+    if frames > expected:
+        return x[:expected, :]
+    if frames < expected:
+        padded          = np.zeros((expected, x.shape[1]), dtype=x.dtype)
+        padded[:frames] = x
+        return padded
+    return x
+
+
+def _asd_probability(predictor, probs: np.ndarray) -> float:
+    """Pick the ASD class probability out of one softmax row."""
+    for idx, label in enumerate(predictor.labels):
+        if "autism" in str(label).lower() or "asd" in str(label).lower():
+            if float(probs[idx]) != 0.0:
+                return float(probs[idx])
+            break
+    return float(probs[0])  # fallback: treat class 0 as ASD proxy
+
+
+def _predict_from_features_batch(
+    predictor, xs: list[Optional[np.ndarray]],
+) -> list[tuple[Optional[float], Optional[str]]]:
+    """
+    Run the LSTM head over many videos in one predict call.
+    Each entry of `xs` is a (frames, features) array or None; returns one
+    (P(ASD), label) per entry, (None, None) where no features were extracted.
+    """
+    results: list[tuple[Optional[float], Optional[str]]] = [(None, None)] * len(xs)
+    valid = [i for i, x in enumerate(xs) if x is not None and len(x) > 0]
+    if not valid:
+        return results
 
+    try:
+        expected = predictor.expected_frames
+        batch    = np.stack([_pad_sequence(xs[i], expected) for i in valid])
+        probs    = predictor.model.predict(batch, batch_size=len(valid), verbose=0)
+
+        for i, row in zip(valid, probs):
+            pred_label = predictor.labels_idx2word[int(np.argmax(row))]
+            results[i] = (_asd_probability(predictor, row), pred_label)
     except Exception:
+        pass
+    return results
+
+
+def _predict_from_features(
+    predictor, x: Optional[np.ndarray],
+) -> tuple[Optional[float], Optional[str]]:
+    """Run the LSTM head on a (frames, features) array → (P(ASD), label)."""
+    return _predict_from_features_batch(predictor, [x])[0]
+
+
+def _get_video_model_prediction(
+    video_path: str,
+) -> tuple[Optional[float], Optional[str]]:
+    """
+    Run the VGG16+LSTM classifier on its own (no MediaPipe consumers).
+    Returns (P(ASD), predicted_label) or (None, None) when weights are absent.
+    """
+    predictor = models.get("video_classifier")
+    if predictor is None:
         return None, None
 
+    source  = FrameSource(video_path)
+    source.register(VGG16FeatureConsumer(predictor))
+    outputs = source.run()
+    return _predict_from_features(predictor, outputs["vgg16"]["features"])
+
 
 # ── Main analysis function ────────────────────────────────────────────────────
 
+@dataclass
+class PipelineOptions:
+    """Frame-pipeline knobs shared by the sequential path and segment workers."""
+
+    target_fps:        Optional[float] = None
+    max_frames:        Optional[int]   = None
+    vgg_batch_size:    int             = DEFAULT_VGG_BATCH_SIZE
+    roi_mode:          bool            = False
+    inference_size:    int             = DEFAULT_INFERENCE_SIZE
+    keep_trajectories: bool            = False
+    prefetch:          int             = 0
+
+
+# Decode-ahead depth; a single core gains nothing from the extra thread
+DEFAULT_PREFETCH = 4 if (os.cpu_count() or 1) > 1 else 0
+
+# Segments shorter than this are not worth a worker round-trip
+MIN_SEGMENT_SECONDS = 10.0
+
+_segment_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def _run_segment(
+    video_path:  str,
+    predictor,
+    opts:        PipelineOptions,
+    start_frame: int           = 0,
+    end_frame:   Optional[int] = None,
+    stride:      Optional[int] = None,
+    first_index: int           = 0,
+) -> dict:
+    """
+    Decode one segment (or the whole video) once; return consumer partials.
+    `first_index`: global index of the file's first frame (see FrameSource).
+    """
+    source = FrameSource(
+        video_path,
+        target_fps=opts.target_fps,
+        max_frames=opts.max_frames if stride is None else None,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        stride=stride,
+        prefetch=opts.prefetch,
+        first_index=first_index,
+    )
+    keep = opts.keep_trajectories
+    if opts.roi_mode:
+        source.register(FaceMeshConsumer(FaceROITracker(opts.inference_size), keep))
+        source.register(PoseConsumer(opts.inference_size, keep))
+    else:
+        source.register(FaceMeshConsumer(keep_trajectory=keep))
+        source.register(PoseConsumer(keep_trajectory=keep))
+    if predictor is not None:
+        source.register(VGG16FeatureConsumer(predictor, batch_size=opts.vgg_batch_size))
+    outputs = source.run()
+    outputs["sampling"]    = source.sampling()
+    outputs["timings"]     = source.timings
+    outputs["frames_read"] = source.position
+    return outputs
+
+
+def _segment_worker(
+    video_path:      str,
+    opts:            PipelineOptions,
+    start_frame:     int,
+    end_frame:       Optional[int],
+    stride:          int,
+    use_video_model: bool,
+) -> dict:
+    """Process-pool entry point: one segment with this worker's own resident models."""
+    predictor = models.get("video_classifier") if use_video_model else None
+    return _run_segment(video_path, predictor, opts, start_frame, end_frame, stride)
+
+
+def _segment_pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived worker pool, so each worker keeps its models warm between videos."""
+    if workers not in _segment_pools:
+        # spawn: never fork a process that may already hold TF / MediaPipe state
+        _segment_pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _segment_pools[workers]
+
+
+def _plan_segments(
+    video_path:      str,
+    opts:            PipelineOptions,
+    workers:         int,
+    segment_seconds: Optional[float],
+) -> Optional[tuple[int, list[tuple[int, Optional[int]]]]]:
+    """
+    Split a video into (start_frame, end_frame) segments aligned to the
+    sampling stride.  Returns (stride, segments), or None when the video is
+    too short (or of unknown length) to be worth splitting.
+    """
+    if workers <= 1:
+        return None
+    fps, frame_count = probe(video_path)
+    if frame_count <= 0:
+        return None
+
+    stride  = sampling_stride(fps, frame_count, opts.target_fps, opts.max_frames)
+    seg_len = (
+        int(segment_seconds * fps) if segment_seconds
+        else -(-frame_count // workers)
+    )
+    seg_len = max(seg_len, int(MIN_SEGMENT_SECONDS * fps))
+    seg_len = -(-seg_len // stride) * stride          # starts stay on the stride grid
+    if seg_len >= frame_count:
+        return None
+
+    starts = list(range(0, frame_count, seg_len))
+    # The last segment reads to EOF: declared frame counts can be approximate
+    ends   = starts[1:] + [None]
+    return stride, list(zip(starts, ends))
+
+
+def _merge_segments(parts: list[dict]) -> dict:
+    """Merge consecutive segment outputs into one whole-video output."""
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = {
+            "face_mesh": _merge_face(merged["face_mesh"], part["face_mesh"]),
+            "pose":      _merge_pose(merged["pose"], part["pose"]),
+            "sampling":  {
+                **merged["sampling"],
+                "frames_processed": merged["sampling"]["frames_processed"]
+                                    + part["sampling"]["frames_processed"],
+            },
+            "timings":   merged["timings"].merge(part["timings"]),
+            **({"vgg16": {"features": _concat_features(
+                merged["vgg16"]["features"], part.get("vgg16", {}).get("features"),
+            )}} if "vgg16" in merged else {}),
+        }
+    merged["sampling"]["segments"] = len(parts)
+    return merged
+
+
+def _concat_features(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return np.concatenate([a, b])
+
+
+def _extract_features(
+    video_path:      str,
+    predictor,
+    opts:            PipelineOptions,
+    workers:         int            = 1,
+    segment_seconds: Optional[float] = None,
+) -> dict:
+    """
+    Face Mesh, Pose and (if weights present) VGG16 features for one video.
+    With workers > 1, time segments are processed in parallel worker
+    processes and their partial statistics merged.  Segments run at the same
+    time, so none can hand its tracking state (MediaPipe's, or the roi_mode
+    FaceROITracker box) to the next: each starts with a full-frame search.
+    """
+    plan = _plan_segments(video_path, opts, workers, segment_seconds)
+    if plan is None:
+        outputs = _run_segment(video_path, predictor, opts)
+    else:
+        stride, segments = plan
+        pool    = _segment_pool(workers)
+        futures = [
+            pool.submit(_segment_worker, video_path, opts, start, end, stride,
+                        predictor is not None)
+            for start, end in segments
+        ]
+        outputs = _merge_segments([f.result() for f in futures])
+        outputs["sampling"]["max_frames"] = opts.max_frames
+        outputs["sampling"]["workers"]    = workers
+    return _features_from_outputs(outputs, opts)
+
+
+def _features_from_outputs(outputs: dict, opts: PipelineOptions) -> dict:
+    """Whole-video features from (merged) consumer outputs."""
+    face_out = _face_metrics(outputs["face_mesh"])
+    sampling = outputs["sampling"]
+    if opts.roi_mode:
+        sampling["roi"] = face_out["roi"]
+    features = {
+        "mediapipe": {
+            k: face_out[k]
+            for k in ("face_detection_ratio", "frame_count", "eye_landmark_variance",
+                      "iris_detected_ratio", "fps")
+        },
+        "pose_gaze": {
+            "gaze_fixation_time":    face_out["gaze_fixation_time"],
+            "gesture_anomaly_score": _pose_metrics(outputs["pose"])["gesture_anomaly_score"],
+            "fps":                   face_out["fps"],
+        },
+        "vgg16_features": outputs["vgg16"]["features"] if "vgg16" in outputs else None,
+        "sampling":       sampling,
+        "timings":        outputs["timings"],
+    }
+    if opts.keep_trajectories:
+        eye_frames,  eye_centers = outputs["face_mesh"]["trajectory"]
+        pose_frames, pose_lms    = outputs["pose"]["trajectory"]
+        features["trajectories"] = {
+            "eye_frames":     eye_frames,
+            "eye_centers":    eye_centers,    # (n, 2) normalised x, y
+            "pose_frames":    pose_frames,
+            "pose_landmarks": pose_lms,       # (n, joints, 3)
+        }
+    return features
+
+
+def _cache_options(opts: PipelineOptions, predictor=None) -> dict:
+    """Extraction options that change cached features (batching / retention do not)."""
+    out = asdict(opts)
+    for key in ("vgg_batch_size", "keep_trajectories", "prefetch"):
+        out.pop(key)
+    # ONNX (especially int8) features differ slightly from the Keras ones
+    backend = getattr(predictor, "backend", None)
+    if backend is not None:
+        out["video_backend"] = backend
+    # Features of another backbone are a different feature space entirely
+    backbone = getattr(predictor, "backbone", DEFAULT_BACKBONE)
+    if backbone != DEFAULT_BACKBONE:
+        out["video_backbone"] = backbone
+    return out
+
+
+def _cached_extract(
+    video_path:      str,
+    predictor,
+    opts:            PipelineOptions,
+    workers:         int,
+    segment_seconds: Optional[float],
+    cache:           Optional[FeatureCache],
+    gate:            Optional[QualityGate] = None,
+    video_sha256:    Optional[str]         = None,
+) -> dict:
+    """
+    _extract_features behind the content-addressed feature cache and the
+    quality gate.  A video rejected by the gate returns only
+    {"quality_gate": ..., "timings": ...}.  `video_sha256` saves re-reading
+    the file when its hash is already known.
+    """
+    timings = StageTimings()
+    key = features = None
+    if cache is not None:
+        with timings.stage("cache"):
+            key      = cache.key(video_sha256 or file_sha256(video_path),
+                                 _cache_options(opts, predictor))
+            features = cache.get(key)
+        # An entry written while weights were absent cannot serve the video model
+        if features is not None and predictor is not None and features["vgg16_features"] is None:
+            features = None
+
+    hit     = features is not None
+    verdict = None
+    if gate is not None:
+        # A cached entry already knows the face ratio of the whole video
+        with timings.stage("quality_gate"):
+            verdict = _gate_verdict(features, gate) if hit else _run_quality_gate(video_path, gate)
+        if not verdict["passed"]:
+            return {"quality_gate": verdict, "timings": timings}
+    if not hit:
+        # Cache entries always carry the per-frame landmark arrays
+        keep     = opts.keep_trajectories or cache is not None
+        features = _extract_features(
+            video_path, predictor, replace(opts, keep_trajectories=keep),
+            workers, segment_seconds,
+        )
+        timings.merge(features["timings"])
+        if cache is not None:
+            with timings.stage("cache"):
+                cache.put(key, features)
+
+    if not opts.keep_trajectories:
+        features.pop("trajectories", None)
+    if cache is not None:
+        features["cache"] = {"key": key, "hit": hit}
+    if verdict is not None:
+        features["quality_gate"] = verdict
+    features["timings"] = timings
+    return features
+
+
+def _missing_video_result() -> ScreeningResult:
+    return ScreeningResult(
+        risk_score=0.0,
+        video_model_prob=None,
+        face_detection_ratio=0.0,
+        gaze_metrics={},
+        details={"error": "Video file not found"},
+        indicators={"gaze_fixation_time": 0.0, "gesture_anomalies": 0.0},
+    )
+
+
+def _insufficient_quality_result(verdict: dict, timings: dict) -> ScreeningResult:
+    """Result for a video rejected by the quality gate (risk_score is not meaningful)."""
+    return ScreeningResult(
+        risk_score=0.0,
+        video_model_prob=None,
+        face_detection_ratio=verdict["face_ratio"],
+        gaze_metrics={},
+        details={
+            "status":       "insufficient_quality",
+            "error":        (
+                f"Child's face visible in {verdict['face_ratio']:.0%} of sampled frames "
+                f"(minimum {verdict['min_face_ratio']:.0%}) — please re-record with "
+                "the face in view"
+            ),
+            "quality_gate": verdict,
+            "timings":      timings,
+        },
+        indicators={"gaze_fixation_time": 0.0, "gesture_anomalies": 0.0},
+    )
+
+
+def _score_features(
+    features:   dict,
+    video_prob: Optional[float],
+    pred_label: Optional[str],
+) -> dict:
+    """
+    Compact, JSON-serialisable inputs of the risk formula.  Persisting this
+    dict is enough to re-score the screening later (see rescore()).
+    """
+    mp_features = features["mediapipe"]
+    sampling    = features["sampling"]
+    out = {
+        "video_model_prob":      video_prob,
+        "video_model_label":     pred_label,
+        "face_detection_ratio":  mp_features["face_detection_ratio"],
+        "frame_count":           mp_features["frame_count"],
+        "eye_landmark_variance": mp_features["eye_landmark_variance"],
+        "iris_detected_ratio":   mp_features["iris_detected_ratio"],
+        "gaze_fixation_time":    features["pose_gaze"]["gaze_fixation_time"],
+        "gesture_anomaly_score": features["pose_gaze"]["gesture_anomaly_score"],
+        "fixation_threshold":    _FIXATION_THRESHOLD,
+        "fps":                   mp_features["fps"],
+        "sample_fps":            sampling.get("sample_fps") or mp_features["fps"],
+    }
+    if "cache" in features:
+        out["cache_key"] = features["cache"]["key"]
+    return out
+
+
+def _scored_result(
+    score_features: dict,
+    params:         ScoringParams,
+    details:        dict,
+    fixation:       Optional[float] = None,
+) -> ScreeningResult:
+    """Apply the risk formula to score features; `fixation` overrides the stored value."""
+    video_prob = score_features["video_model_prob"]
+    face_ratio = score_features["face_detection_ratio"]
+    if fixation is None:
+        fixation = score_features["gaze_fixation_time"]
+
+    gaze_metrics = {
+        "face_detection_ratio":  face_ratio,
+        "frame_count":           score_features["frame_count"],
+        "eye_landmark_variance": score_features["eye_landmark_variance"],
+        "iris_detected_ratio":   score_features["iris_detected_ratio"],
+    }
+    indicators = {
+        "gaze_fixation_time": fixation,
+        "gesture_anomalies":  score_features["gesture_anomaly_score"],
+    }
+
+    # Unified risk score (video model, or the MediaPipe heuristic when absent)
+    risk_score = float(risk_scores(
+        np.nan if video_prob is None else video_prob,
+        face_ratio,
+        fixation,
+        score_features["gesture_anomaly_score"],
+        params,
+    ))
+    if video_prob is None:
+        details["fallback"] = "VGG16 weights not found — using MediaPipe heuristic"
+
+    return ScreeningResult(
+        risk_score=risk_score,
+        video_model_prob=video_prob,
+        face_detection_ratio=face_ratio,
+        gaze_metrics=gaze_metrics,
+        details=details,
+        indicators=indicators,
+    )
+
+
+def _build_result(
+    features:   dict,
+    video_prob: Optional[float],
+    pred_label: Optional[str],
+    params:     ScoringParams,
+) -> ScreeningResult:
+    """Combine extracted features and the video-model output into a ScreeningResult."""
+    score_features = _score_features(features, video_prob, pred_label)
+
+    details = {
+        "video_model_prob":  video_prob,
+        "video_model_label": pred_label,
+        "mediapipe":         features["mediapipe"],
+        "pose_gaze":         features["pose_gaze"],
+        "sampling":          features["sampling"],
+        "score_features":    score_features,
+    }
+    if "trajectories" in features:
+        details["trajectories"] = features["trajectories"]
+    if "cache" in features:
+        details["cache"] = features["cache"]
+    if "quality_gate" in features:
+        details["quality_gate"] = features["quality_gate"]
+    if "timings" in features:
+        details["timings"] = features["timings"].as_dict()
+
+    return _scored_result(score_features, params, details)
+
+
 def analyze_video(
     video_path: str,
     video_model_weight:            float = 0.85,
     mediapipe_quality_weight:      float = 0.15,
     min_face_ratio_for_confidence: float = 0.30,
+    target_fps:                    Optional[float] = None,
+    max_frames:                    Optional[int]   = None,
+    vgg_batch_size:                int             = DEFAULT_VGG_BATCH_SIZE,
+    roi_mode:                      bool            = False,
+    inference_size:                int             = DEFAULT_INFERENCE_SIZE,
+    workers:                       int             = 1,
+    segment_seconds:               Optional[float] = None,
+    keep_trajectories:             bool            = False,
+    use_cache:                     bool            = True,
+    quality_gate:                  Optional[QualityGate] = None,
+    prefetch:                      int             = DEFAULT_PREFETCH,
+    video_sha256:                  Optional[str]   = None,
 ) -> ScreeningResult:
     """
     Unified ASD risk analysis combining VGG16+LSTM and MediaPipe signals.
@@ -312,90 +1084,188 @@ def analyze_video(
         video_model_weight          : weight for VGG16 probability
         mediapipe_quality_weight    : weight for MediaPipe quality adjustment
         min_face_ratio_for_confidence: face ratio below which video model is downweighted
+        target_fps                  : analyse at most this many frames per second
+                                      (skipped frames are never decoded to RGB)
+        max_frames                  : cap on analysed frames, spread over the whole video
+        vgg_batch_size              : sampled frames per VGG16 forward pass
+        roi_mode                    : run Face Mesh on a tracked, downscaled face crop
+                                      and Pose on a downscaled frame
+        inference_size              : long side (px) of the images used in roi_mode
+        workers                     : > 1 splits the video into time segments analysed
+                                      in parallel worker processes, then merged
+                                      (tracking — MediaPipe's and, in roi_mode, the
+                                      face ROI — restarts per segment, so results
+                                      can differ slightly from workers=1)
+        segment_seconds             : segment length (default: one segment per worker)
+        keep_trajectories           : also return per-frame eye-centre and pose
+                                      trajectories in details["trajectories"]
+                                      (memory grows with video length)
+        use_cache                   : look the video up in the content-addressed
+                                      feature cache before decoding (ml/cache.py)
+        quality_gate                : check face presence on a few frames first and
+                                      return an "insufficient_quality" result
+                                      (details["status"]) instead of analysing
+        prefetch                    : frames decoded ahead in a background thread
+                                      while the models run (0 = decode inline)
+        video_sha256                : SHA-256 of the file when already known (e.g.
+                                      hashed while uploading), for the cache key
+    """
+    return analyze_videos(
+        [video_path],
+        video_model_weight=video_model_weight,
+        mediapipe_quality_weight=mediapipe_quality_weight,
+        min_face_ratio_for_confidence=min_face_ratio_for_confidence,
+        target_fps=target_fps,
+        max_frames=max_frames,
+        vgg_batch_size=vgg_batch_size,
+        roi_mode=roi_mode,
+        inference_size=inference_size,
+        workers=workers,
+        segment_seconds=segment_seconds,
+        keep_trajectories=keep_trajectories,
+        use_cache=use_cache,
+        quality_gate=quality_gate,
+        prefetch=prefetch,
+        video_hashes=[video_sha256],
+    )[0]
+
+
+def analyze_videos(
+    video_paths: list[str],
+    video_model_weight:            float = 0.85,
+    mediapipe_quality_weight:      float = 0.15,
+    min_face_ratio_for_confidence: float = 0.30,
+    target_fps:                    Optional[float] = None,
+    max_frames:                    Optional[int]   = None,
+    vgg_batch_size:                int             = DEFAULT_VGG_BATCH_SIZE,
+    roi_mode:                      bool            = False,
+    inference_size:                int             = DEFAULT_INFERENCE_SIZE,
+    workers:                       int             = 1,
+    segment_seconds:               Optional[float] = None,
+    keep_trajectories:             bool            = False,
+    use_cache:                     bool            = True,
+    quality_gate:                  Optional[QualityGate] = None,
+    prefetch:                      int             = DEFAULT_PREFETCH,
+    video_hashes:                  Optional[list[Optional[str]]] = None,
+) -> list[ScreeningResult]:
     """
-    video_path = str(Path(video_path).resolve())
+    Throughput-oriented variant of analyze_video for many videos (e.g. nightly
+    re-screens).  Features are extracted per video, then the LSTM head runs
+    over all padded sequences in a single predict call.  Returns one
+    ScreeningResult per input path, in order.  `video_hashes` optionally
+    gives each file's known SHA-256 (None entries are hashed here).
+    """
+    params    = ScoringParams(video_model_weight, mediapipe_quality_weight,
+                              min_face_ratio_for_confidence)
+    predictor = models.get("video_classifier")
+    opts      = PipelineOptions(target_fps, max_frames, vgg_batch_size, roi_mode,
+                                inference_size, keep_trajectories, prefetch)
+    cache     = default_cache() if use_cache else None
+
+    extracted: list[Optional[dict]] = []
+    for path, sha256 in zip(video_paths, video_hashes or [None] * len(video_paths)):
+        path = str(Path(path).resolve())
+        if not os.path.isfile(path):
+            extracted.append(None)
+            continue
+        t0 = time.perf_counter()
+        features = _cached_extract(path, predictor, opts, workers, segment_seconds,
+                                   cache, quality_gate, sha256)
+        features["elapsed"] = time.perf_counter() - t0
+        extracted.append(features)
+
+    predictions = [(None, None)] * len(extracted)
+    lstm        = StageTimings()
+    if predictor is not None:
+        with lstm.stage("lstm"):
+            predictions = _predict_from_features_batch(
+                predictor, [f.get("vgg16_features") if f else None for f in extracted]
+            )
+
+    results = []
+    for f, (prob, label) in zip(extracted, predictions):
+        if f is None:
+            results.append(_missing_video_result())
+            continue
+        results.append(_timed_result(f, prob, label, lstm, params))
+    return results
+
+
+def _timed_result(
+    features:   dict,
+    video_prob: Optional[float],
+    pred_label: Optional[str],
+    lstm:       StageTimings,
+    params:     ScoringParams,
+) -> ScreeningResult:
+    """_build_result (or the gate rejection) with "total" timings, recorded in metrics."""
+    # The LSTM batch is shared: each video reports the whole predict call
+    timings = features["timings"].merge(lstm)
+    wall    = features.pop("elapsed") + lstm.stages.get("lstm", [0.0])[0]
+    timings.add("total", wall, sum(s[1] for s in timings.stages.values()))
+    timings.mark_rss("total")
+
+    if "mediapipe" not in features:
+        result = _insufficient_quality_result(features["quality_gate"], timings.as_dict())
+    else:
+        result = _build_result(features, video_prob, pred_label, params)
+    metrics.observe(result.details["timings"])
+    return result
 
-    if not os.path.isfile(video_path):
-        return ScreeningResult(
-            risk_score=0.0,
-            video_model_prob=None,
-            face_detection_ratio=0.0,
-            gaze_metrics={},
-            details={"error": "Video file not found"},
-            indicators={"gaze_fixation_time": 0.0, "gesture_anomalies": 0.0},
-        )
 
-    # 1. MediaPipe — face mesh + pose
-    mp_features = _extract_mediapipe_features(video_path)
-    pose_gaze   = _extract_pose_and_gaze(video_path)
-    face_ratio  = mp_features["face_detection_ratio"]
+# ── Model warm-up ─────────────────────────────────────────────────────────────
 
-    gaze_metrics = {
-        "face_detection_ratio":  face_ratio,
-        "frame_count":           mp_features["frame_count"],
-        "eye_landmark_variance": mp_features["eye_landmark_variance"],
-        "iris_detected_ratio":   mp_features["iris_detected_ratio"],
-    }
-    indicators = {
-        "gaze_fixation_time": pose_gaze["gaze_fixation_time"],
-        "gesture_anomalies":  pose_gaze["gesture_anomaly_score"],
-    }
+def warm_up_models() -> dict:
+    """
+    Load the video classifier and pre-build one FaceMesh / Pose graph so the
+    first screening pays no construction cost.  Returns registry health.
+    """
+    return models.warm_up(["video_classifier", "face_mesh", "pose"])
 
-    # 2. VGG16+LSTM prediction
-    video_prob, pred_label = _get_video_model_prediction(video_path)
 
-    details = {
-        "video_model_prob":  video_prob,
-        "video_model_label": pred_label,
-        "mediapipe":         mp_features,
-        "pose_gaze": {
-            k: v for k, v in pose_gaze.items() if k != "pose_landmarks"
-        },
+# ── Re-scoring ────────────────────────────────────────────────────────────────
+
+def rescore(score_features: dict, **params) -> ScreeningResult:
+    """
+    Rebuild a ScreeningResult from stored score features (details["score_features"])
+    with different formula parameters — no decoding or model inference.
+
+    params: any ScoringParams field (video_model_weight, mediapipe_quality_weight,
+    min_face_ratio_for_confidence, fixation_threshold, gesture_scale).  A new
+    fixation_threshold needs the eye-centre trajectory: score_features["eye_centers"]
+    or the feature-cache entry of the original run.
+    """
+    scoring  = ScoringParams(**params)
+    fixation = rescored_fixation(score_features, scoring.fixation_threshold)
+    details  = {
+        "video_model_prob":  score_features["video_model_prob"],
+        "video_model_label": score_features.get("video_model_label"),
+        "score_features":    score_features,
+        "params":            asdict(scoring),
     }
+    return _scored_result(score_features, scoring, details, fixation)
 
-    # 3. Unified risk score
-    if video_prob is not None:
-        # Quality adjustment: downweight when face rarely detected
-        quality_factor = (
-            face_ratio / min_face_ratio_for_confidence
-            if face_ratio < min_face_ratio_for_confidence
-            else 1.0
-        )
-        risk_score = float(np.clip(
-            video_model_weight * float(video_prob) * quality_factor
-            + mediapipe_quality_weight * (1.0 - face_ratio),
-            0.0, 1.0,
-        ))
-    else:
-        # Fallback: MediaPipe heuristic only
-        gaze_fixation   = pose_gaze["gaze_fixation_time"]
-        gesture_score   = pose_gaze["gesture_anomaly_score"]
-
-        # Low fixation → higher risk; high gesture variance → higher risk
-        fixation_risk   = max(0.0, 1.0 - (gaze_fixation / 10.0))
-        gesture_risk    = min(1.0, gesture_score * 100.0)
-
-        risk_score = float(np.clip(
-            0.50 * fixation_risk
-            + 0.35 * gesture_risk
-            + 0.15 * (1.0 - face_ratio),
-            0.0, 1.0,
-        ))
-        details["fallback"] = "VGG16 weights not found — using MediaPipe heuristic"
 
-    return ScreeningResult(
-        risk_score=risk_score,
-        video_model_prob=video_prob,
-        face_detection_ratio=face_ratio,
-        gaze_metrics=gaze_metrics,
-        details=details,
-        indicators=indicators,
-    )
+def rescore_many(score_features_list: list[dict], **params) -> np.ndarray:
+    """
+    Risk scores of many stored screenings in one vectorised pass, e.g. for
+    calibration sweeps over historical data.  Same params as rescore().
+    """
+    scoring  = ScoringParams(**params)
+    table    = feature_table(score_features_list)
+    fixation = None
+    if any(f.get("fixation_threshold", DEFAULT_FIXATION_THRESHOLD) != scoring.fixation_threshold
+           for f in score_features_list):
+        fixation = np.array(
+            [rescored_fixation(f, scoring.fixation_threshold) for f in score_features_list],
+            dtype=np.float64,
+        )
+    return score_table(table, scoring, fixation)
 
 
 # ── Explainability ────────────────────────────────────────────────────────────
 
-def explain_risk_score(result: ScreeningResult) -> dict:
+def explain_risk_score(result: ScreeningResult, params: ScoringParams = DEFAULT_PARAMS) -> dict:
     """
     SHAP-style feature importance breakdown for the risk score.
     Returns {feature: contribution} — positive = raises risk, negative = lowers it.
@@ -409,12 +1279,12 @@ def explain_risk_score(result: ScreeningResult) -> dict:
             max(0.0, 1.0 - result.indicators.get("gaze_fixation_time", 0) / 10.0), 4
         )
         importance["gesture_anomalies"]    = round(
-            min(1.0, result.indicators.get("gesture_anomalies", 0) * 100.0), 4
+            min(1.0, result.indicators.get("gesture_anomalies", 0) * params.gesture_scale), 4
         )
         return importance
 
     importance["video_model_prob"]       = round(float(result.details.get("video_model_prob") or 0), 4)
-    importance["face_detection_penalty"] = round(max(0.0, (1.0 - result.face_detection_ratio) * 0.15), 4)
+    importance["face_detection_penalty"] = round(max(0.0, (1.0 - result.face_detection_ratio) * params.mediapipe_quality_weight), 4)
     importance["gaze_fixation"]          = round(
         -0.1 * result.indicators.get("gaze_fixation_time", 0), 4
     )  # more fixation = lower risk
@@ -430,9 +1300,24 @@ def analyze_video_with_explainability(video_path: str, **kwargs) -> dict:
     Returns API-ready dict with keys:
       risk, indicators, gaze_metrics, shap_importance, details
     """
-    result     = analyze_video(video_path, **kwargs)
-    importance = explain_risk_score(result)
+    result = analyze_video(video_path, **kwargs)
+    params = ScoringParams(**{
+        k: v for k, v in kwargs.items() if k in ScoringParams.__dataclass_fields__
+    })
+    return _explained(result, params)
+
+
+def rescore_with_explainability(score_features: dict, **params) -> dict:
+    """rescore() + explain_risk_score(), in the analyze_video_with_explainability format."""
+    return _explained(rescore(score_features, **params), ScoringParams(**params))
 
+
+def _explained(result: ScreeningResult, params: ScoringParams) -> dict:
+    # A video rejected by the quality gate has no score to explain
+    importance = (
+        {} if result.details.get("status") == "insufficient_quality"
+        else explain_risk_score(result, params)
+    )
     return {
         "risk":             result.risk_score,
         "indicators":       result.indicators,
@@ -447,10 +1332,16 @@ def analyze_video_with_explainability(video_path: str, **kwargs) -> dict:
 if __name__ == "__main__":
     import sys as _sys
 
+    # Several videos, a directory or a glob → batch mode (ml/batch.py)
+    if len(_sys.argv) > 2 or (len(_sys.argv) == 2 and not os.path.isfile(_sys.argv[1])):
+        from ml.batch import main as _batch_main
+        _sys.exit(_batch_main())
+
     _path = _sys.argv[1] if len(_sys.argv) > 1 else None
-    if not _path or not os.path.isfile(_path):
+    if not _path:
         print("Usage: python screening.py <video_path>")
         print("       python -m ml.screening <video_path>")
+        print("       python -m ml.screening <dir|glob|video>... --out results.jsonl [--workers N]")
         _sys.exit(1)
 
     _result = analyze_video(_path)
@@ -0,0 +1,140 @@
+"""
+Streaming, mergeable statistics for video analysis.
+
+Consumers update these once per frame in O(1) memory (independent of video
+length), and partial states of consecutive segments combine exactly (up to
+floating-point rounding):
+
+Moments      count / mean / M2 — Welford online update, Chan et al. merge
+FixationRun  fixation frame count plus the first/last eye centre, so the
+             frame pair straddling a segment boundary is counted once
+Trajectory   opt-in growable per-frame buffer, for callers that really need
+             the full landmark trajectory
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class Moments:
+    """Element-wise count, mean and sum of squared deviations (M2)."""
+
+    n:    int
+    mean: np.ndarray
+    m2:   np.ndarray
+
+    @classmethod
+    def zeros(cls, shape: tuple = ()) -> "Moments":
+        return cls(0, np.zeros(shape), np.zeros(shape))
+
+    def add(self, x) -> None:
+        """Welford update with one sample (scalar or array of the moments' shape)."""
+        self.n += 1
+        delta      = x - self.mean
+        self.mean += delta / self.n
+        self.m2   += delta * (x - self.mean)
+
+    def add_batch(self, xs: np.ndarray) -> None:
+        """Add every sample along axis 0 at once (Chan merge of the batch's moments)."""
+        k = len(xs)
+        if k == 0:
+            return
+        mean   = xs.mean(axis=0)
+        merged = Moments.merge(self, Moments(k, mean, ((xs - mean) ** 2).sum(axis=0)))
+        self.n, self.mean, self.m2 = merged.n, merged.mean, merged.m2
+
+    @staticmethod
+    def merge(a: Optional["Moments"], b: Optional["Moments"]) -> Optional["Moments"]:
+        if a is None or a.n == 0:
+            return b
+        if b is None or b.n == 0:
+            return a
+        n     = a.n + b.n
+        delta = b.mean - a.mean
+        return Moments(
+            n,
+            a.mean + delta * (b.n / n),
+            a.m2 + b.m2 + delta ** 2 * (a.n * b.n / n),
+        )
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Population variance (matches np.var with ddof=0)."""
+        return self.m2 / self.n
+
+
+@dataclass
+class FixationRun:
+    """
+    Stable-gaze frame count over a run of valid eye centres.
+    A "fixation frame" is a consecutive pair whose movement is below threshold.
+    """
+
+    n_valid:    int
+    fix_frames: int
+    first:      Optional[np.ndarray]
+    last:       Optional[np.ndarray]
+
+    @classmethod
+    def empty(cls) -> "FixationRun":
+        return cls(0, 0, None, None)
+
+    def add(self, center: np.ndarray, threshold: float) -> None:
+        """Append the next valid eye centre of the run."""
+        if self.last is not None and np.linalg.norm(center - self.last) < threshold:
+            self.fix_frames += 1
+        if self.first is None:
+            self.first = center
+        self.last     = center
+        self.n_valid += 1
+
+    @staticmethod
+    def merge(a: "FixationRun", b: "FixationRun", threshold: float) -> "FixationRun":
+        """Combine run `a` with the run `b` that immediately follows it."""
+        if a.n_valid == 0:
+            return b
+        if b.n_valid == 0:
+            return a
+        boundary = int(np.linalg.norm(b.first - a.last) < threshold)
+        return FixationRun(
+            a.n_valid + b.n_valid,
+            a.fix_frames + b.fix_frames + boundary,
+            a.first,
+            b.last,
+        )
+
+
+class Trajectory:
+    """Growable (n, *shape) float32 buffer with amortised O(1) appends."""
+
+    def __init__(self, capacity: int = 256):
+        self._buf:    Optional[np.ndarray] = None
+        self._frames: Optional[np.ndarray] = None
+        self._n        = 0
+        self._capacity = capacity
+
+    def append(self, frame_index: int, x) -> None:
+        x = np.asarray(x, dtype=np.float32)
+        if self._buf is None:
+            self._buf    = np.empty((self._capacity, *x.shape), dtype=np.float32)
+            self._frames = np.empty(self._capacity, dtype=np.int64)
+        elif self._n == len(self._buf):
+            self._buf    = np.concatenate([self._buf, np.empty_like(self._buf)])
+            self._frames = np.concatenate([self._frames, np.empty_like(self._frames)])
+        self._buf[self._n]    = x
+        self._frames[self._n] = frame_index
+        self._n += 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """(frame indices, values) trimmed to the appended length."""
+        if self._buf is None:
+            return np.empty(0, dtype=np.int64), np.empty((0,), dtype=np.float32)
+        return self._frames[: self._n].copy(), self._buf[: self._n].copy()
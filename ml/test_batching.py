@@ -0,0 +1,96 @@
+"""
+Batched backbone feature extraction and multi-video LSTM inference
+(ml/screening.py), against a fake predictor that records its calls.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.frames import Frame, VideoInfo  # noqa: E402
+from ml.screening import (  # noqa: E402
+    VGG16FeatureConsumer, _pad_sequence, _predict_from_features, _predict_from_features_batch,
+)
+
+
+class _Model:
+    def __init__(self, fn):
+        self.fn    = fn
+        self.calls = []
+
+    def predict(self, x, batch_size=None, verbose=0):
+        self.calls.append(len(x))
+        return self.fn(x)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class _Predictor:
+    labels           = {"autism": 0, "typical": 1}
+    labels_idx2word  = {0: "autism", 1: "typical"}
+    expected_frames  = 6
+    rgb              = False
+
+    def __init__(self):
+        # Backbone: per-channel means; head: logits from the summed sequence
+        self.backbone_model = _Model(lambda x: x.mean(axis=(1, 2)))
+        self.model          = _Model(lambda x: _softmax(
+            np.stack([x.sum(axis=(1, 2)), -x.sum(axis=(1, 2))], axis=1) / 100))
+
+    @staticmethod
+    def preprocess_input(x):
+        return x / 255.0
+
+
+def _features(predictor, batch_size: int, seconds: int = 10, fps: int = 5) -> np.ndarray:
+    consumer = VGG16FeatureConsumer(predictor, batch_size=batch_size)
+    consumer.start(VideoInfo("clip", True, fps, seconds * fps, 32, 24))
+    for i in range(seconds * fps):
+        consumer.process(Frame(i, i / fps, np.full((24, 32, 3), i * 5 % 256, np.uint8)))
+    return consumer.finish()["features"]
+
+
+def test_backbone_runs_once_per_batch():
+    predictor = _Predictor()
+    batched   = _features(predictor, batch_size=4)
+    assert predictor.backbone_model.calls == [4, 4, 2]     # one sample per second, flushed at the end
+    single    = _features(_Predictor(), batch_size=1)
+    assert batched.shape == (10, 3)
+    np.testing.assert_allclose(batched, single, rtol=1e-6)
+
+
+def test_pad_sequence():
+    x = np.arange(12, dtype=np.float32).reshape(4, 3)
+    np.testing.assert_array_equal(_pad_sequence(x, 2), x[:2])
+    padded = _pad_sequence(x, 6)
+    assert padded.shape == (6, 3) and padded.dtype == x.dtype
+    np.testing.assert_array_equal(padded[:4], x)
+    assert not padded[4:].any()
+    assert _pad_sequence(x, 4) is x
+
+
+def test_one_predict_call_for_many_videos():
+    rng       = np.random.default_rng(0)
+    xs        = [rng.uniform(size=(n, 3)) for n in (2, 6, 9)]
+    predictor = _Predictor()
+    results   = _predict_from_features_batch(predictor, [xs[0], None, xs[1], np.empty((0, 3)), xs[2]])
+    assert predictor.model.calls == [3]
+    assert results[1] == results[3] == (None, None)
+    one_by_one = [_predict_from_features(_Predictor(), x) for x in xs]
+    for got, want in zip((results[0], results[2], results[4]), one_by_one):
+        assert got[0] == pytest.approx(want[0]) and got[1] == want[1] == "autism"
+
+
+def test_no_predict_call_without_features():
+    predictor = _Predictor()
+    assert _predict_from_features_batch(predictor, [None, None]) == [(None, None)] * 2
+    assert predictor.model.calls == []
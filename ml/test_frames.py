@@ -0,0 +1,84 @@
+"""
+Single-decode frame source (ml/frames.py): sampled frames, the count of
+frames read (where the next part of an incremental analysis starts) and
+timings under prefetch.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+cv2 = pytest.importorskip("cv2")
+
+from ml.frames import FrameConsumer, FrameSource  # noqa: E402
+from ml.metrics import StageTimings  # noqa: E402
+
+
+class _Indices(FrameConsumer):
+    name      = "indices"
+    needs_rgb = False
+
+    def start(self, info):
+        self.seen = []
+
+    def process(self, frame):
+        self.seen.append(frame.index)
+
+    def finish(self):
+        return self.seen
+
+
+def _video(tmp_path: Path, frames: int) -> str:
+    path   = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("no MJPG encoder")
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i % 256, np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_seek_past_the_end_counts_only_frames_read(tmp_path, prefetch):
+    source = FrameSource(_video(tmp_path, 100), stride=70, prefetch=prefetch)
+    source.register(_Indices())
+    assert source.run()["indices"] == [0, 70]
+    assert source.position == 100
+
+
+def test_start_past_the_end_reads_nothing(tmp_path):
+    source = FrameSource(_video(tmp_path, 40), start_frame=50, stride=70)
+    source.register(_Indices())
+    assert source.run()["indices"] == []
+    assert source.position == 40
+
+
+def test_small_strides_grab(tmp_path):
+    source = FrameSource(_video(tmp_path, 25), stride=4)
+    source.register(_Indices())
+    assert source.run()["indices"] == list(range(0, 25, 4))
+    assert source.position == 25
+
+
+def test_prefetch_thread_leaves_source_timings_to_the_consumer(tmp_path, monkeypatch):
+    writers = []
+    add     = StageTimings.add
+
+    def traced(self, *args, **kwargs):
+        writers.append((self, threading.current_thread().name))
+        add(self, *args, **kwargs)
+
+    monkeypatch.setattr(StageTimings, "add", traced)
+    source = FrameSource(_video(tmp_path, 30), stride=2, prefetch=2)
+    source.register(_Indices())
+    source.run()
+    assert {name for timings, name in writers if timings is source.timings} == {"MainThread"}
+    assert source.timings.stages["decode"][2] == 15
@@ -0,0 +1,246 @@
+"""
+Incremental analysis of chunked uploads (ml/incremental.py): complete-prefix
+detection on synthetic fragmented MP4 / WebM files, and — where MediaPipe is
+installed — analysis in passes matching a single pass over the whole file.
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import ml.incremental as incremental  # noqa: E402
+from ml.incremental import IncrementalAnalysis, complete_prefix, init_segment  # noqa: E402
+from ml.metrics import StageTimings  # noqa: E402
+from ml.screening import QualityGate  # noqa: E402
+
+
+def _write(tmp_path: Path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def _offsets(head: bytes, fragments: list[bytes]) -> list[int]:
+    """Start of every fragment, then the end of the file."""
+    out = [len(head)]
+    for f in fragments:
+        out.append(out[-1] + len(f))
+    return out
+
+
+# ── WebM ──────────────────────────────────────────────────────────────────────
+
+UNKNOWN = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def _ebml(element_id: int, payload: bytes = b"", unknown: bool = False) -> bytes:
+    size = UNKNOWN if unknown else b"\x01" + len(payload).to_bytes(7, "big")
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + size + payload
+
+
+def _simple_block(track: int, key: bool) -> bytes:
+    return _ebml(0xA3, bytes([0x80 | track]) + b"\x00\x00" + bytes([0x80 if key else 0]) + b"\0" * 32)
+
+
+def _cluster(*blocks: bytes, unknown: bool = False) -> bytes:
+    return _ebml(0x1F43B675, _ebml(0xE7, b"\x00") + b"".join(blocks), unknown)
+
+
+def _webm_head() -> bytes:
+    video = _ebml(0xAE, _ebml(0xD7, b"\x01") + _ebml(0x83, b"\x01"))
+    audio = _ebml(0xAE, _ebml(0xD7, b"\x02") + _ebml(0x83, b"\x02"))
+    return (_ebml(0x1A45DFA3, _ebml(0x4282, b"webm"))
+            + _ebml(0x18538067, unknown=True)
+            + _ebml(0x1549A966, _ebml(0x2AD7B1, b"\x0f\x42\x40"))
+            + _ebml(0x1654AE6B, video + audio))
+
+
+@pytest.mark.parametrize("unknown", [False, True])
+def test_webm_prefix_cuts_before_keyframe_clusters(tmp_path, unknown):
+    key, delta = _simple_block(1, True), _simple_block(1, False)
+    head      = _webm_head()
+    fragments = [_cluster(key, delta, unknown=unknown),
+                 _cluster(delta, unknown=unknown),                       # no keyframe
+                 _cluster(_simple_block(2, True), key, unknown=unknown),  # audio first
+                 _cluster(key, unknown=unknown)]
+    o    = _offsets(head, fragments)
+    path = _write(tmp_path, "a.webm", head + b"".join(fragments))
+
+    # A cluster counts once the next one shows a video keyframe
+    assert complete_prefix(path, o[0]) == 0
+    assert complete_prefix(path, o[2]) == 0
+    assert complete_prefix(path, o[2] + 20) == 0              # video block not in yet
+    assert complete_prefix(path, o[2] + 85) == o[2]           # its header is enough
+    assert complete_prefix(path, o[3] - 1) == o[2]
+    assert complete_prefix(path, o[4]) == o[3]
+
+
+def test_webm_block_group_with_reference_is_not_a_keyframe(tmp_path):
+    block     = _ebml(0xA1, b"\x81\x00\x00\x00" + b"\0" * 16)
+    reference = _ebml(0xA0, block + _ebml(0xFB, b"\x01"))
+    head      = _webm_head()
+    fragments = [_cluster(_simple_block(1, True)), _cluster(reference),
+                 _cluster(_ebml(0xA0, block)), _cluster(_simple_block(1, True))]
+    o    = _offsets(head, fragments)
+    path = _write(tmp_path, "b.webm", head + b"".join(fragments))
+    assert complete_prefix(path, o[3]) == o[2]
+    assert complete_prefix(path, o[2]) == 0
+
+
+def test_webm_init_segment_is_header_with_unknown_size_segment(tmp_path):
+    head  = _webm_head().replace(UNKNOWN, b"\x01" + (10 ** 6).to_bytes(7, "big"))
+    key   = _cluster(_simple_block(1, True))
+    path  = _write(tmp_path, "c.webm", head + key + key + key)
+    init  = init_segment(path, len(head) + 3 * len(key))
+    assert init == _webm_head()
+    # Header + any run of whole clusters is again a streamable file
+    again = _write(tmp_path, "d.webm", init + key + key)
+    assert complete_prefix(again, len(init) + 2 * len(key)) == len(init) + len(key)
+
+
+# ── Fragmented MP4 ────────────────────────────────────────────────────────────
+
+NON_SYNC = 0x00010000
+
+
+def _box(kind: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _full_box(kind: bytes, flags: int, payload: bytes) -> bytes:
+    return _box(kind, struct.pack(">I", flags) + payload)
+
+
+def _mp4_head(default_flags: int = NON_SYNC) -> bytes:
+    tkhd = _full_box(b"tkhd", 0, struct.pack(">III", 0, 0, 1) + bytes(68))
+    hdlr = _full_box(b"hdlr", 0, struct.pack(">I4s", 0, b"vide") + bytes(12))
+    trex = _full_box(b"trex", 0, struct.pack(">IIIII", 1, 1, 0, 0, default_flags))
+    moov = _box(b"moov", _box(b"trak", tkhd + _box(b"mdia", hdlr)) + _box(b"mvex", trex))
+    return _box(b"ftyp", b"isom" + bytes(4)) + moov
+
+
+def _fragment(first_flags=None, default_flags=None) -> bytes:
+    """moof + mdat; first_flags → trun first-sample flags, default_flags → tfhd defaults."""
+    tfhd = (_full_box(b"tfhd", 0x020000, struct.pack(">I", 1)) if default_flags is None
+            else _full_box(b"tfhd", 0x020020, struct.pack(">II", 1, default_flags)))
+    trun = (_full_box(b"trun", 0, struct.pack(">I", 1)) if first_flags is None
+            else _full_box(b"trun", 0x000004, struct.pack(">II", 1, first_flags)))
+    return _box(b"moof", _box(b"traf", tfhd + trun)) + _box(b"mdat", bytes(100))
+
+
+def test_fmp4_prefix_cuts_before_sync_samples(tmp_path):
+    head      = _mp4_head()
+    fragments = [_fragment(0x02000000), _fragment(NON_SYNC), _fragment(0x02000000),
+                 _fragment(0x02000000)]
+    o    = _offsets(head, fragments)
+    path = _write(tmp_path, "a.mp4", head + b"".join(fragments))
+
+    assert complete_prefix(path, o[0]) == 0
+    assert complete_prefix(path, o[2] + 10) == 0              # next moof incomplete
+    assert complete_prefix(path, o[3] - 1) == o[2]            # its moof is enough
+    assert complete_prefix(path, o[4]) == o[3]
+    assert init_segment(path, o[4]) == head
+
+
+def test_fmp4_sample_flags_defaults(tmp_path):
+    # No per-sample flags: tfhd defaults win over trex, which says non-sync
+    head      = _mp4_head()
+    fragments = [_fragment(), _fragment(default_flags=0), _fragment(), _fragment(default_flags=0)]
+    o    = _offsets(head, fragments)
+    path = _write(tmp_path, "b.mp4", head + b"".join(fragments))
+    assert complete_prefix(path, o[2] - 1) == o[1]
+    assert complete_prefix(path, o[3] - 1) == o[1]
+    assert complete_prefix(path, o[4]) == o[3]
+
+
+def test_other_containers_have_no_prefix(tmp_path):
+    path = _write(tmp_path, "a.avi", b"RIFF" + bytes(1000))
+    assert complete_prefix(path, 1004) == 0
+    assert init_segment(path, 1004) == b""
+
+
+# ── Quality gate ──────────────────────────────────────────────────────────────
+
+def _gated(gate: QualityGate, frames: int, faces: int) -> IncrementalAnalysis:
+    analysis = IncrementalAnalysis(use_cache=False, quality_gate=gate)
+    analysis.parts = [{"face_mesh": {"frame_count": frames, "face_detected": faces},
+                       "sampling":  {"source_fps": 30.0}, "timings": StageTimings()}]
+    analysis.next_frame = 30 * 20       # 20 s decoded so far
+    return analysis
+
+
+def test_first_seconds_gate_rejects_early():
+    analysis = _gated(QualityGate(seconds=10.0), frames=60, faces=0)
+    analysis._check_gate()
+    assert analysis.rejected and analysis.verdict["frames_sampled"] == 60
+
+
+def test_sparse_gate_waits_for_the_whole_video(tmp_path, monkeypatch):
+    # Faceless opening seconds: a sparse gate does not judge them on their own
+    analysis = _gated(QualityGate(samples=24), frames=60, faces=0)
+    analysis._check_gate()
+    assert not analysis.rejected
+
+    sampled = []
+    verdict = {"passed": False, "mode": "sparse", "face_ratio": 0.05,
+               "frames_sampled": 24, "min_face_ratio": 0.10}
+    monkeypatch.setattr(incremental, "_run_quality_gate",
+                        lambda path, gate: sampled.append(path) or verdict)
+    monkeypatch.setattr(analysis, "_pass", lambda *a: pytest.fail("decoded a rejected video"))
+    path   = _write(tmp_path, "a.webm", bytes(100))
+    result = analysis.finish(path)
+    assert sampled == [path]                                  # sampled over the whole file
+    assert result.details["status"] == "insufficient_quality"
+    assert result.details["quality_gate"] == verdict
+
+
+# ── Analysis in passes (needs MediaPipe) ──────────────────────────────────────
+
+def _write_webm(path: Path, frames: int = 240) -> bool:
+    cv2 = pytest.importorskip("cv2")
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"VP80"), 30, (96, 72))
+    if not writer.isOpened():
+        return False
+    for i in range(frames):
+        frame = np.full((72, 96, 3), 40, np.uint8)
+        cv2.circle(frame, (20 + i % 56, 36), 10, (200, 180, 160), -1)
+        writer.write(frame)
+    writer.release()
+    return True
+
+
+def test_incremental_passes_match_one_pass(tmp_path):
+    pytest.importorskip("mediapipe")
+    from ml.screening import analyze_video
+
+    video = tmp_path / "clip.webm"
+    if not _write_webm(video):
+        pytest.skip("OpenCV cannot write WebM here")
+    data   = video.read_bytes()
+    upload = tmp_path / "upload.webm"
+    state  = str(tmp_path / "upload.state")
+
+    for k in range(1, 5):
+        # Each pass in a fresh instance, as in separate worker jobs
+        analysis = IncrementalAnalysis(use_cache=False, prefetch=0, target_fps=10, step_bytes=1)
+        analysis.restore(state)
+        upload.write_bytes(data[: len(data) * k // 5])
+        analysis.feed(str(upload), len(data) * k // 5)
+        analysis.save(state)
+    upload.write_bytes(data)
+    analysis = IncrementalAnalysis(use_cache=False, prefetch=0, target_fps=10, step_bytes=1)
+    assert analysis.restore(state)
+    result = analysis.finish(str(upload))
+    whole  = analyze_video(str(video), use_cache=False, prefetch=0, target_fps=10)
+
+    assert result.details["sampling"]["frames_processed"] == whole.details["sampling"]["frames_processed"]
+    assert result.details["sampling"]["segments"] > 1
+    assert result.risk_score == pytest.approx(whole.risk_score)
+    assert result.face_detection_ratio == pytest.approx(whole.face_detection_ratio)
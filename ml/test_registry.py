@@ -0,0 +1,92 @@
+"""
+Warm model registry (ml/registry.py): singletons published to concurrent
+callers, and pooled instances.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.registry import FAILED, READY, UNAVAILABLE, ModelRegistry  # noqa: E402
+
+
+def _slow(model):
+    def loader():
+        time.sleep(0.05)
+        return model
+    return loader
+
+
+def test_concurrent_first_calls_load_once():
+    registry = ModelRegistry()
+    model    = object()
+    loads    = []
+    registry.register("clf", lambda: loads.append(1) or _slow(model)())
+    results  = []
+    callers  = [threading.Thread(target=lambda: results.append(registry.get("clf")))
+                for _ in range(8)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    assert results == [model] * 8 and loads == [1]
+
+
+def test_ready_is_published_after_the_value():
+    registry = ModelRegistry()
+    model    = object()
+    registry.register("clf", _slow(model))
+    entry = registry._entries["clf"]
+    seen  = []
+
+    class Watched(type(entry)):
+        def __setattr__(self, name, value):
+            super().__setattr__(name, value)
+            if name == "state" and value == READY:
+                # A caller arriving the moment the load is published takes the lock-free path
+                caller = threading.Thread(target=lambda: seen.append(registry.get("clf")))
+                caller.start()
+                caller.join()
+
+    entry.__class__ = Watched
+    assert registry.get("clf") is model
+    assert seen == [model]
+
+
+def test_unavailable_and_failed_loaders():
+    registry = ModelRegistry()
+    calls    = []
+
+    def broken():
+        calls.append(1)
+        raise OSError("no weights")
+
+    registry.register("none", lambda: None)
+    registry.register("broken", broken)
+    assert registry.get("none") is None
+    assert registry.health()["none"]["state"] == UNAVAILABLE
+    for _ in range(2):
+        with pytest.raises(OSError):
+            registry.get("broken")
+    assert len(calls) == 2                     # retried on the next access
+    assert registry.health()["broken"]["state"] == FAILED
+
+
+def test_pool_reuses_released_instances():
+    registry = ModelRegistry()
+    registry.register_pool("mesh", object, max_idle=1)
+    with registry.lease("mesh") as first:
+        with registry.lease("mesh") as second:
+            assert first is not second
+    with registry.lease("mesh") as again:
+        assert again in (first, second)
+    assert registry.health()["mesh"]["instances_created"] == 2
+    with pytest.raises(TypeError):
+        registry.get("mesh")
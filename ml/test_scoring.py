@@ -0,0 +1,84 @@
+"""
+Risk formula and re-scoring helpers (ml/scoring.py).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.scoring import (  # noqa: E402
+    ScoringParams, feature_table, fixation_time, rescored_fixation, risk_scores, score_table,
+)
+
+
+def test_model_risk():
+    # 0.85 * 0.8 * min(0.9 / 0.3, 1) + 0.15 * (1 - 0.9)
+    assert risk_scores(0.8, 0.9, 3.0, 0.001) == pytest.approx(0.695)
+
+
+def test_model_risk_downweighted_when_face_rarely_seen():
+    # quality factor 0.15 / 0.3 = 0.5
+    assert risk_scores(0.8, 0.15, 0.0, 0.0) == pytest.approx(0.85 * 0.8 * 0.5 + 0.15 * 0.85)
+
+
+def test_fallback_without_video_model():
+    # 0.50 * (1 - 4/10) + 0.35 * min(1, 0.002 * 100) + 0.15 * (1 - 0.6)
+    assert risk_scores(np.nan, 0.6, 4.0, 0.002) == pytest.approx(0.43)
+
+
+def test_scores_clipped_to_unit_interval():
+    params = ScoringParams(video_model_weight=2.0)
+    assert risk_scores(1.0, 1.0, 0.0, 0.0, params) == 1.0
+    assert risk_scores(np.nan, 1.0, 60.0, 0.0) == 0.0
+
+
+def test_vectorised_matches_per_row():
+    rng   = np.random.default_rng(0)
+    probs = rng.uniform(size=200)
+    probs[::7] = np.nan
+    cols   = (probs, rng.uniform(size=200), rng.uniform(0, 15, 200), rng.uniform(0, 0.02, 200))
+    params = ScoringParams(video_model_weight=0.7, gesture_scale=50.0)
+    batch  = risk_scores(*cols, params)
+    assert batch.shape == (200,)
+    for i in range(200):
+        assert batch[i] == pytest.approx(float(risk_scores(*(c[i] for c in cols), params)))
+
+
+def test_feature_table_and_score_table():
+    rows = [
+        {"video_model_prob": 0.8, "face_detection_ratio": 0.9,
+         "gaze_fixation_time": 3.0, "gesture_anomaly_score": 0.001},
+        {"video_model_prob": None, "face_detection_ratio": 0.6,
+         "gaze_fixation_time": 4.0, "gesture_anomaly_score": 0.002},
+    ]
+    table = feature_table(rows)
+    assert np.isnan(table["video_model_prob"][1])
+    np.testing.assert_allclose(score_table(table), [0.695, 0.43])
+    # Recomputed fixation times replace the stored column
+    np.testing.assert_allclose(score_table(table, fixation=np.array([3.0, 10.0]))[1],
+                               0.35 * 0.2 + 0.15 * 0.4)
+
+
+def test_fixation_time():
+    still = np.zeros((10, 2))
+    assert fixation_time(still, 0.02, 1.0, 5.0) == pytest.approx(9 / 5.0)
+    assert fixation_time(still[:5], 0.02, 1.0, 5.0) == 0.0      # too few samples
+    moving = np.cumsum(np.full((10, 2), 0.03), axis=0)          # ~0.042 per step
+    assert fixation_time(moving, 0.02, 1.0, 5.0) == 0.0
+    assert fixation_time(moving, 0.02, 3.0, 5.0) == pytest.approx(9 / 5.0)   # stride 3
+
+
+def test_rescored_fixation():
+    centers  = np.cumsum(np.full((10, 2), 0.03), axis=0)
+    features = {"gaze_fixation_time": 1.25, "fixation_threshold": 0.02,
+                "eye_centers": centers, "fps": 30.0, "sample_fps": 30.0}
+    assert rescored_fixation(features, 0.02) == 1.25                  # stored value
+    assert rescored_fixation(features, 0.05) == pytest.approx(9 / 30.0)
+    with pytest.raises(ValueError):
+        rescored_fixation({**features, "eye_centers": None}, 0.05)
@@ -0,0 +1,88 @@
+"""
+Mergeable statistics used by parallel segment analysis (ml/stats.py) and the
+frame sampling stride (ml/frames.py).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.stats import FixationRun, Moments  # noqa: E402
+
+
+def _moments(xs: np.ndarray) -> Moments:
+    m = Moments.zeros(xs.shape[1:])
+    for x in xs:
+        m.add(x)
+    return m
+
+
+def test_moments_match_numpy():
+    xs = np.random.default_rng(0).normal(size=(50, 3))
+    m  = _moments(xs)
+    assert m.n == 50
+    np.testing.assert_allclose(m.mean, xs.mean(axis=0))
+    np.testing.assert_allclose(m.variance, xs.var(axis=0))
+
+
+@pytest.mark.parametrize("cut", [1, 17, 49])
+def test_moments_merge_equals_one_pass(cut):
+    xs     = np.random.default_rng(1).normal(5.0, 2.0, size=(50, 2))
+    merged = Moments.merge(_moments(xs[:cut]), _moments(xs[cut:]))
+    assert merged.n == 50
+    np.testing.assert_allclose(merged.mean, xs.mean(axis=0))
+    np.testing.assert_allclose(merged.variance, xs.var(axis=0))
+
+
+def test_moments_merge_with_empty():
+    m = _moments(np.ones((3, 2)))
+    assert Moments.merge(m, Moments.zeros((2,))) is m
+    assert Moments.merge(None, m) is m
+    assert Moments.merge(Moments.zeros((2,)), None) is None
+
+
+def test_moments_add_batch_equals_add():
+    xs    = np.random.default_rng(2).normal(size=(40, 4))
+    batch = Moments.zeros((4,))
+    batch.add_batch(xs[:25])
+    batch.add_batch(xs[25:25])          # empty batch is a no-op
+    batch.add_batch(xs[25:])
+    one = _moments(xs)
+    assert batch.n == one.n
+    np.testing.assert_allclose(batch.mean, one.mean)
+    np.testing.assert_allclose(batch.m2, one.m2)
+
+
+def _run(centers, threshold) -> FixationRun:
+    run = FixationRun.empty()
+    for c in centers:
+        run.add(np.asarray(c, dtype=float), threshold)
+    return run
+
+
+@pytest.mark.parametrize("cut", range(0, 7))
+def test_fixation_merge_counts_boundary_pair_once(cut):
+    # Steps of 0.01 are fixations at threshold 0.05; the 0.5 jumps are not
+    centers = [(0.0, 0.0), (0.01, 0.0), (0.5, 0.0), (0.51, 0.0), (0.52, 0.0), (1.0, 0.0)]
+    whole   = _run(centers, 0.05)
+    merged  = FixationRun.merge(_run(centers[:cut], 0.05), _run(centers[cut:], 0.05), 0.05)
+    assert (merged.n_valid, merged.fix_frames) == (whole.n_valid, whole.fix_frames) == (6, 3)
+    np.testing.assert_array_equal(merged.first, whole.first)
+    np.testing.assert_array_equal(merged.last, whole.last)
+
+
+def test_sampling_stride():
+    from ml.frames import sampling_stride
+
+    assert sampling_stride(30.0, 900, None, None) == 1
+    assert sampling_stride(30.0, 900, 10.0, None) == 3
+    assert sampling_stride(30.0, 900, 60.0, None) == 1      # never upsamples
+    assert sampling_stride(30.0, 900, None, 100) == 9       # budget spread over the video
+    assert sampling_stride(30.0, 900, 10.0, 600) == 3       # target_fps already within budget
+    assert sampling_stride(30.0, 0, None, 100) == 1         # unknown length
@@ -0,0 +1,163 @@
+"""
+Train the LSTM head of the video classifier on a lightweight backbone.
+
+Features are extracted exactly as at screening time (one frame per second,
+screening.VGG16FeatureConsumer) and cached per video, so re-training with
+other hyper-parameters does not decode the videos again.  Outputs follow the
+vgg16-lstm conventions (see ml/backbones.py):
+
+    video-asd-model/models/autism_data/<backbone>-lstm-config.npy
+    video-asd-model/models/autism_data/<backbone>-lstm-weights.h5
+    training/<backbone>-lstm-history.json
+
+Dataset layout: one sub-folder per class, videos inside (folder name = label).
+
+Usage:
+  python ml/train_video_head.py --data datasets/autism_data --backbone mobilenet_v3_small
+  NEUROTHRIVE_VIDEO_BACKBONE=mobilenet_v3_small python -m ml.screening video.mp4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ml.backbones import BACKBONES, BackboneFeatures, build_lstm_head, get_backbone, head_paths  # noqa: E402
+from ml.batch import VIDEO_EXTENSIONS  # noqa: E402
+from ml.cache import file_sha256  # noqa: E402
+
+ML_DIR    = Path(__file__).resolve().parent
+MODEL_DIR = ML_DIR / "video-asd-model" / "models" / "autism_data"
+
+
+def list_videos(data_dir: Path) -> tuple[list[tuple[Path, str]], list[str]]:
+    """[(video, label)] and the sorted label names, from class sub-folders."""
+    labels = sorted(d.name for d in data_dir.iterdir() if d.is_dir())
+    videos = [
+        (p, label)
+        for label in labels
+        for p in sorted((data_dir / label).rglob("*"))
+        if p.suffix.lower() in VIDEO_EXTENSIONS
+    ]
+    return videos, labels
+
+
+def extract_features(video: Path, extractor: BackboneFeatures, cache_dir: Path) -> np.ndarray:
+    """(seconds, feature_dim) backbone features of one video (cached on disk)."""
+    from ml.frames import FrameSource
+    from ml.screening import VGG16FeatureConsumer
+
+    path = cache_dir / f"{file_sha256(str(video))}.npy"
+    if path.exists():
+        return np.load(path)
+    source = FrameSource(str(video))
+    source.register(VGG16FeatureConsumer(extractor))
+    features = source.run()["vgg16"]["features"]
+    if features is None:
+        features = np.zeros((0, 0), dtype=np.float32)
+    np.save(path, features)
+    return features
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train an LSTM head on backbone features")
+    parser.add_argument("--data", type=Path, default=ROOT / "datasets" / "autism_data")
+    parser.add_argument("--backbone", default="mobilenet_v3_small",
+                        choices=sorted(b for b in BACKBONES if b != "vgg16"))
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--val-split", type=float, default=0.3)
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="cap expected_frames (default: longest training video)")
+    parser.add_argument("--features-cache", type=Path, default=ML_DIR / ".cache" / "head_features")
+    args = parser.parse_args()
+
+    from sklearn.model_selection import train_test_split
+    from tensorflow.keras.callbacks import ModelCheckpoint
+    from tensorflow.keras.utils import to_categorical
+
+    from ml.screening import _pad_sequence
+
+    videos, labels = list_videos(args.data)
+    if not videos:
+        print(f"No videos found under {args.data} (expected one sub-folder per class)")
+        return
+
+    backbone  = get_backbone(args.backbone)
+    extractor = BackboneFeatures(backbone)
+    cache_dir = args.features_cache / backbone.name
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    xs, ys   = [], []
+    frames   = 0
+    t0       = time.perf_counter()
+    for i, (video, label) in enumerate(videos, 1):
+        x = extract_features(video, extractor, cache_dir)
+        if len(x) == 0:
+            print(f"  skipped (no frames): {video}")
+            continue
+        xs.append(x)
+        ys.append(labels.index(label))
+        frames += len(x)
+        print(f"  [{i}/{len(videos)}] {video.name}: {len(x)} frames")
+    elapsed = time.perf_counter() - t0
+    print(f"Extracted {frames} frames in {elapsed:.1f}s "
+          f"({1000 * elapsed / max(frames, 1):.1f} ms/frame incl. cache hits)")
+    if not xs:
+        print(f"No frames decoded from the {len(videos)} video(s) under {args.data} "
+              f"(unreadable files or unsupported codec)")
+        return
+
+    expected = max(len(x) for x in xs)
+    if args.max_frames:
+        expected = min(expected, args.max_frames)
+
+    # Same keys as vgg16-lstm-config.npy, plus the backbone name
+    config = {
+        "num_input_tokens": backbone.feature_dim,
+        "nb_classes":       len(labels),
+        "labels":           {label: i for i, label in enumerate(labels)},
+        "expected_frames":  expected,
+        "backbone":         backbone.name,
+    }
+    config_path, weight_path = head_paths(MODEL_DIR, backbone.name)
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    np.save(config_path, config)
+
+    X = np.stack([_pad_sequence(x, expected) for x in xs])
+    Y = to_categorical(ys, len(labels))
+    X_train, X_val, Y_train, Y_val = train_test_split(
+        X, Y, test_size=args.val_split, random_state=42,
+    )
+
+    model = build_lstm_head(backbone.feature_dim, len(labels))
+    checkpoint = ModelCheckpoint(str(weight_path), save_best_only=True, save_weights_only=True)
+    history = model.fit(
+        X_train, Y_train,
+        batch_size=args.batch_size,
+        epochs=args.epochs,
+        validation_data=(X_val, Y_val),
+        callbacks=[checkpoint],
+        verbose=1,
+    )
+
+    history_path = ML_DIR / "training" / f"{backbone.name}-lstm-history.json"
+    history_path.write_text(json.dumps(
+        {k: [float(v) for v in vals] for k, vals in history.history.items()}, indent=2,
+    ))
+    best = max(history.history.get("val_accuracy", [0.0]))
+    print(f"Best val accuracy: {best:.3f}")
+    print(f"Saved {config_path.name}, {weight_path.name}, {history_path.name}")
+
+
+if __name__ == "__main__":
+    main()
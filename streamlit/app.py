@@ -4,8 +4,8 @@ Streamlit Demo: Video upload → analyze → risk score + SHAP heatmap.
 Run: streamlit run streamlit/app.py
 """
 
-import base64
 import sys
+import time
 from pathlib import Path
 
 import streamlit as st
@@ -30,16 +30,37 @@ uploaded = st.file_uploader(
     type=["mp4", "avi", "mov", "webm", "mkv"],
 )
 
+JOB_TIMEOUT_SECONDS = 600   # give up polling after this long
+
 if uploaded:
     with st.spinner("Analyzing video..."):
         try:
+            # Upload returns a job immediately; the analysis runs in a backend worker
             r = requests.post(
                 f"{backend_url}/api/screening",
                 files={"file": (uploaded.name, uploaded.read(), uploaded.type or "video/mp4")},
-                timeout=120,
+                timeout=60,
             )
             r.raise_for_status()
-            data = r.json()
+            job = r.json()
+
+            deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+            while job.get("status") in ("queued", "running"):
+                if time.monotonic() > deadline:
+                    st.error("Screening is taking too long — check back later.")
+                    st.stop()
+                time.sleep(2)
+                r = requests.get(f"{backend_url}{job['status_url']}", timeout=10)
+                r.raise_for_status()
+                job = {**r.json(), "status_url": job["status_url"]}
+
+            if job.get("status") == "failed":
+                st.error(f"Screening failed: {job.get('error')}")
+                st.stop()
+            data = job.get("result", {})
+            if data.get("status") == "insufficient_quality":
+                st.warning(data.get("error"))
+                st.stop()
         except requests.exceptions.RequestException as e:
             st.error(f"API error: {e}")
             st.info("Start the backend: uvicorn backend.main:app --reload")
@@ -52,7 +73,7 @@ if uploaded:
     indicators = data.get("indicators", {})
     gaze_metrics = data.get("gaze_metrics", {})
     shap = data.get("shap_importance", {})
-    heatmap_b64 = data.get("heatmap_base64")
+    heatmap_url = data.get("heatmap_url")
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -66,8 +87,16 @@ if uploaded:
     st.json(gaze_metrics)
 
     st.subheader("Feature Importance (SHAP-style)")
-    if heatmap_b64:
-        st.image(base64.b64decode(heatmap_b64), use_container_width=True)
+    heatmap = None
+    if heatmap_url:
+        try:
+            r = requests.get(f"{backend_url}{heatmap_url}", params={"format": "png"}, timeout=10)
+            if r.ok:
+                heatmap = r.content
+        except requests.exceptions.RequestException:
+            pass
+    if heatmap:
+        st.image(heatmap, use_container_width=True)
     else:
         st.bar_chart({k: v for k, v in shap.items() if isinstance(v, (int, float))})
 